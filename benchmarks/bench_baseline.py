@@ -0,0 +1,248 @@
+# benchmarks/bench_baseline.py
+"""
+Local ΔT baseline estimators (settings.BASELINE_METHOD): speed versus
+agreement with the reference Gaussian baseline, on a synthetic scene.
+
+Per method:
+    baseline   seconds for all tiles (best of --repeat); "blocks" also
+               reports the one-off mosaic surface build
+    detect     seconds of detect_faults with that baseline
+    rmse / max |baseline - gaussian| in ΔT units, on panel pixels
+    iou        hotspot-mask IoU against the Gaussian run
+    recall / precision of detections against the Gaussian run (same
+               tile, bbox centres within --match-px)
+
+Usage:
+    python -m benchmarks.bench_baseline
+    python -m benchmarks.bench_baseline --width 8192 --height 8192 --methods gaussian pyramid
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_pipeline import RESULTS_DIR, DATA_ROOT, _best_of, _read_all
+from benchmarks.synthetic import add_scene_arguments, scene_overrides, write_scene
+
+from src.config import settings
+from src.faults.baseline import BASELINE_METHODS, estimate_baseline
+from src.faults.detector import detect_faults
+from src.geometry.features import TileGeometry
+from src.thermal.background import background_model
+from src.thermal.normalization import normalize_ir_tile_fused
+from src.utils.hashing import params_digest
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _prepare(ir_path, rgb_path):
+    """
+    ΔT, panel mask and bg median for every valid IR tile.
+    """
+    ir_tiles = _read_all(ir_path, band_index=1)
+    rgb_tiles = _read_all(rgb_path, band_indices=[1, 2, 3])
+
+    tiles = []
+    for i, (t, r) in enumerate(zip(ir_tiles, rgb_tiles)):
+        delta, stats = normalize_ir_tile_fused(t["tile"])
+        if delta is None:
+            continue
+
+        mask = TileGeometry(r["tile"]).panel_mask
+        mask = cv2.resize(
+            mask.astype(np.uint8), (delta.shape[1], delta.shape[0]),
+            interpolation=cv2.INTER_NEAREST,
+        ) > 0
+
+        tiles.append({
+            "tile_id": i,
+            "delta": delta,
+            "mask": mask if mask.sum() >= 100 else None,
+            "window": t["window"],
+            "transform": t["transform"],
+            "core": t["core"],
+            "seams": t["seams"],
+            "bg_median": stats["bg_median"],
+        })
+    return tiles
+
+
+def _baselines(tiles, method, surface):
+    if method == "blocks":
+        out = []
+        for t in tiles:
+            b = surface.sample(t["window"], t["delta"].shape)
+            b -= np.float32(t["bg_median"])
+            out.append(b)
+        return out
+    return [estimate_baseline(t["delta"], method) for t in tiles]
+
+
+def _detect(tiles, baselines):
+    faults = []
+    for t, b in zip(tiles, baselines):
+        faults.extend(detect_faults(
+            t["delta"], t["transform"], t["tile_id"],
+            panel_mask=t["mask"], core=t["core"], seams=t["seams"],
+            baseline=b,
+        ))
+    return faults
+
+
+def _centres(faults):
+    out = {}
+    for f in faults:
+        b = f["bbox"]
+        out.setdefault(f["tile_id"], []).append(
+            ((b["x_min"] + b["x_max"]) / 2, (b["y_min"] + b["y_max"]) / 2)
+        )
+    return {k: np.asarray(v) for k, v in out.items()}
+
+
+def _matched(a, b, tol):
+    """
+    Detections of `a` with a detection of `b` within tol px, same tile.
+    """
+    hit = 0
+    for tile_id, pts in a.items():
+        other = b.get(tile_id)
+        if other is None:
+            continue
+        d = np.hypot(*(pts[:, None, :] - other[None, :, :]).transpose(2, 0, 1))
+        hit += int((d.min(axis=1) <= tol).sum())
+    return hit
+
+
+def compare(tiles, ref_baselines, ref_faults, baselines, faults, match_px):
+    se, n, worst = 0.0, 0, 0.0
+    inter = union = 0
+    thr = settings.LOCAL_DT_THRESHOLD
+
+    for t, rb, b in zip(tiles, ref_baselines, baselines):
+        m = t["mask"] if t["mask"] is not None else np.ones_like(t["delta"], bool)
+        diff = (b - rb)[m]
+        se += float(np.square(diff, dtype=np.float64).sum())
+        n += diff.size
+        worst = max(worst, float(np.abs(diff).max()) if diff.size else 0.0)
+
+        hot_ref = ((t["delta"] - rb) > thr) & m
+        hot = ((t["delta"] - b) > thr) & m
+        inter += int((hot_ref & hot).sum())
+        union += int((hot_ref | hot).sum())
+
+    ref_c, c = _centres(ref_faults), _centres(faults)
+    return {
+        "rmse": round((se / max(n, 1)) ** 0.5, 4),
+        "max_abs": round(worst, 3),
+        "iou": round(inter / union, 4) if union else 1.0,
+        "faults": len(faults),
+        "recall": round(_matched(ref_c, c, match_px) / max(len(ref_faults), 1), 4),
+        "precision": round(_matched(c, ref_c, match_px) / max(len(faults), 1), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    add_scene_arguments(parser)
+    parser.add_argument("--methods", nargs="+", choices=BASELINE_METHODS,
+                        default=list(BASELINE_METHODS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--match-px", type=float, default=4.0)
+    parser.add_argument("--output", type=Path,
+                        default=RESULTS_DIR / "baseline_methods.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    cv2.setNumThreads(1)   # per-worker conditions
+
+    scene = scene_overrides(args)
+    scene_key = params_digest(scene)
+    ir_path, rgb_path, params = write_scene(DATA_ROOT / scene_key, **scene)
+
+    tiles = _prepare(ir_path, rgb_path)
+    mp = sum(t["delta"].size for t in tiles) / 1e6
+    print(
+        f"scene={scene_key} {params['width']}x{params['height']} | "
+        f"tiles={len(tiles)} ({mp:.1f} MP) | repeat={args.repeat}\n"
+    )
+
+    ref_baselines = _baselines(tiles, "gaussian", None)
+    ref_faults = _detect(tiles, ref_baselines)
+
+    surface, build = None, None
+    if "blocks" in args.methods:
+        with tempfile.TemporaryDirectory(prefix="bench_bg_") as tmp:
+            t0 = time.perf_counter()
+            surface, _ = background_model(ir_path, cache_dir=tmp)
+            build = time.perf_counter() - t0
+
+    print(
+        f"{'method':<10}{'baseline':>10}{'detect':>10}{'MP/s':>9}"
+        f"{'rmse':>9}{'max':>8}{'iou':>8}{'faults':>8}{'recall':>8}{'prec':>8}"
+    )
+
+    results = {}
+    for method in args.methods:
+        seconds, baselines = _best_of(
+            lambda: _baselines(tiles, method, surface), args.repeat
+        )
+        detect_s, faults = _best_of(
+            lambda: _detect(tiles, baselines), args.repeat
+        )
+        row = {
+            "baseline_seconds": round(seconds, 4),
+            "detect_seconds": round(detect_s, 4),
+            "baseline_mp_s": round(mp / seconds, 1) if seconds > 0 else None,
+            **compare(
+                tiles, ref_baselines, ref_faults, baselines, faults,
+                args.match_px,
+            ),
+        }
+        if method == "blocks":
+            row["surface_build_seconds"] = round(build, 4)
+        results[method] = row
+
+        print(
+            f"{method:<10}{seconds:>9.3f}s{detect_s:>9.3f}s"
+            f"{row['baseline_mp_s'] or 0:>9.1f}{row['rmse']:>9.3f}"
+            f"{row['max_abs']:>8.2f}{row['iou']:>8.3f}{row['faults']:>8}"
+            f"{row['recall']:>8.3f}{row['precision']:>8.3f}",
+            flush=True,
+        )
+
+    if build is not None:
+        print(f"\nblocks: mosaic surface built once in {build:.3f}s")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "scene": {"key": scene_key, **params},
+        "tiles": len(tiles),
+        "megapixels": round(mp, 2),
+        "settings": {
+            "ksize": settings.BASELINE_KSIZE,
+            "pyramid_levels": settings.BASELINE_PYRAMID_LEVELS,
+            "box_passes": settings.BASELINE_BOX_PASSES,
+            "background_block": settings.BACKGROUND_BLOCK,
+            "background_decimation": settings.BACKGROUND_DECIMATION,
+        },
+        "methods": results,
+    }, indent=2))
+    print(f"Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
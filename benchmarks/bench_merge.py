@@ -0,0 +1,123 @@
+# benchmarks/bench_merge.py
+"""
+Runtime of merge_faults_spatially vs. number of tile-level detections.
+
+Usage:
+    python -m benchmarks.bench_merge
+    python -m benchmarks.bench_merge --sizes 1000 10000 100000 --legacy-max 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.config import settings
+from src.faults.merger import _aggregate_cluster, merge_faults_spatially
+
+MERGE_DISTANCE_METERS = settings.MERGE_DISTANCE_METERS
+
+
+def synthetic_faults(n, seed=0):
+    """
+    n detections at constant site density; ~30% are duplicates of a
+    neighbour (overlap-band re-detections) within the merge distance.
+    """
+    rng = np.random.default_rng(seed)
+
+    side = np.sqrt(n) * 4 * MERGE_DISTANCE_METERS
+    xy = rng.uniform(0, side, size=(n, 2))
+
+    dup = rng.random(n) < 0.3
+    src = rng.integers(0, n, size=n)
+    xy[dup] = xy[src[dup]] + rng.normal(0, MERGE_DISTANCE_METERS / 4, (dup.sum(), 2))
+
+    faults = []
+    for i, (x, y) in enumerate(xy):
+        bx, by = int(rng.integers(0, 900)), int(rng.integers(0, 900))
+        faults.append({
+            "tile_id": i // 50,
+            "fault_type": "HOTSPOT",
+            "severity": "LOW",
+            "confidence": 30.0,
+            "delta_t_max": float(rng.uniform(8, 45)),
+            "zscore_max": 0.0,
+            "pixel_area": int(rng.integers(120, 2000)),
+            "lon": float(x),
+            "lat": float(y),
+            "bbox": {"x_min": bx, "y_min": by, "x_max": bx + 20, "y_max": by + 20},
+        })
+    return faults
+
+
+def legacy_merge(faults):
+    """
+    The pre-index merge: greedy O(n²) passes until nothing merges.
+    Kept here only as a timing reference.
+    """
+    remaining = list(faults)
+    merged_any = True
+    fault_id = 0
+
+    while merged_any:
+        merged_any = False
+        clusters = []
+        used = set()
+
+        for i, f in enumerate(remaining):
+            if i in used:
+                continue
+            cluster = [f]
+            used.add(i)
+            for j, g in enumerate(remaining):
+                if j in used:
+                    continue
+                if np.hypot(f["lon"] - g["lon"], f["lat"] - g["lat"]) <= MERGE_DISTANCE_METERS:
+                    cluster.append(g)
+                    used.add(j)
+                    merged_any = True
+            clusters.append(cluster)
+
+        remaining = []
+        for c in clusters:
+            agg = _aggregate_cluster(c, fault_id)
+            if agg is not None:
+                remaining.append(agg)
+                fault_id += 1
+
+    return remaining
+
+
+def _time(fn, faults):
+    t0 = time.perf_counter()
+    out = fn(faults)
+    return time.perf_counter() - t0, len(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+",
+        default=[1_000, 10_000, 50_000, 200_000],
+    )
+    parser.add_argument(
+        "--legacy-max", type=int, default=2_000,
+        help="also time the legacy O(n²) merge up to this size",
+    )
+    args = parser.parse_args()
+
+    print(f"{'faults':>10} {'merged':>10} {'index_s':>10} {'us/fault':>10} {'legacy_s':>10}")
+
+    for n in args.sizes:
+        faults = synthetic_faults(n)
+        t, merged = _time(merge_faults_spatially, faults)
+
+        legacy = "-"
+        if n <= args.legacy_max:
+            legacy = f"{_time(legacy_merge, faults)[0]:.3f}"
+
+        print(f"{n:>10} {merged:>10} {t:>10.3f} {1e6 * t / n:>10.1f} {legacy:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+# benchmarks/bench_pipeline.py
+"""
+Per-stage and end-to-end STEP-4 timings on a synthetic orthomosaic.
+
+Each stage runs --repeat times (best time kept) and reports seconds,
+throughput (megapixels/s, or items/s for merge / export) and the peak
+RSS of the benchmark process so far. Results are written to
+benchmarks/results/latest.json and compared against the stored
+baseline (benchmarks/results/baseline.json) for the same scene and
+scheduler; stages slower than --tolerance are flagged.
+
+Usage:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --width 8192 --height 8192 --compress lzw
+    python -m benchmarks.bench_pipeline --scheduler processes --workers 4
+    python -m benchmarks.bench_pipeline --save-baseline
+    python -m benchmarks.bench_pipeline --check      # exit 1 on regression
+"""
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_merge import synthetic_faults
+from benchmarks.synthetic import (
+    add_scene_arguments,
+    scene_overrides,
+    write_scene,
+)
+
+from src.io.tiff_reader import open_tiff, raster_crs
+from src.io.tile_generator import generate_tiles
+from src.thermal.normalization import normalize_ir_tile, normalize_ir_tile_fused
+from src.geometry.rows import detect_row_mask, fill_panel_mask
+from src.geometry.features import TileGeometry
+from src.geometry.orientation import estimate_row_orientation
+from src.geometry.panels import extract_panel_rois
+from src.faults.detector import detect_faults
+from src.faults.merger import merge_faults_spatially, merge_fault_store
+from src.faults.store import FaultStore
+from src.faults.exporter import export_csv, export_geojson
+from src.faults.priority import compute_priority
+from src.pipeline.plan import plan_step4_tasks
+from src.pipeline.scheduler import SCHEDULERS, run_tasks
+from src.pipeline.worker import process_tile, close_datasets
+from src.utils.hashing import params_digest
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+DATA_ROOT = BENCH_DIR / "data"
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and its reaped children (MB).
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 1024 ** 2
+    return round(max(own, children) * scale, 1)
+
+
+def _best_of(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+class StageTimer:
+    """
+    Collects {stage: {seconds, throughput, unit, peak_rss_mb}}.
+    """
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def run(self, name, fn, work, unit="MP/s"):
+        """
+        Time fn() and report `work` units (megapixels or items) per second;
+        `work` may be a callable of fn's result.
+        """
+        seconds, out = _best_of(fn, self.repeat)
+        if callable(work):
+            work = work(out)
+        self.results[name] = {
+            "seconds": round(seconds, 4),
+            "throughput": round(work / seconds, 2) if seconds > 0 else None,
+            "unit": unit,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        print(
+            f"{name:<28}{seconds:>10.3f}s"
+            f"{self.results[name]['throughput'] or 0:>12.2f} {unit:<9}"
+            f"{self.results[name]['peak_rss_mb']:>9.1f} MB",
+            flush=True,
+        )
+        return out
+
+
+# ------------------------------------------------------------
+# Stage benchmarks
+# ------------------------------------------------------------
+def _read_all(path, **kwargs):
+    ds = open_tiff(path)
+    try:
+        return list(generate_tiles(ds, **kwargs))
+    finally:
+        ds.close()
+
+
+def _megapixels(tiles):
+    return sum(t["tile"].shape[0] * t["tile"].shape[1] for t in tiles) / 1e6
+
+
+def bench_stages(timer, ir_path, rgb_path, merge_faults, work_dir):
+    ir_tiles = timer.run(
+        "generate_tiles.ir",
+        lambda: _read_all(ir_path, band_index=1),
+        work=_megapixels,
+    )
+    rgb_tiles = timer.run(
+        "generate_tiles.rgb",
+        lambda: _read_all(rgb_path, band_indices=[1, 2, 3]),
+        work=_megapixels,
+    )
+    mp = _megapixels(ir_tiles)
+    rgb_mp = _megapixels(rgb_tiles)
+
+    timer.run(
+        "normalize_ir_tile",
+        lambda: [normalize_ir_tile(t["tile"].astype("float32"))
+                 for t in ir_tiles],
+        work=mp,
+    )
+    delta = timer.run(
+        "normalize_ir_tile_fused",
+        lambda: [normalize_ir_tile_fused(t["tile"])[0] for t in ir_tiles],
+        work=mp,
+    )
+
+    rows = timer.run(
+        "detect_row_mask",
+        lambda: [detect_row_mask(t["tile"]) for t in rgb_tiles],
+        work=rgb_mp,
+    )
+    panels = timer.run(
+        "fill_panel_mask",
+        lambda: [fill_panel_mask(r) for r in rows],
+        work=rgb_mp,
+    )
+    # Step 3: separate edge passes vs one shared TileGeometry pass
+    timer.run(
+        "step3_separate",
+        lambda: [
+            (
+                estimate_row_orientation(t["tile"]),
+                extract_panel_rois(detect_row_mask(t["tile"])),
+            )
+            for t in rgb_tiles
+        ],
+        work=rgb_mp,
+    )
+    timer.run(
+        "step3_tile_geometry",
+        lambda: [
+            (g.orientation, g.rois)
+            for g in (TileGeometry(t["tile"]) for t in rgb_tiles)
+        ],
+        work=rgb_mp,
+    )
+
+    masks = [
+        cv2.resize(
+            p, (d.shape[1], d.shape[0]), interpolation=cv2.INTER_NEAREST
+        ) > 0 if d is not None else None
+        for p, d in zip(panels, delta)
+    ]
+
+    def _detect():
+        faults = []
+        for i, (t, d, m) in enumerate(zip(ir_tiles, delta, masks)):
+            if d is None:
+                continue
+            faults.extend(detect_faults(
+                d, t["transform"], i,
+                panel_mask=m if m.sum() >= 100 else None,
+                core=t["core"],
+                seams=t["seams"],
+            ))
+        return faults
+
+    tile_faults = timer.run("detect_faults", _detect, work=mp)
+
+    timer.run(
+        "merge_faults_spatially",
+        lambda: merge_faults_spatially(tile_faults),
+        work=max(len(tile_faults), 1),
+        unit="faults/s",
+    )
+
+    synthetic = synthetic_faults(merge_faults)
+    merged = timer.run(
+        "merge_faults_spatially.synth",
+        lambda: merge_faults_spatially(synthetic),
+        work=merge_faults,
+        unit="faults/s",
+    )
+    for f in merged:
+        f["priority"] = compute_priority(f)
+
+    timer.run(
+        "export_csv",
+        lambda: export_csv(merged, work_dir / "faults.csv"),
+        work=len(merged),
+        unit="faults/s",
+    )
+    timer.run(
+        "export_geojson",
+        lambda: export_geojson(
+            merged, work_dir / "faults.geojson", mode="compact"
+        ),
+        work=len(merged),
+        unit="faults/s",
+    )
+
+
+def run_step4_once(ir_path, rgb_path, work_dir, scheduler, workers):
+    """
+    STEP-4 as in src.pipeline.batch.run_sites minus annotations, the
+    checkpoint and the panel mask cache: plan → tiles → store → merge →
+    score → export.
+    """
+    tasks = plan_step4_tasks(ir_path, rgb_path, use_mask_cache=False)
+
+    store = FaultStore(work_dir / "store")
+    for result in run_tasks(
+        process_tile, tasks, scheduler=scheduler, workers=workers
+    ):
+        store.append(result["faults"])
+    close_datasets()
+    store.flush()
+
+    merged = merge_fault_store(store, raster_crs(ir_path))
+    merged["priority"] = merged.priority()
+    merged["fault_type"] = merged.classify()
+    merged = merged.sort_by("priority", descending=True)
+
+    export_csv(merged.to_dicts(), work_dir / "step4.csv")
+    export_geojson(
+        merged.to_dicts(), work_dir / "step4.geojson", mode="compact"
+    )
+    return merged
+
+
+# ------------------------------------------------------------
+# Baseline comparison
+# ------------------------------------------------------------
+def compare(current, baseline, tolerance):
+    """
+    Print current vs. baseline seconds; return the regressed stages.
+    """
+    regressions = []
+    print(f"\n{'stage':<28}{'baseline s':>12}{'current s':>12}{'ratio':>9}")
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if base is None or not base["seconds"]:
+            print(f"{name:<28}{'-':>12}{cur['seconds']:>12.3f}{'-':>9}")
+            continue
+        ratio = cur["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(
+            f"{name:<28}{base['seconds']:>12.3f}{cur['seconds']:>12.3f}"
+            f"{ratio:>9.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    add_scene_arguments(parser)
+    parser.add_argument("--scheduler", choices=SCHEDULERS, default="serial")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--merge-faults", type=int, default=50_000,
+        help="synthetic detections for the merge / export stages",
+    )
+    parser.add_argument("--skip-stages", action="store_true",
+                        help="only time step 4 end to end")
+    parser.add_argument("--baseline", type=Path,
+                        default=RESULTS_DIR / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown ratio flagged as regression")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 when any stage regressed")
+    parser.add_argument("--verbose", action="store_true",
+                        help="keep pipeline INFO logging on stderr")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove(0)
+        logger.add(sys.stderr, level="WARNING")
+
+    scene = scene_overrides(args)
+    scene_key = params_digest(scene)
+    ir_path, rgb_path, params = write_scene(DATA_ROOT / scene_key, **scene)
+
+    run_key = f"{scene_key}-{args.scheduler}-{args.workers or 'auto'}"
+    print(
+        f"scene={scene_key} {params['width']}x{params['height']} "
+        f"compress={params['compress']} tiled={params['tiled']} | "
+        f"scheduler={args.scheduler} | repeat={args.repeat}\n"
+    )
+    print(f"{'stage':<28}{'time':>11}{'throughput':>22}{'peak RSS':>12}")
+
+    timer = StageTimer(args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        work_dir = Path(tmp)
+
+        mp = params["width"] * params["height"] / 1e6
+        if not args.skip_stages:
+            bench_stages(timer, ir_path, rgb_path, args.merge_faults, work_dir)
+
+        merged = timer.run(
+            "step4",
+            lambda: run_step4_once(
+                ir_path, rgb_path, work_dir, args.scheduler, args.workers
+            ),
+            work=mp,
+        )
+
+    print(f"\nstep4 faults={len(merged)}")
+
+    record = {
+        "scene": params,
+        "scheduler": args.scheduler,
+        "workers": args.workers,
+        "repeat": args.repeat,
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": timer.results,
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    (RESULTS_DIR / "latest.json").write_text(json.dumps(record, indent=2))
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text())
+
+    regressions = []
+    if run_key in baselines:
+        regressions = compare(
+            timer.results, baselines[run_key]["stages"], args.tolerance
+        )
+    else:
+        print(f"\nNo baseline for {run_key} (use --save-baseline)")
+
+    if args.save_baseline:
+        baselines[run_key] = record
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baselines, indent=2))
+        print(f"Baseline saved → {args.baseline} [{run_key}]")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
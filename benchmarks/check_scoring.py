@@ -0,0 +1,243 @@
+# benchmarks/check_scoring.py
+"""
+Array scoring / classification vs. the scalar originals: exact
+equivalence on random faults (values snapped onto every rule threshold
+included), plus the speed-up on the whole set.
+
+    compute_confidence      → compute_confidence_array
+    compute_priority        → compute_priority_array
+    classify_fault          → classify_fault_array
+    merger._classify_fault  → merger._classify_fault_array
+    merger._severity_from_physics → merger._severity_from_physics_array
+    merger.estimate_energy_loss   → merger.estimate_energy_loss_array
+    merger._aggregate_cluster     → merge_faults_spatially (per cluster)
+
+Exits 1 on any mismatch.
+
+Usage (from the repository root, as a module so `src` is importable;
+`python benchmarks/check_scoring.py` fails with ModuleNotFoundError):
+    python -m benchmarks.check_scoring
+    python -m benchmarks.check_scoring --n 1000000 --seed 3
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.faults.classifier import classify_fault, classify_fault_array
+from src.faults.codes import FAULT_TYPES, SEVERITIES
+from src.faults.confidence import compute_confidence, compute_confidence_array
+from src.faults.merger import (
+    _aggregate_cluster,
+    _classify_fault,
+    _classify_fault_array,
+    _connected_components,
+    _severity_from_physics,
+    _severity_from_physics_array,
+    estimate_energy_loss,
+    estimate_energy_loss_array,
+    merge_faults_spatially,
+)
+from src.faults.priority import compute_priority, compute_priority_array
+from src.config import settings
+
+# Every threshold the rules compare against
+DT_EDGES = (5.0, 8.0, 12.0, 20.0, 30.0, 35.0, 36.0, 38.0, 40.0)
+AREA_EDGES = (100, 120, 150, 400, 500, 600)
+
+
+def synthetic_columns(n, seed):
+    rng = np.random.default_rng(seed)
+
+    dt = np.round(rng.uniform(0, 70, n), 2)
+    area = rng.integers(1, 3000, n)
+    z = np.where(rng.random(n) < 0.5, 0.0, rng.uniform(-1, 8, n))
+    merge_count = rng.integers(1, 5, n)
+    severity = rng.integers(0, len(SEVERITIES), n)
+
+    # A quarter of the rows exactly on a threshold
+    snap = rng.random(n) < 0.25
+    dt[snap] = rng.choice(DT_EDGES, snap.sum())
+    snap = rng.random(n) < 0.25
+    area[snap] = rng.choice(AREA_EDGES, snap.sum())
+
+    return dt, area, z, merge_count, severity
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def check(name, scalar, array, report):
+    (expected, ts), (got, ta) = _timed(scalar), _timed(array)
+    bad = int(sum(a != b for a, b in zip(expected, got)))
+    report.append((name, len(expected), bad, ts, ta))
+    return bad
+
+
+def check_functions(n, seed):
+    dt, area, z, merge_count, severity = synthetic_columns(n, seed)
+    dtl, areal, zl = dt.tolist(), area.tolist(), z.tolist()
+    mcl, sevl = merge_count.tolist(), [SEVERITIES[s] for s in severity]
+
+    confidence = compute_confidence_array(dt, area, z)
+    confl = confidence.tolist()
+
+    report = []
+    check(
+        "compute_confidence",
+        lambda: [compute_confidence(*a) for a in zip(dtl, areal, zl)],
+        lambda: compute_confidence_array(dt, area, z).tolist(),
+        report,
+    )
+    check(
+        "compute_priority",
+        lambda: [
+            compute_priority(
+                {"severity": s, "confidence": c, "pixel_area": a}
+            )
+            for s, c, a in zip(sevl, confl, areal)
+        ],
+        lambda: compute_priority_array(severity, confidence, area).tolist(),
+        report,
+    )
+    check(
+        "classify_fault",
+        lambda: [
+            classify_fault(
+                {"pixel_area": a, "delta_t_max": d, "severity": s}
+            )
+            for a, d, s in zip(areal, dtl, sevl)
+        ],
+        lambda: [
+            FAULT_TYPES[c] for c in classify_fault_array(area, dt, severity)
+        ],
+        report,
+    )
+    check(
+        "merger._classify_fault",
+        lambda: [_classify_fault(*a) for a in zip(dtl, areal, mcl)],
+        lambda: [
+            FAULT_TYPES[c]
+            for c in _classify_fault_array(dt, area, merge_count)
+        ],
+        report,
+    )
+    check(
+        "merger._severity_from_physics",
+        lambda: [_severity_from_physics(*a) for a in zip(dtl, areal)],
+        lambda: [
+            SEVERITIES[c] for c in _severity_from_physics_array(dt, area)
+        ],
+        report,
+    )
+    check(
+        "merger.estimate_energy_loss",
+        lambda: [estimate_energy_loss(*a) for a in zip(dtl, areal)],
+        lambda: list(zip(*(
+            v.tolist() for v in estimate_energy_loss_array(dt, area)
+        ))),
+        report,
+    )
+    return report
+
+
+def synthetic_faults(n, seed):
+    """
+    Tile-level fault dicts at a density where about half merge.
+    """
+    dt, area, z, _, severity = synthetic_columns(n, seed)
+    rng = np.random.default_rng(seed + 1)
+
+    side = np.sqrt(n) * 2 * settings.MERGE_DISTANCE_METERS
+    xy = rng.uniform(0, side, size=(n, 2))
+    bx = rng.integers(0, 900, size=(n, 2))
+
+    return [
+        {
+            "tile_id": i // 50,
+            "fault_type": "HOTSPOT",
+            "severity": SEVERITIES[severity[i]],
+            "confidence": 30.0,
+            "delta_t_max": float(dt[i]),
+            "zscore_max": float(z[i]),
+            "pixel_area": int(area[i]),
+            "lon": float(xy[i, 0]),
+            "lat": float(xy[i, 1]),
+            "bbox": {
+                "x_min": int(bx[i, 0]), "y_min": int(bx[i, 1]),
+                "x_max": int(bx[i, 0]) + 20, "y_max": int(bx[i, 1]) + 20,
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def check_clusters(n, seed):
+    """
+    merge_faults_spatially vs. _aggregate_cluster on the same clusters.
+    Centroids are compared with a tolerance: the scalar path weights
+    them with float32 areas.
+    """
+    faults = synthetic_faults(n, seed)
+
+    def scalar():
+        xy = np.array([(f["lon"], f["lat"]) for f in faults])
+        labels = _connected_components(xy, settings.MERGE_DISTANCE_METERS)
+        clusters = [[] for _ in range(labels.max() + 1)]
+        for f, label in zip(faults, labels):
+            clusters[label].append(f)
+        return [_aggregate_cluster(c, i) for i, c in enumerate(clusters)]
+
+    (expected, ts), (got, ta) = _timed(scalar), _timed(
+        lambda: merge_faults_spatially(faults)
+    )
+
+    bad = 0
+    for a, b in zip(expected, got):
+        for key in a:
+            if key in ("lon", "lat"):
+                bad += abs(a[key] - b[key]) > 1e-6 * max(1.0, abs(a[key]))
+            else:
+                bad += a[key] != b[key]
+    bad += abs(len(expected) - len(got))
+
+    return ("merger._aggregate_cluster", len(expected), int(bad), ts, ta)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--clusters-n", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = check_functions(args.n, args.seed)
+    report.append(check_clusters(args.clusters_n, args.seed))
+
+    print(
+        f"{'function':<32}{'rows':>9}{'mismatch':>10}"
+        f"{'scalar':>10}{'array':>10}{'speedup':>9}"
+    )
+    for name, rows, bad, ts, ta in report:
+        print(
+            f"{name:<32}{rows:>9}{bad:>10}{ts:>9.3f}s{ta:>9.3f}s"
+            f"{ts / max(ta, 1e-9):>8.1f}x"
+        )
+
+    failed = [r[0] for r in report if r[2]]
+    if failed:
+        print(f"\nMISMATCH: {', '.join(failed)}")
+        sys.exit(1)
+    print("\nAll array versions match the scalar functions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# benchmarks/check_seams.py
+"""
+Seam handling of detect_faults: every hotspot of a synthetic ΔT mosaic
+must be reported by exactly one tile of the overlapping tile grid.
+
+Rectangular hotspots are scattered densely over the mosaic, so many lie
+in overlap bands or are cut by a tile edge. Each tile is detected on its
+slice of the same ΔT mosaic with a zero baseline, so the neighbours see
+identical pixels. A report belongs to the hotspot whose rectangle holds
+its centroid (a hotspot wider than the overlap band is reported as far
+as one tile sees it). A hotspot clear of the raster border counts as
+lost when no tile reports it, doubled when several do.
+
+    with seams     → ownership first, edges only on the raster border
+    without seams  → every tile edge treated as a raster edge (shown
+                     for comparison; loses seam hotspots)
+
+Exits 1 when the seam-aware rule loses or doubles a hotspot.
+
+Usage:
+    python -m benchmarks.check_seams
+    python -m benchmarks.check_seams --width 5000 --height 3000 --overlap 96 --seed 3
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+import numpy as np
+from affine import Affine
+
+from src.config import settings
+from src.faults.detector import detect_faults
+from src.io.tile_generator import iter_windows, window_core, window_seams
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+CELL = 80   # one hotspot per CELL × CELL cell, ≥ 2 px apart
+
+
+def synthetic_mosaic(width, height, seed):
+    """
+    ΔT mosaic with one rectangular hotspot per cell; returns it, the
+    hotspots as (x0, y0, x1, y1), max exclusive, and a map of hotspot
+    indices (-1 outside).
+    """
+    rng = np.random.default_rng(seed)
+    delta = np.zeros((height, width), dtype=np.float32)
+    index = np.full((height, width), -1, dtype=np.int32)
+    hot = settings.LOCAL_DT_THRESHOLD + 10.0
+
+    spots = []
+    for cy in range(0, height - CELL + 1, CELL):
+        for cx in range(0, width - CELL + 1, CELL):
+            while True:
+                w, h = rng.integers(8, 73, size=2)
+                # within the detector's area / aspect-ratio filters
+                if (
+                    settings.MIN_CLUSTER_AREA <= w * h
+                    <= settings.MAX_CLUSTER_AREA and max(w, h) <= 4 * min(w, h)
+                ):
+                    break
+            x0 = cx + 1 + int(rng.integers(0, CELL - 1 - w))
+            y0 = cy + 1 + int(rng.integers(0, CELL - 1 - h))
+            delta[y0:y0 + h, x0:x0 + w] = hot
+            index[y0:y0 + h, x0:x0 + w] = len(spots)
+            spots.append((x0, y0, x0 + w, y0 + h))
+
+    return delta, np.array(spots), index
+
+
+def detect_all(delta, index, with_seams):
+    """
+    Reports per hotspot index over the whole tile grid (-1: no hotspot).
+    """
+    height, width = delta.shape
+    reported = Counter()
+
+    for tile_id, win in enumerate(iter_windows(width, height)):
+        x, y = int(win.col_off), int(win.row_off)
+        tile = delta[y:y + int(win.height), x:x + int(win.width)]
+
+        faults = detect_faults(
+            tile,
+            Affine.translation(x, y),
+            tile_id,
+            core=window_core(win, width, height),
+            seams=window_seams(win, width, height) if with_seams else None,
+            baseline=np.zeros_like(tile),
+        )
+        reported.update(
+            index[faults["lat"].astype(int), faults["lon"].astype(int)]
+        )
+
+    return reported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2600)
+    parser.add_argument("--tile-size", type=int)
+    parser.add_argument("--overlap", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    settings.configure(tile_size=args.tile_size, overlap=args.overlap)
+
+    delta, spots, index = synthetic_mosaic(
+        args.width, args.height, args.seed
+    )
+
+    x0, y0, x1, y1 = spots.T
+    pad = settings.BORDER_PAD
+    inside = (
+        (x0 > pad) & (y0 > pad)
+        & (x1 < args.width - pad) & (y1 < args.height - pad)
+    )
+    expected = np.flatnonzero(inside).tolist()
+
+    print(
+        f"mosaic {args.width}x{args.height} | tile={settings.TILE_SIZE} "
+        f"overlap={settings.OVERLAP} pad={pad} | hotspots={len(expected)} "
+        f"(+{int((~inside).sum())} on the raster border)\n"
+    )
+    print(f"{'rule':<16}{'reported':>10}{'lost':>8}{'doubled':>9}{'extra':>8}")
+
+    failed = False
+    for name, with_seams in (("with seams", True), ("without seams", False)):
+        reported = detect_all(delta, index, with_seams)
+        lost = sum(1 for i in expected if reported[i] == 0)
+        doubled = sum(1 for i in expected if reported[i] > 1)
+        extra = sum(n for i, n in reported.items() if i not in expected)
+        print(
+            f"{name:<16}{sum(reported.values()):>10}{lost:>8}"
+            f"{doubled:>9}{extra:>8}"
+        )
+        if with_seams:
+            failed = bool(lost or doubled or extra)
+
+    if failed:
+        print("\nFAILED: hotspots lost or reported twice at tile seams")
+        sys.exit(1)
+    print("\nEvery hotspot is reported exactly once.")
+
+
+if __name__ == "__main__":
+    main()
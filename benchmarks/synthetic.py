@@ -0,0 +1,247 @@
+# benchmarks/synthetic.py
+"""
+Synthetic IR / RGB orthomosaic pairs for benchmarks.
+
+Panel rows are axis-aligned bands of panels (dark in RGB with bright
+cell-grid lines, warmer in IR); hotspots are hot discs injected on the
+panels. Rasters are written strip by strip, so large scenes do not need
+to fit in memory.
+
+Usage:
+    python -m benchmarks.synthetic out/ --width 8000 --height 6000
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from src.utils.hashing import params_digest
+
+# Defaults: 10 cm GSD, UTM 43N, tiled + deflate like a typical export
+SCENE_DEFAULTS = {
+    "width": 4096,
+    "height": 4096,
+    "gsd": 0.1,
+    "crs": "EPSG:32643",
+    "origin": (500000.0, 2000000.0),
+    "rgb_scale": 1,         # RGB pixels per IR pixel
+    "tiled": True,
+    "blocksize": 256,
+    "compress": "deflate",  # any GDAL codec, or None
+    "row_pitch": 80,        # IR px between panel-row starts
+    "row_height": 60,
+    "panel_width": 600,
+    "panel_gap": 40,
+    "hotspots": 300,
+    "nodata_collar": 200,   # IR columns of zeros on the left edge
+    "seed": 0,
+}
+
+STRIP_ROWS = 512
+
+# Bump when the rendering changes so cached scenes are regenerated
+SCENE_VERSION = 1
+
+
+def scene_params(**overrides):
+    unknown = set(overrides) - set(SCENE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown scene parameters: {sorted(unknown)}")
+    params = dict(SCENE_DEFAULTS)
+    params.update(overrides)
+    return params
+
+
+def _panels(p):
+    """
+    Panel rectangles (x0, y0, x1, y1) in IR pixels.
+    """
+    rects = []
+    for y0 in range(100, p["height"] - p["row_height"] - 100, p["row_pitch"]):
+        for x0 in range(
+            p["nodata_collar"] + 80,
+            p["width"] - p["panel_width"] - 80,
+            p["panel_width"] + p["panel_gap"],
+        ):
+            rects.append((x0, y0, x0 + p["panel_width"], y0 + p["row_height"]))
+    return np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+
+
+def _hotspots(p, panels, rng):
+    """
+    (cx, cy, r, dt) for hotspots placed inside random panels.
+    """
+    n = p["hotspots"] if len(panels) else 0
+    pick = panels[rng.integers(0, max(len(panels), 1), n)]
+    r = rng.integers(8, 16, n)
+    cx = rng.integers(pick[:, 0] + 20, pick[:, 2] - 20)
+    cy = rng.integers(pick[:, 1] + 15, np.maximum(pick[:, 3] - 15, pick[:, 1] + 16))
+    dt = rng.uniform(10, 45, n)
+    return np.stack([cx, cy, r, dt], axis=1)
+
+
+def _render_strip(p, panels, hotspots, y0, y1, rng):
+    """
+    IR (float32) and RGB (uint8, H×W×3) rows y0:y1 at IR resolution.
+    """
+    w = p["width"]
+    h = y1 - y0
+
+    ir = (30 + rng.normal(0, 0.5, (h, w))).astype("float32")
+    rgb = np.full((h, w, 3), 170, np.uint8) + rng.integers(
+        0, 20, (h, w, 3), dtype=np.uint8
+    )
+
+    for x0, py0, x1, py1 in panels:
+        a, b = max(py0, y0), min(py1, y1)
+        if a >= b:
+            continue
+        ir[a - y0:b - y0, x0:x1] += 10
+        rgb[a - y0:b - y0, x0:x1] = 40
+        rgb[a - y0:b - y0, x0:x1:12] = 200
+        mid = (py0 + py1) // 2
+        if a <= mid < b:
+            rgb[mid - y0 - 1:mid - y0 + 1, x0:x1] = 200
+
+    for cx, cy, r, dt in hotspots:
+        cx, cy, r = int(cx), int(cy), int(r)
+        a, b = max(cy - r, y0), min(cy + r + 1, y1)
+        if a >= b:
+            continue
+        yy, xx = np.ogrid[a:b, cx - r:cx + r + 1]
+        disc = (yy - cy) ** 2 + (xx - cx) ** 2 <= r * r
+        ir[a - y0:b - y0, cx - r:cx + r + 1][disc] += dt
+
+    ir[:, :p["nodata_collar"]] = 0
+    return ir, rgb
+
+
+def write_scene(out_dir, **overrides):
+    """
+    Write ir.tif / rgb.tif (+ scene.json) into out_dir and return
+    (ir_path, rgb_path, params). Existing files for the same parameters
+    are reused.
+    """
+    p = scene_params(**overrides)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    ir_path = out_dir / "ir.tif"
+    rgb_path = out_dir / "rgb.tif"
+    meta_path = out_dir / "scene.json"
+
+    key = params_digest({"version": SCENE_VERSION, **p})
+    if ir_path.exists() and rgb_path.exists() and meta_path.exists():
+        if json.loads(meta_path.read_text()).get("key") == key:
+            return ir_path, rgb_path, p
+
+    rng = np.random.default_rng(p["seed"])
+    panels = _panels(p)
+    hotspots = _hotspots(p, panels, rng)
+
+    s = p["rgb_scale"]
+    profile = {
+        "driver": "GTiff",
+        "crs": p["crs"],
+        "tiled": p["tiled"],
+    }
+    if p["tiled"]:
+        profile.update(blockxsize=p["blocksize"], blockysize=p["blocksize"])
+    if p["compress"]:
+        profile["compress"] = p["compress"]
+
+    ir_profile = dict(
+        profile,
+        width=p["width"],
+        height=p["height"],
+        count=1,
+        dtype="float32",
+        transform=from_origin(*p["origin"], p["gsd"], p["gsd"]),
+    )
+    rgb_profile = dict(
+        profile,
+        width=p["width"] * s,
+        height=p["height"] * s,
+        count=3,
+        dtype="uint8",
+        photometric="RGB",
+        transform=from_origin(*p["origin"], p["gsd"] / s, p["gsd"] / s),
+    )
+
+    with rasterio.open(ir_path, "w", **ir_profile) as ir_ds, \
+            rasterio.open(rgb_path, "w", **rgb_profile) as rgb_ds:
+
+        for y0 in range(0, p["height"], STRIP_ROWS):
+            y1 = min(y0 + STRIP_ROWS, p["height"])
+            ir, rgb = _render_strip(p, panels, hotspots, y0, y1, rng)
+
+            ir_ds.write(
+                ir, 1,
+                window=rasterio.windows.Window(0, y0, p["width"], y1 - y0),
+            )
+
+            if s > 1:
+                rgb = rgb.repeat(s, axis=0).repeat(s, axis=1)
+            rgb_ds.write(
+                np.moveaxis(rgb, -1, 0),
+                window=rasterio.windows.Window(
+                    0, y0 * s, p["width"] * s, (y1 - y0) * s
+                ),
+            )
+
+    meta_path.write_text(json.dumps({
+        "key": key,
+        "params": p,
+        "panels": len(panels),
+        "hotspots": len(hotspots),
+    }, indent=2))
+
+    return ir_path, rgb_path, p
+
+
+def add_scene_arguments(parser):
+    """
+    --width, --height, ... for every SCENE_DEFAULTS entry.
+    """
+    for name, default in SCENE_DEFAULTS.items():
+        if name in ("crs", "origin"):
+            continue
+        flag = "--" + name.replace("_", "-")
+        if isinstance(default, bool):
+            parser.add_argument(
+                flag, type=lambda v: v.lower() in ("1", "true", "yes"),
+                default=default, metavar="BOOL",
+            )
+        elif default is None or isinstance(default, str):
+            parser.add_argument(
+                flag, type=lambda v: None if v.lower() == "none" else v,
+                default=default,
+            )
+        else:
+            parser.add_argument(flag, type=type(default), default=default)
+
+
+def scene_overrides(args):
+    return {
+        name: getattr(args, name)
+        for name in SCENE_DEFAULTS
+        if hasattr(args, name)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir")
+    add_scene_arguments(parser)
+    args = parser.parse_args()
+
+    ir_path, rgb_path, p = write_scene(args.out_dir, **scene_overrides(args))
+    print(f"{ir_path}\n{rgb_path}")
+
+
+if __name__ == "__main__":
+    main()
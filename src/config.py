@@ -1,5 +1,14 @@
 # src/config.py
+#
+# Module constants below are the defaults. Pipeline code reads the
+# resolved values through `settings` (bottom of this file):
+#
+#     defaults  <  YAML file  <  SOLAR_POLICE_* env vars  <  CLI overrides
+#
+# Importing this module touches no files; the input TIFFs are looked up
+# in DATA_DIR the first time IR_PATH / RGB_PATH are read.
 
+import os
 from pathlib import Path
 
 # Project root
@@ -9,37 +18,251 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data" / "raw"
 
 # File discovery (supports .tif and .tiff)
-def find_tiff(prefix: str) -> Path:
+def find_tiff(prefix: str, data_dir=None) -> Path:
+    data_dir = Path(data_dir or DATA_DIR)
     for ext in [".tif", ".tiff", ".TIF", ".TIFF"]:
-        candidate = DATA_DIR / f"{prefix}{ext}"
+        candidate = data_dir / f"{prefix}{ext}"
         if candidate.exists():
             return candidate
     raise FileNotFoundError(
-        f"No TIFF found for '{prefix}' in {DATA_DIR}"
+        f"No TIFF found for '{prefix}' in {data_dir}"
     )
 
-RGB_PATH = find_tiff("rgb")
-IR_PATH = find_tiff("ir")
+# IR_PATH / RGB_PATH default to find_tiff("ir" / "rgb") in DATA_DIR,
+# looked up on first use (see `settings` and the module __getattr__)
 
 # Output paths
 OUTPUT_DIR = PROJECT_ROOT / "outputs"
 DEBUG_TILE_DIR = OUTPUT_DIR / "tiles_debug"
 LOG_DIR = OUTPUT_DIR / "logs"
+CACHE_DIR = OUTPUT_DIR / "cache"
+PANEL_MASK_CACHE_DIR = CACHE_DIR / "panel_masks"
+CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+PROFILE_DIR = OUTPUT_DIR / "profile"
+BACKGROUND_CACHE_DIR = CACHE_DIR / "background"
+DIGEST_MEMO = CACHE_DIR / "digests.json"   # input content hashes, shared
+ANNOTATED_DIR = OUTPUT_DIR / "annotated" / "ir"
+GEOMETRY_LAYER = OUTPUT_DIR / "geometry" / "panels.npz"   # step-3 output
 
 # Tile config
 TILE_SIZE = 1024
 OVERLAP = 64
 DEBUG_TILE_LIMIT = 10
+TILE_READ_MODE = "blocked"   # "blocked" (single multi-band read) | "per_band"
+BLOCK_CACHE_SIZE = 64        # decoded GeoTIFF blocks kept per dataset (LRU)
+MAX_OPEN_DATASETS = 8        # rasterio handles kept open per worker
+SNAP_TILES_TO_BLOCKS = False # align tile steps to the TIFF block grid
+TILE_OWNERSHIP = True        # each overlap pixel owned by one tile's core
+SKIP_EMPTY_TILES = True      # skip no-data tiles of sparse / masked rasters
+COVERAGE_FACTOR = 16         # native pixels per mask-overview cell
 IR_BAND_INDEX = 1   # change to 2 or 3 after inspection
 RGB_BAND_INDICES = [1, 2, 3]
+RGB_RESAMPLING = "nearest"   # decimated RGB reads at IR resolution
+
+# RGB resolution for the step-4 panel mask:
+#   "ir"       → RGB footprint resampled to the IR tile grid
+#   "overview" → coarsest RGB overview still finer than the IR GSD
+#   "native"   → full-resolution RGB
+#   "layer"    → rasterized from the step-3 geometry layer (no RGB read)
+RGB_MASK_MODE = "ir"
+OVERVIEW_FACTORS = [2, 4, 8, 16]
+BUILD_RGB_OVERVIEWS = False
+USE_PANEL_MASK_CACHE = True  # reuse step-4 panel masks across reruns
+GEOMETRY_INDEX_CELL = None   # layer grid-index cell (map units); None = auto
 LOG_LEVEL = "INFO"
 
+# --- STEP-6.2: Annotated tiles ---
+ANNOTATION_FORMAT = "png"     # "png" | "jpg" | "webp"
+PNG_COMPRESSION = 1           # 0 (fast) … 9 (small)
+ANNOTATION_QUALITY = 90       # JPEG / WebP
+ANNOTATE_ONLY_FAULTS = False  # skip tiles without detections
+ANNOTATION_WORKERS = 2        # background writer threads
+ANNOTATION_QUEUE = 16         # tiles queued before the loop waits
+
 # --- STEP-4: Fault detection thresholds ---
 
+NORMALIZATION_MEDIAN = "exact"  # "exact" (partition) | "histogram"
+NORMALIZATION_REFERENCE = "tile"  # "tile" (per-tile median / std) | "mosaic"
+
+LOCAL_DT_THRESHOLD = 7.5      # ΔT above the local baseline
+MIN_CLUSTER_AREA = 120        # px
+MAX_CLUSTER_AREA = 2000       # px
+BORDER_PAD = 8                # px suppressed along tile borders
+BASELINE_METHOD = "gaussian"  # "gaussian" | "pyramid" | "box" | "blocks"
+BASELINE_KSIZE = 51           # px, Gaussian kernel the others approximate
+BASELINE_PYRAMID_LEVELS = 2   # "pyramid": pyrDown steps before blurring
+BASELINE_BOX_PASSES = 1       # "box": 1 (fastest) … 3 (≈ Gaussian)
+BACKGROUND_BLOCK = 64         # px, mosaic background model block
+BACKGROUND_DECIMATION = 4     # read every n-th pixel to build the model
+BACKGROUND_CONTEXT = None     # px, normalization neighbourhood (None → TILE_SIZE)
+MERGE_DISTANCE_METERS = 6.0   # STEP-5.5 spatial merge radius (metres, any CRS)
+GSD_METERS = None             # m per map unit for IR without a CRS (None → 1)
+
 HOTSPOT_ZSCORE = 4.0          # cell anomaly threshold
 SUBSTRING_MIN_PIXELS = 40     # elongated hotspot
 PANEL_MIN_AREA_RATIO = 0.30   # ignore tiny panel tiles
 
 # Output paths
-FAULTS_CSV = "outputs/faults/faults.csv"
-FAULTS_GEOJSON = "outputs/faults/faults.geojson"
+FAULTS_CSV = OUTPUT_DIR / "faults" / "faults.csv"
+FAULTS_GEOJSON = OUTPUT_DIR / "faults" / "faults.geojson"
+EXPORT_GEOJSON_MODE = "pretty"    # "pretty" (indent=2) | "compact" | "seq" | "ndjson"
+EXPORT_GZIP = False
+FAULT_STORE_DIR = OUTPUT_DIR / "faults" / "store"   # tile-level detections
+FAULT_STORE_CHUNK = 100_000                         # rows per spilled chunk
+
+
+# ============================================================
+# Resolved settings
+# ============================================================
+ENV_PREFIX = "SOLAR_POLICE_"
+CONFIG_ENV = ENV_PREFIX + "CONFIG"   # path of a YAML settings file
+
+# Paths that follow their base directory unless set explicitly
+_DERIVED = {
+    "DEBUG_TILE_DIR": ("OUTPUT_DIR", "tiles_debug"),
+    "LOG_DIR": ("OUTPUT_DIR", "logs"),
+    "CACHE_DIR": ("OUTPUT_DIR", "cache"),
+    "PANEL_MASK_CACHE_DIR": ("CACHE_DIR", "panel_masks"),
+    "CHECKPOINT_DIR": ("CACHE_DIR", "checkpoints"),
+    "PROFILE_DIR": ("OUTPUT_DIR", "profile"),
+    "BACKGROUND_CACHE_DIR": ("CACHE_DIR", "background"),
+    "DIGEST_MEMO": ("CACHE_DIR", "digests.json"),
+    "ANNOTATED_DIR": ("OUTPUT_DIR", "annotated/ir"),
+    "GEOMETRY_LAYER": ("OUTPUT_DIR", "geometry/panels.npz"),
+    "FAULTS_CSV": ("OUTPUT_DIR", "faults/faults.csv"),
+    "FAULTS_GEOJSON": ("OUTPUT_DIR", "faults/faults.geojson"),
+    "FAULT_STORE_DIR": ("OUTPUT_DIR", "faults/store"),
+}
+
+_INPUTS = {"IR_PATH": "ir", "RGB_PATH": "rgb"}
+
+
+def _defaults():
+    values = {
+        k: v for k, v in globals().items()
+        if k.isupper() and not k.startswith("_")
+        and k not in ("ENV_PREFIX", "CONFIG_ENV")
+    }
+    values.update(dict.fromkeys(_INPUTS))
+    return values
+
+
+def _is_path(name):
+    return name.endswith(("_DIR", "_PATH", "_ROOT")) or name in (
+        "FAULTS_CSV", "FAULTS_GEOJSON", "GEOMETRY_LAYER", "DIGEST_MEMO"
+    )
+
+
+def _read_yaml(path):
+    import yaml
+
+    with open(path) as f:
+        doc = yaml.safe_load(f) or {}
+
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: expected a mapping of settings")
+
+    return {str(k).upper(): v for k, v in doc.items()}
+
+
+def _read_env():
+    import yaml
+
+    return {
+        k[len(ENV_PREFIX):]: yaml.safe_load(v)
+        for k, v in os.environ.items()
+        if k.startswith(ENV_PREFIX) and k != CONFIG_ENV
+    }
+
+
+class Settings:
+    """
+    Lazily resolved configuration.
+
+    Nothing is read until the first attribute access; `configure()`
+    (CLI) resets the resolution. Worker processes receive the resolved
+    values via `export()` / `load()` instead of re-reading files.
+    """
+
+    def __init__(self):
+        self._config_file = None
+        self._overrides = {}
+        self._values = None
+
+    def configure(self, config_file=None, **overrides):
+        """
+        Select a YAML file and explicit overrides (None values ignored).
+        """
+        self._config_file = config_file
+        self._overrides = {
+            k.upper(): v for k, v in overrides.items() if v is not None
+        }
+        self._values = None
+        return self
+
+    def load(self, values):
+        """
+        Adopt already resolved values (see `export`).
+        """
+        self._values = dict(values)
+        return self
+
+    def export(self):
+        """
+        Picklable dict of every resolved value.
+        """
+        return dict(self._resolve())
+
+    def _resolve(self):
+        if self._values is not None:
+            return self._values
+
+        defaults = _defaults()
+        layers = {}
+
+        config_file = self._config_file or os.environ.get(CONFIG_ENV)
+        if config_file:
+            layers.update(_read_yaml(config_file))
+        layers.update(_read_env())
+        layers.update(self._overrides)
+
+        unknown = sorted(set(layers) - set(defaults))
+        if unknown:
+            raise ValueError(f"Unknown settings: {unknown}")
+
+        values = dict(defaults)
+        values.update(layers)
+
+        for name, (base, rel) in _DERIVED.items():
+            if name not in layers:
+                values[name] = Path(values[base]) / rel
+
+        for name, v in values.items():
+            if v is not None and _is_path(name):
+                values[name] = Path(v)
+
+        self._values = values
+        return values
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        values = self._resolve()
+        if name not in values:
+            raise AttributeError(f"Unknown setting '{name}'")
+
+        if values[name] is None and name in _INPUTS:
+            values[name] = find_tiff(_INPUTS[name], values["DATA_DIR"])
+
+        return values[name]
+
+
+settings = Settings()
+
+
+def __getattr__(name):
+    # Backwards compatible `from src.config import IR_PATH` (resolved lazily)
+    if name in _INPUTS:
+        return getattr(settings, name)
+    raise AttributeError(f"module 'src.config' has no attribute '{name}'")
@@ -0,0 +1,95 @@
+# src/faults/baseline.py
+
+import math
+
+import cv2
+
+from src.config import settings
+
+# Local ΔT baseline estimators (settings.BASELINE_METHOD):
+#   "gaussian" → GaussianBlur(KSIZE × KSIZE), the reference
+#   "pyramid"  → pyrDown × LEVELS, the same blur at that scale, upsample
+#   "box"      → box-filter passes of the same σ (running sums)
+#   "blocks"   → median-of-blocks surface of the mosaic, sampled per tile
+#                (thermal.background model; the worker passes it in)
+BASELINE_METHODS = ("gaussian", "pyramid", "box", "blocks")
+
+
+def baseline_params():
+    """
+    Parameters that change the baseline (part of detector_params).
+    """
+    method = settings.BASELINE_METHOD
+    params = {"method": method, "ksize": settings.BASELINE_KSIZE}
+    if method == "pyramid":
+        params["levels"] = settings.BASELINE_PYRAMID_LEVELS
+    elif method == "box":
+        params["passes"] = settings.BASELINE_BOX_PASSES
+    elif method == "blocks":
+        params["block"] = settings.BACKGROUND_BLOCK
+        params["decimation"] = settings.BACKGROUND_DECIMATION
+    return params
+
+
+def _sigma(ksize):
+    # OpenCV's σ for sigmaX = 0
+    return 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+
+
+def _gaussian(delta_t, ksize):
+    return cv2.GaussianBlur(delta_t, (ksize, ksize), 0)
+
+
+def _pyramid(delta_t, ksize, levels):
+    h, w = delta_t.shape
+    small, done = delta_t, 0
+    while done < levels and min(small.shape) >= 2 * ksize:
+        small = cv2.pyrDown(small)
+        done += 1
+
+    # Each pyrDown blurs by σ = 1 at its input scale; blur the rest here
+    var = _sigma(ksize) ** 2 - sum(4 ** i for i in range(done))
+    sigma = math.sqrt(max(var, 1.0)) / 2 ** done
+    small = cv2.GaussianBlur(small, (0, 0), sigma)
+
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def _box(delta_t, ksize, passes):
+    # `passes` box filters (running sums, O(1) per pixel) with the same
+    # total σ; more passes → closer to the Gaussian, proportionally slower
+    width = int(round(math.sqrt(12 * _sigma(ksize) ** 2 / passes + 1)))
+    width += 1 - width % 2
+    out = delta_t
+    for _ in range(passes):
+        out = cv2.blur(out, (width, width))
+    return out
+
+
+def estimate_baseline(delta_t, method=None):
+    """
+    Local ΔT baseline of one tile (float32, same shape).
+
+    "blocks" needs the mosaic surface and cannot be estimated from the
+    tile alone; callers sample thermal.background instead.
+    """
+
+    method = method or settings.BASELINE_METHOD
+    ksize = settings.BASELINE_KSIZE
+
+    if method == "gaussian":
+        return _gaussian(delta_t, ksize)
+    if method == "pyramid":
+        return _pyramid(delta_t, ksize, settings.BASELINE_PYRAMID_LEVELS)
+    if method == "box":
+        return _box(delta_t, ksize, settings.BASELINE_BOX_PASSES)
+    if method == "blocks":
+        raise ValueError(
+            "The 'blocks' baseline is sampled from the mosaic background "
+            "surface; pass it to detect_faults(baseline=...)"
+        )
+
+    raise ValueError(
+        f"Unknown baseline method '{method}', "
+        f"expected one of {BASELINE_METHODS}"
+    )
@@ -1,5 +1,10 @@
 # src/faults/classifier.py
 
+import numpy as np
+
+from src.faults.codes import FAULT_TYPE_CODES, SEVERITY_CODES
+
+
 def classify_fault(fault):
     area = fault["pixel_area"]
     dt = fault["delta_t_max"]
@@ -27,3 +32,26 @@ def classify_fault(fault):
     # Default
     # ---------------------------------------
     return "PANEL_HOTSPOT"
+
+
+def classify_fault_array(pixel_area, delta_t_max, severity):
+    """
+    `classify_fault` over whole arrays: severity as codes in, fault
+    type codes (FAULT_TYPES) out. Rules in the same order.
+    """
+    area = np.asarray(pixel_area)
+    dt = np.asarray(delta_t_max)
+
+    return np.select(
+        [
+            (area < 120) & (dt >= 36),
+            (area >= 600) & (dt >= 38),
+            np.asarray(severity) == SEVERITY_CODES["CRITICAL"],
+        ],
+        [
+            FAULT_TYPE_CODES["CELL_HOTSPOT"],
+            FAULT_TYPE_CODES["JUNCTION_BOX_HOTSPOT"],
+            FAULT_TYPE_CODES["JUNCTION_BOX_HOTSPOT"],
+        ],
+        FAULT_TYPE_CODES["PANEL_HOTSPOT"],
+    ).astype(np.int8)
@@ -0,0 +1,12 @@
+# src/faults/codes.py
+
+# Enum codes of the categorical fault columns (FaultTable, FaultStore)
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+SEVERITY_CODES = {s: i for i, s in enumerate(SEVERITIES)}
+
+# "HOTSPOT" is the tile-level type, refined post-merge
+FAULT_TYPES = (
+    "HOTSPOT", "PANEL_HOTSPOT", "CELL_HOTSPOT", "JUNCTION_BOX_HOTSPOT",
+)
+FAULT_TYPE_CODES = {t: i for i, t in enumerate(FAULT_TYPES)}
@@ -1,5 +1,10 @@
 # src/faults/confidence.py
 
+import numpy as np
+
+from src.utils.numeric import py_round
+
+
 def compute_confidence(delta_t_max, pixel_area, zscore_max):
     severity_score = max(0.0, min(1.0, (delta_t_max - 5.0) / 35.0))
     spatial_score = max(0.0, min(1.0, pixel_area / 500.0))
@@ -17,3 +22,29 @@ def compute_confidence(delta_t_max, pixel_area, zscore_max):
     ) * 100.0
 
     return round(min(confidence, 85.0), 1)  # ← cap
+
+
+def compute_confidence_array(delta_t_max, pixel_area, zscore_max):
+    """
+    `compute_confidence` over whole arrays (NaN z-score = missing).
+    """
+    delta_t_max = np.asarray(delta_t_max, dtype=np.float64)
+    pixel_area = np.asarray(pixel_area, dtype=np.float64)
+    zscore_max = np.asarray(zscore_max, dtype=np.float64)
+
+    severity_score = np.clip((delta_t_max - 5.0) / 35.0, 0.0, 1.0)
+    spatial_score = np.clip(pixel_area / 500.0, 0.0, 1.0)
+
+    stat_score = np.select(
+        [np.isnan(zscore_max) | (zscore_max == 0.0)],
+        [0.25],
+        np.minimum(1.0, zscore_max / 5.0),
+    )
+
+    confidence = (
+        0.45 * severity_score +
+        0.30 * spatial_score +
+        0.25 * stat_score
+    ) * 100.0
+
+    return py_round(np.minimum(confidence, 85.0), 1)
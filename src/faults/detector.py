@@ -2,23 +2,122 @@
 
 import numpy as np
 import cv2
-from src.faults.confidence import compute_confidence
 
-# --------------------------------------------------
-# Detection thresholds (LOCAL ΔT based)
-# --------------------------------------------------
-LOCAL_DT_THRESHOLD = 7.5
-MIN_CLUSTER_AREA = 120
-MAX_CLUSTER_AREA = 2000
-BORDER_PAD = 8
+from src.faults.baseline import baseline_params, estimate_baseline
+from src.faults.codes import FAULT_TYPE_CODES, SEVERITY_CODES
+from src.faults.confidence import compute_confidence_array
+from src.faults.table import FaultTable
+from src.config import settings
+from src.utils.numeric import py_round
+from src.utils.profiling import count, stage
 
 
-def detect_faults(delta_t, transform, tile_id, panel_mask=None):
+def detector_params():
     """
-    Detect thermal faults in ONE IR tile.
+    All parameters that change tile-level detections (e.g. for run keys).
+    Detection thresholds (LOCAL ΔT based) come from settings.
     """
+    return {
+        "local_dt_threshold": settings.LOCAL_DT_THRESHOLD,
+        "min_cluster_area": settings.MIN_CLUSTER_AREA,
+        "max_cluster_area": settings.MAX_CLUSTER_AREA,
+        "border_pad": settings.BORDER_PAD,
+        "edge_rule": "raster",   # seams are resolved by ownership
+        "baseline": baseline_params(),
+    }
 
-    faults = []
+
+def _reject(keep, condition, name):
+    """
+    keep &= ~condition, counting components newly rejected by `name`.
+    """
+    count(f"rejected_{name}", int((keep & condition).sum()))
+    keep &= ~condition
+
+
+def _seam_axis(start, end, centre, core, seams, length, pad):
+    """
+    Edge / ownership verdicts of components along one tile axis.
+
+    start, end : component extent (end exclusive), centre its centroid
+    core       : (lo, hi) owned by this tile
+    seams      : window_seams entry for this axis, None → every tile
+                 edge is a raster edge
+
+    Returns (edge, cut, owned):
+        edge  → touches the raster border (rejected by every tile)
+        cut   → touches a seam; a neighbour sees more of it
+        owned → this tile reports it, provided it is not cut here. The
+                tile whose core holds the centroid owns it, unless that
+                tile cuts it at its seam with this one: then it is
+                handed over to this tile.
+
+    A component wider than the overlap band (less 2 × pad) is cut by
+    both tiles of the seam; the lower one reports what it sees of it.
+    """
+
+    low_inner, high_inner, prev_edge, next_edge = (
+        seams or (False, False, None, None)
+    )
+    near_low = start <= pad
+    near_high = end >= length - pad
+
+    edge = (near_low & (not low_inner)) | (near_high & (not high_inner))
+    cut = (near_low & low_inner) | (near_high & high_inner)
+
+    lo, hi = core
+    owned = (centre >= lo) & (centre < hi)
+    if prev_edge is not None:
+        owned |= (centre < lo) & (end >= prev_edge - pad)
+        owned &= ~(near_low & (end >= prev_edge - pad))
+    if next_edge is not None:
+        owned |= (centre >= hi) & (start <= next_edge + pad)
+        spans = near_high & high_inner & (start <= next_edge + pad)
+        owned |= spans
+        cut &= ~spans
+
+    return edge, cut, owned
+
+
+def _label_reductions(labels, hotspot, num_labels, *images):
+    """
+    Per-label max and mean of each image, from the hotspot pixels only
+    (labels are 0 elsewhere). Same values as ndimage.maximum / mean
+    without their full-tile sort.
+    """
+    lab = labels[hotspot]
+    n = np.bincount(lab, minlength=num_labels)
+
+    out = []
+    for img in images:
+        values = img[hotspot]
+        peak = np.full(num_labels, -np.inf, dtype=values.dtype)
+        np.maximum.at(peak, lab, values)
+        mean = np.bincount(lab, weights=values, minlength=num_labels)
+        out.append((peak, mean / np.maximum(n, 1)))
+    return out
+
+
+def detect_faults(
+    delta_t, transform, tile_id, panel_mask=None, core=None, seams=None,
+    baseline=None,
+):
+    """
+    Detect thermal faults in ONE IR tile; returns a tile-level FaultTable.
+
+    core     : optional tile-local (x0, y0, x1, y1) ownership region; only
+               components whose centroid falls inside it are emitted, so a
+               hotspot in an overlap band is reported by exactly one tile.
+    seams    : tile edges shared with a neighbour (io.tile_generator.
+               window_seams), used with core. Border suppression and edge
+               rejection then apply to raster edges only; a hotspot cut
+               by a seam is reported by the neighbour that sees it whole.
+               Without it every tile edge is treated as a raster edge.
+    baseline : precomputed local ΔT baseline (e.g. sampled from the mosaic
+               background); estimated with settings.BASELINE_METHOD when None.
+    """
+
+    faults = FaultTable()
 
     if delta_t is None:
         return faults
@@ -28,6 +127,10 @@ def detect_faults(delta_t, transform, tile_id, panel_mask=None):
 
     h, w = delta_t.shape
 
+    pad = settings.BORDER_PAD
+    if pad < 0:
+        raise ValueError(f"BORDER_PAD must be >= 0, got {pad}")
+
     # --------------------------------------------------
     # Panel mask fail-safe
     # --------------------------------------------------
@@ -38,24 +141,38 @@ def detect_faults(delta_t, transform, tile_id, panel_mask=None):
     # --------------------------------------------------
     # LOCAL BASELINE REMOVAL
     # --------------------------------------------------
-    baseline = cv2.GaussianBlur(delta_t, (51, 51), 0)
-    delta_local = delta_t - baseline
+    with stage("detect.baseline"):
+        if baseline is None:
+            baseline = estimate_baseline(delta_t)
+        delta_local = delta_t - baseline
 
     # --------------------------------------------------
     # Hotspot mask
     # --------------------------------------------------
     hotspot_mask = (
-        (delta_local > LOCAL_DT_THRESHOLD) &
+        (delta_local > settings.LOCAL_DT_THRESHOLD) &
         (panel_mask if panel_mask is not None else True)
     ).astype(np.uint8)
 
     # --------------------------------------------------
-    # TILE BORDER SUPPRESSION
+    # TILE BORDER SUPPRESSION (raster edges only)
     # --------------------------------------------------
-    hotspot_mask[:BORDER_PAD, :] = 0
-    hotspot_mask[-BORDER_PAD:, :] = 0
-    hotspot_mask[:, :BORDER_PAD] = 0
-    hotspot_mask[:, -BORDER_PAD:] = 0
+    seams_x, seams_y = (
+        seams if core is not None and seams is not None else (None, None)
+    )
+    left, right = seams_x[:2] if seams_x else (False, False)
+    top, bottom = seams_y[:2] if seams_y else (False, False)
+
+    # pad = 0 disables it ([-0:] would be the whole tile)
+    if pad > 0:
+        if not top:
+            hotspot_mask[:pad, :] = 0
+        if not bottom:
+            hotspot_mask[-pad:, :] = 0
+        if not left:
+            hotspot_mask[:, :pad] = 0
+        if not right:
+            hotspot_mask[:, -pad:] = 0
 
     if hotspot_mask.sum() == 0:
         return faults
@@ -63,101 +180,109 @@ def detect_faults(delta_t, transform, tile_id, panel_mask=None):
     # --------------------------------------------------
     # Connected components
     # --------------------------------------------------
-    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
-        hotspot_mask, connectivity=8
+    with stage("detect.components"):
+        num_labels, labels, stats, centroids = (
+            cv2.connectedComponentsWithStats(hotspot_mask, connectivity=8)
+        )
+    count("components_found", num_labels - 1)
+
+    # --------------------------------------------------
+    # Per-component filters, vectorized over all labels
+    # --------------------------------------------------
+    labels_idx = np.arange(1, num_labels)
+    area = stats[1:, cv2.CC_STAT_AREA]
+    x = stats[1:, cv2.CC_STAT_LEFT]
+    y = stats[1:, cv2.CC_STAT_TOP]
+    w_box = stats[1:, cv2.CC_STAT_WIDTH]
+    h_box = stats[1:, cv2.CC_STAT_HEIGHT]
+
+    keep = np.ones(num_labels - 1, dtype=bool)
+
+    _reject(keep, (
+        (area < settings.MIN_CLUSTER_AREA) |
+        (area > settings.MAX_CLUSTER_AREA)
+    ), "area")
+
+    # OVERLAP OWNERSHIP, then EDGE-CLUSTER REJECTION
+    cx = centroids[1:, 0].astype(int)
+    cy = centroids[1:, 1].astype(int)
+    edge_x, cut_x, owned_x = _seam_axis(
+        x, x + w_box, cx, (0, w) if core is None else core[0::2],
+        seams_x, w, pad,
     )
+    edge_y, cut_y, owned_y = _seam_axis(
+        y, y + h_box, cy, (0, h) if core is None else core[1::2],
+        seams_y, h, pad,
+    )
+    if core is not None:
+        _reject(keep, ~(owned_x & owned_y), "not_owned")
+        _reject(keep, cut_x | cut_y, "seam")
+    _reject(keep, edge_x | edge_y, "edge")
 
-    for label in range(1, num_labels):
-
-        area = int(stats[label, cv2.CC_STAT_AREA])
-        if area < MIN_CLUSTER_AREA or area > MAX_CLUSTER_AREA:
-            continue
-
-        x = int(stats[label, cv2.CC_STAT_LEFT])
-        y = int(stats[label, cv2.CC_STAT_TOP])
-        w_box = int(stats[label, cv2.CC_STAT_WIDTH])
-        h_box = int(stats[label, cv2.CC_STAT_HEIGHT])
-
-        # --------------------------------------------------
-        # EDGE-CLUSTER REJECTION
-        # --------------------------------------------------
-        if (
-            x <= BORDER_PAD or
-            y <= BORDER_PAD or
-            x + w_box >= w - BORDER_PAD or
-            y + h_box >= h - BORDER_PAD
-        ):
-            continue
-
-        # --------------------------------------------------
-        # TILE-SPANNING REJECTION (CRITICAL FIX)
-        # --------------------------------------------------
-        if w_box > 0.85 * w or h_box > 0.85 * h:
-            continue
-
-        bbox = {
-            "x_min": x,
-            "y_min": y,
-            "x_max": x + w_box,
-            "y_max": y + h_box,
-        }
-
-        # --------------------------------------------------
-        # GEOMETRIC FILTER
-        # --------------------------------------------------
-        aspect_ratio = w_box / max(h_box, 1)
-        if aspect_ratio > 6.0 or aspect_ratio < 0.15:
-            continue
-
-        cluster_mask = labels == label
-
-        # --------------------------------------------------
-        # PHYSICS
-        # --------------------------------------------------
-        peak_local_dt = float(delta_local[cluster_mask].max())
-        mean_local = float(delta_local[cluster_mask].mean())
-        peak_raw_dt = float(delta_t[cluster_mask].max())
-
-        # Reject diffuse heating
-        if mean_local <= 0.6 * peak_local_dt:
-            continue
-
-        # --------------------------------------------------
-        # GEO
-        # --------------------------------------------------
-        cx, cy = centroids[label]
-        lon, lat = transform * (int(cx), int(cy))
-
-        # --------------------------------------------------
-        # Tile-level severity
-        # --------------------------------------------------
-        severity = (
-            "HIGH"   if peak_local_dt >= 12.0 else
-            "MEDIUM" if peak_local_dt >= 8.0 else
-            "LOW"
-        )
+    # TILE-SPANNING REJECTION (CRITICAL FIX)
+    _reject(keep, (w_box > 0.85 * w) | (h_box > 0.85 * h), "span")
+
+    # GEOMETRIC FILTER
+    aspect_ratio = w_box / np.maximum(h_box, 1)
+    _reject(keep, (aspect_ratio > 6.0) | (aspect_ratio < 0.15), "aspect")
 
-        confidence = compute_confidence(
-            delta_t_max=peak_local_dt,
-            pixel_area=area,
-            zscore_max=0.0,
+    if not keep.any():
+        return faults
+
+    # --------------------------------------------------
+    # PHYSICS — one labelled reduction per statistic
+    # --------------------------------------------------
+    index = labels_idx[keep]
+    with stage("detect.physics"):
+        (peak_local, mean_local), (peak_raw, _) = _label_reductions(
+            labels, hotspot_mask.astype(bool), num_labels, delta_local, delta_t
         )
+    peak_local, mean_local = peak_local[index], mean_local[index]
+    peak_raw = peak_raw[index]
+
+    # Reject diffuse heating
+    physical = mean_local > 0.6 * peak_local
+    count("rejected_diffuse", int((~physical).sum()))
+    count("faults_emitted", int(physical.sum()))
+
+    index = index[physical]
+    j = index - 1
+    n = len(index)
 
-        faults.append({
-            "tile_id": tile_id,
-            "fault_type": "HOTSPOT",   # refined post-merge
-            "severity": severity,
-            "confidence": confidence,
+    # --------------------------------------------------
+    # GEO (component centroid, truncated to its pixel)
+    # --------------------------------------------------
+    cx, cy = centroids[index].astype(int).T
+    lon, lat = transform * (cx, cy)
+
+    # --------------------------------------------------
+    # Tile-level severity
+    # --------------------------------------------------
+    peak_local_dt = peak_local[physical].astype(np.float64)
+    severity = np.select(
+        [peak_local_dt >= 12.0, peak_local_dt >= 8.0],
+        [SEVERITY_CODES["HIGH"], SEVERITY_CODES["MEDIUM"]],
+        SEVERITY_CODES["LOW"],
+    )
 
-            # Physics
-            "delta_t_max": round(peak_raw_dt, 2),
-            "zscore_max": 0.0,
-            "pixel_area": area,
+    return FaultTable({
+        "tile_id": np.full(n, tile_id),
+        "fault_type": np.full(n, FAULT_TYPE_CODES["HOTSPOT"]),  # refined later
+        "severity": severity,
+        "confidence": compute_confidence_array(
+            peak_local_dt, area[j], np.zeros(n)
+        ),
 
-            # Geometry
-            "lon": float(lon),
-            "lat": float(lat),
-            "bbox": bbox,
-        })
+        # Physics
+        "delta_t_max": py_round(peak_raw[physical], 2),
+        "zscore_max": np.zeros(n),
+        "pixel_area": area[j],
 
-    return faults
+        # Geometry
+        "lon": np.asarray(lon, dtype=np.float64),
+        "lat": np.asarray(lat, dtype=np.float64),
+        "x_min": x[j],
+        "y_min": y[j],
+        "x_max": x[j] + w_box[j],
+        "y_max": y[j] + h_box[j],
+    })
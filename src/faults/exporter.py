@@ -1,47 +1,136 @@
 # src/faults/exporter.py
 
 import csv
+import gzip
 import json
+import textwrap
 
+GEOJSON_MODES = ("pretty", "compact", "seq", "ndjson")
 
-def export_csv(faults, path):
-    if not faults:
+BBOX_KEYS = ("x_min", "y_min", "x_max", "y_max")
+
+
+def _open_text(path, compress):
+    """
+    Text-mode writer; gzip stream (path gets a `.gz` suffix) if compress.
+    """
+    path = str(path)
+    if compress:
+        if not path.endswith(".gz"):
+            path += ".gz"
+        return gzip.open(path, "wt", newline="", compresslevel=6), path
+    return open(path, "w", newline=""), path
+
+
+def flatten_fault(fault):
+    """
+    One flat CSV row: bbox → bbox_x_min … bbox_y_max, tiles → "3;4".
+    """
+    row = {}
+    for k, v in fault.items():
+        if k == "bbox":
+            for bk in BBOX_KEYS:
+                row[f"bbox_{bk}"] = v[bk]
+        elif k == "tiles":
+            row[k] = ";".join(str(t) for t in v)
+        else:
+            row[k] = v
+    return row
+
+
+def export_csv(faults, path, flatten=True, compress=False):
+    """
+    Stream any iterable of fault dicts to CSV in constant memory.
+
+    flatten  : bbox / tiles as plain columns (default) instead of the
+               Python repr of the nested values
+    compress : gzip the stream
+    """
+    faults = iter(faults)
+    first = next(faults, None)
+    if first is None:
         return
 
-    keys = faults[0].keys()
+    row = flatten_fault if flatten else (lambda f: f)
+    first = row(first)
 
-    with open(path, "w", newline="") as f:
-        writer = csv.DictWriter(f, keys)
+    f, path = _open_text(path, compress)
+    with f:
+        writer = csv.DictWriter(f, first.keys())
         writer.writeheader()
-        writer.writerows(faults)
-
-
-def export_geojson(faults, path):
-    features = []
-
-    for f in faults:
-        features.append({
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [f["lon"], f["lat"]]
-            },
-            "properties": {
-                "fault_id": f["fault_id"],
-                "fault_type": f["fault_type"],
-                "severity": f["severity"],
-                "confidence": f["confidence"],
-                "delta_t_max": f["delta_t_max"],
-                "zscore_max": f.get("zscore_max"),  # ✅ SAFE
-                "pixel_area": f["pixel_area"],
-                "merge_count": f.get("merge_count"),
-            }
-        })
-
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features
+        writer.writerow(first)
+        for fault in faults:
+            writer.writerow(row(fault))
+
+    return path
+
+
+def _feature(f):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [f["lon"], f["lat"]]
+        },
+        "properties": {
+            "fault_id": f["fault_id"],
+            "fault_type": f["fault_type"],
+            "severity": f["severity"],
+            "confidence": f["confidence"],
+            "delta_t_max": f["delta_t_max"],
+            "zscore_max": f.get("zscore_max"),  # ✅ SAFE
+            "pixel_area": f["pixel_area"],
+            "merge_count": f.get("merge_count"),
+        }
     }
 
-    with open(path, "w") as f:
-        json.dump(geojson, f, indent=2)
+
+def export_geojson(faults, path, mode="pretty", compress=False):
+    """
+    Stream any iterable of fault dicts as GeoJSON, one feature at a time.
+
+    mode : "pretty"  → FeatureCollection, indented features
+           "compact" → FeatureCollection, no whitespace
+           "seq"     → GeoJSON Text Sequence (RFC 8142, RS-prefixed lines)
+           "ndjson"  → one Feature per line
+    """
+
+    if mode not in GEOJSON_MODES:
+        raise ValueError(
+            f"Unknown GeoJSON mode '{mode}', expected one of {GEOJSON_MODES}"
+        )
+
+    f, path = _open_text(path, compress)
+
+    with f:
+        if mode in ("seq", "ndjson"):
+            prefix = "\x1e" if mode == "seq" else ""
+            for fault in faults:
+                f.write(prefix)
+                f.write(json.dumps(_feature(fault), separators=(",", ":")))
+                f.write("\n")
+            return path
+
+        if mode == "pretty":
+            dump = lambda obj: textwrap.indent(json.dumps(obj, indent=2), "    ")
+            # Byte-identical to json.dump(collection, indent=2)
+            head, sep, tail = (
+                '{\n  "type": "FeatureCollection",\n  "features": [\n',
+                ",\n",
+                "\n  ]\n}",
+            )
+            empty = '{\n  "type": "FeatureCollection",\n  "features": []\n}'
+        else:
+            dump = lambda obj: json.dumps(obj, separators=(",", ":"))
+            head, sep, tail = (
+                '{"type":"FeatureCollection","features":[', ",", "]}",
+            )
+            empty = head + tail
+
+        i = -1
+        for i, fault in enumerate(faults):
+            f.write(sep if i else head)
+            f.write(dump(_feature(fault)))
+        f.write(tail if i >= 0 else empty)
+
+    return path
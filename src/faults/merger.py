@@ -1,9 +1,19 @@
 # src/faults/merger.py
 
 import numpy as np
-from src.faults.confidence import compute_confidence
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 
-MERGE_DISTANCE_METERS = 6.0
+from src.faults.codes import FAULT_TYPE_CODES, SEVERITY_CODES
+from src.faults.confidence import compute_confidence, compute_confidence_array
+from src.faults.store import to_records
+from src.faults.table import FaultTable
+from src.utils.numeric import py_round
+from src.config import settings
+
+# Mean Earth radius (IUGG), metres
+EARTH_RADIUS_M = 6_371_008.8
 
 # ---------------------------------------------
 # Energy loss model (safe, bounded, defensible)
@@ -23,10 +33,6 @@ def estimate_energy_loss(delta_t, area, panel_kw=0.54, annual_yield=1650):
     return round(loss_fraction * 100, 2), round(annual_kwh_loss, 1)
 
 
-def _distance(p1, p2):
-    return np.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
-
-
 def _classify_fault(delta_t_max, pixel_area, merge_count):
     if merge_count >= 2 and pixel_area >= 400 and delta_t_max >= 30:
         return "JUNCTION_BOX_HOTSPOT"
@@ -47,6 +53,56 @@ def _severity_from_physics(delta_t_max, pixel_area):
         return "LOW"
 
 
+def estimate_energy_loss_array(delta_t, area, panel_kw=0.54,
+                               annual_yield=1650):
+    """
+    `estimate_energy_loss` over whole arrays → (loss_pct, annual_kwh_loss).
+    """
+    delta_t = np.asarray(delta_t, dtype=np.float64)
+    area = np.asarray(area, dtype=np.float64)
+
+    loss_fraction = np.clip(0.002 * delta_t * (area / 100.0) ** 0.5, 0.0, 0.35)
+    annual_kwh_loss = panel_kw * annual_yield * loss_fraction
+
+    return py_round(loss_fraction * 100, 2), py_round(annual_kwh_loss, 1)
+
+
+def _classify_fault_array(delta_t_max, pixel_area, merge_count):
+    """
+    `_classify_fault` over whole arrays → fault type codes.
+    """
+    return np.select(
+        [
+            (merge_count >= 2) & (pixel_area >= 400) & (delta_t_max >= 30),
+            (pixel_area < 150) & (delta_t_max >= 35),
+        ],
+        [
+            FAULT_TYPE_CODES["JUNCTION_BOX_HOTSPOT"],
+            FAULT_TYPE_CODES["CELL_HOTSPOT"],
+        ],
+        FAULT_TYPE_CODES["PANEL_HOTSPOT"],
+    ).astype(np.int8)
+
+
+def _severity_from_physics_array(delta_t_max, pixel_area):
+    """
+    `_severity_from_physics` over whole arrays → severity codes.
+    """
+    return np.select(
+        [
+            (delta_t_max >= 40) & (pixel_area >= 400),
+            delta_t_max >= 30,
+            delta_t_max >= 20,
+        ],
+        [
+            SEVERITY_CODES["CRITICAL"],
+            SEVERITY_CODES["HIGH"],
+            SEVERITY_CODES["MEDIUM"],
+        ],
+        SEVERITY_CODES["LOW"],
+    ).astype(np.int8)
+
+
 def _merge_bboxes(bboxes):
     return {
         "x_min": min(b["x_min"] for b in bboxes),
@@ -57,6 +113,10 @@ def _merge_bboxes(bboxes):
 
 
 def _aggregate_cluster(cluster, fault_id):
+    """
+    One cluster of fault dicts → merged fault dict, with the scalar
+    rules (reference for the array path; bench_merge's legacy loop).
+    """
     areas = np.array([c["pixel_area"] for c in cluster], dtype=np.float32)
     total_area = float(areas.sum())
 
@@ -69,7 +129,6 @@ def _aggregate_cluster(cluster, fault_id):
 
     # Worst-case physics
     delta_t_max = float(max(c["delta_t_max"] for c in cluster))
-    merge_count = len(cluster)
 
     zscores = [
         c.get("zscore_max", 0.0)
@@ -78,6 +137,30 @@ def _aggregate_cluster(cluster, fault_id):
     ]
     zscore_max = float(max(zscores)) if zscores else 0.0
 
+    return _build_fault(
+        fault_id=fault_id,
+        total_area=total_area,
+        lon=lon,
+        lat=lat,
+        delta_t_max=delta_t_max,
+        merge_count=len(cluster),
+        zscore_max=zscore_max,
+        bbox=_merge_bboxes([c["bbox"] for c in cluster]),
+        tiles=sorted({c["tile_id"] for c in cluster if "tile_id" in c}),
+    )
+
+
+def _build_fault(
+    fault_id,
+    total_area,
+    lon,
+    lat,
+    delta_t_max,
+    merge_count,
+    zscore_max,
+    bbox,
+    tiles,
+):
     # Classification
     fault_type = _classify_fault(delta_t_max, total_area, merge_count)
     severity = _severity_from_physics(delta_t_max, total_area)
@@ -113,52 +196,202 @@ def _aggregate_cluster(cluster, fault_id):
         # Geometry
         "lon": lon,
         "lat": lat,
-        "bbox": _merge_bboxes([c["bbox"] for c in cluster]),
-        "tiles": sorted(
-            {c["tile_id"] for c in cluster if "tile_id" in c}
-        ),
+        "bbox": bbox,
+        "tiles": tiles,
     }
 
 
-def merge_faults_spatially(faults):
-    if not faults:
+def metric_xy(x, y, crs=None):
+    """
+    (N, 2) metric coordinates of map positions (IR CRS), so the merge
+    radius means metres whatever the raster is georeferenced in:
+
+        geographic CRS → local equirectangular projection about the
+                         site's mean latitude (distance error well under
+                         1% across a plant; longitudes unwrapped)
+        projected CRS  → x / y times the CRS linear unit (US feet, ...)
+        no CRS         → x / y are pixel coordinates; times
+                         settings.GSD_METERS when set
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    if crs is not None and crs.is_geographic:
+        if not len(x):
+            return np.zeros((0, 2))
+        # Longitudes relative to the first one, wrapped across ±180°
+        dlon = (x - x[0] + 180.0) % 360.0 - 180.0
+        lat0 = np.radians(y.mean())
+        return np.column_stack([
+            EARTH_RADIUS_M * np.cos(lat0) * np.radians(dlon),
+            EARTH_RADIUS_M * np.radians(y - y.mean()),
+        ])
+
+    if crs is not None:
+        try:
+            unit = crs.linear_units_factor[1]
+        except Exception:
+            unit = 1.0   # unknown unit: take it as metres
+    else:
+        unit = settings.GSD_METERS or 1.0
+
+    return np.column_stack([x * unit, y * unit])
+
+
+def _connected_components(xy, radius):
+    """
+    Connected components of the "within `radius`" graph over points.
+
+    A KD-tree yields every close pair in one query; the components of the
+    resulting sparse graph are the transitive clusters. Labels are ordered
+    by the lowest point index in each component.
+    """
+
+    n = len(xy)
+    pairs = cKDTree(xy).query_pairs(r=radius, output_type="ndarray")
+
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+        shape=(n, n),
+    )
+
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+def _aggregate_clusters(labels, chunks):
+    """
+    Merged FaultTable from cluster `labels` (one per detection) and the
+    detections as FAULT_DTYPE record chunks, in label order.
+
+    Every statistic is reduced chunk by chunk into per-cluster
+    accumulators; scoring and classification then run once over all
+    clusters.
+    """
+
+    k = int(labels.max()) + 1
+
+    count = np.zeros(k, dtype=np.int64)
+    area = np.zeros(k, dtype=np.float64)
+    lon_sum = np.zeros(k, dtype=np.float64)
+    lat_sum = np.zeros(k, dtype=np.float64)
+    dt_max = np.full(k, -np.inf)
+    z_max = np.full(k, np.nan)
+    x_min = np.full(k, np.iinfo(np.int32).max, dtype=np.int64)
+    y_min = np.full(k, np.iinfo(np.int32).max, dtype=np.int64)
+    x_max = np.full(k, np.iinfo(np.int32).min, dtype=np.int64)
+    y_max = np.full(k, np.iinfo(np.int32).min, dtype=np.int64)
+    tile_pairs = []
+
+    offset = 0
+    for chunk in chunks:
+        lab = labels[offset:offset + len(chunk)]
+        offset += len(chunk)
+
+        a = chunk["pixel_area"].astype(np.float64)
+
+        np.add.at(count, lab, 1)
+        np.add.at(area, lab, a)
+        np.add.at(lon_sum, lab, chunk["lon"] * a)
+        np.add.at(lat_sum, lab, chunk["lat"] * a)
+        np.maximum.at(dt_max, lab, chunk["delta_t_max"])
+        np.fmax.at(z_max, lab, chunk["zscore_max"])
+        np.minimum.at(x_min, lab, chunk["x_min"])
+        np.minimum.at(y_min, lab, chunk["y_min"])
+        np.maximum.at(x_max, lab, chunk["x_max"])
+        np.maximum.at(y_max, lab, chunk["y_max"])
+
+        tile_pairs.append(np.unique(
+            np.column_stack([lab, chunk["tile_id"]]), axis=0
+        ))
+
+    # Sorted, de-duplicated tile ids per cluster (CSR)
+    pairs = np.unique(np.concatenate(tile_pairs), axis=0)
+
+    keep = area > 0
+    ids = np.flatnonzero(keep)
+    tiles = np.bincount(pairs[:, 0], minlength=k)[keep]
+    pairs = pairs[keep[pairs[:, 0]]]
+
+    area = area[ids]
+    dt_max = dt_max[ids]
+    count = count[ids]
+    z_max = np.nan_to_num(z_max[ids], nan=0.0)
+
+    # Classification, confidence and energy impact, whole columns at once
+    loss_pct, annual_kwh_loss = estimate_energy_loss_array(dt_max, area)
+
+    return FaultTable(
+        {
+            "fault_id": np.arange(len(ids)),
+            "fault_type": _classify_fault_array(dt_max, area, count),
+            "severity": _severity_from_physics_array(dt_max, area),
+            "confidence": compute_confidence_array(dt_max, area, z_max),
+            "delta_t_max": py_round(dt_max, 2),
+            "zscore_max": z_max,
+            "pixel_area": area,
+            "merge_count": count,
+            "loss_pct": loss_pct,
+            "annual_kwh_loss": annual_kwh_loss,
+            "lon": lon_sum[ids] / area,
+            "lat": lat_sum[ids] / area,
+            "x_min": x_min[ids],
+            "y_min": y_min[ids],
+            "x_max": x_max[ids],
+            "y_max": y_max[ids],
+        },
+        tiles=(
+            np.concatenate([[0], np.cumsum(tiles)]).astype(np.int64),
+            pairs[:, 1].astype(np.int32),
+        ),
+    )
+
+
+def merge_faults_spatially(faults, crs=None):
+    """
+    Merge tile-level detections (dicts or a FaultTable) into physical
+    faults, returned as dicts.
+
+    Faults closer than settings.MERGE_DISTANCE_METERS (directly or
+    through a chain of neighbours) form one cluster; `crs` is the CRS
+    of their lon / lat (see metric_xy). Single pass: O(n log n) in the
+    number of detections.
+    """
+    if not len(faults):
         return []
 
-    remaining = list(faults)
-    merged_any = True
-    fault_id = 0
+    rec = to_records(faults)
+    xy = metric_xy(rec["lon"], rec["lat"], crs)
+    labels = _connected_components(xy, settings.MERGE_DISTANCE_METERS)
 
-    while merged_any:
-        merged_any = False
-        clusters = []
-        used = set()
+    return list(_aggregate_clusters(labels, [rec]))
 
-        for i, f in enumerate(remaining):
-            if i in used:
-                continue
 
-            cluster = [f]
-            used.add(i)
+def merge_fault_store(store, crs=None):
+    """
+    `merge_faults_spatially` over a FaultStore, streaming its chunks;
+    returns the merged faults as a FaultTable.
 
-            for j, g in enumerate(remaining):
-                if j in used:
-                    continue
+    Only the coordinate / ordering columns are materialized (for the
+    neighbour graph); every other statistic is reduced chunk by chunk
+    into per-cluster accumulators. Clusters and fault ids follow tile
+    order, so they do not depend on the order tiles finished in.
+    """
 
-                if _distance(
-                    (f["lon"], f["lat"]),
-                    (g["lon"], g["lat"])
-                ) <= MERGE_DISTANCE_METERS:
-                    cluster.append(g)
-                    used.add(j)
-                    merged_any = True
+    n = len(store)
+    if n == 0:
+        return FaultTable()
 
-            clusters.append(cluster)
+    order = np.lexsort((store.column("seq"), store.column("tile_id")))
+    xy = metric_xy(
+        store.column("lon")[order], store.column("lat")[order], crs
+    )
 
-        remaining = []
-        for c in clusters:
-            agg = _aggregate_cluster(c, fault_id)
-            if agg is not None:
-                remaining.append(agg)
-                fault_id += 1
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = _connected_components(
+        xy, settings.MERGE_DISTANCE_METERS
+    )
+    del xy, order
 
-    return remaining
+    return _aggregate_clusters(labels, store.iter_chunks())
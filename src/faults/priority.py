@@ -1,12 +1,20 @@
 import math
 
+import numpy as np
+
+from src.faults.codes import SEVERITIES
+from src.utils.numeric import py_round
+
+SEVERITY_WEIGHTS = {
+    "CRITICAL": 2.0,
+    "HIGH": 1.5,
+    "MEDIUM": 1.0,
+    "LOW": 0.6,
+}
+
+
 def compute_priority(fault):
-    severity_weight = {
-        "CRITICAL": 2.0,
-        "HIGH": 1.5,
-        "MEDIUM": 1.0,
-        "LOW": 0.6,
-    }.get(fault["severity"], 1.0)
+    severity_weight = SEVERITY_WEIGHTS.get(fault["severity"], 1.0)
 
     return round(
         severity_weight
@@ -14,3 +22,22 @@ def compute_priority(fault):
         * math.log1p(fault["pixel_area"]),
         2
     )
+
+
+def compute_priority_array(severity, confidence, pixel_area):
+    """
+    `compute_priority` over whole arrays; severity as codes (SEVERITIES).
+    """
+    severity = np.asarray(severity)
+    weight = np.select(
+        [severity == i for i in range(len(SEVERITIES))],
+        [SEVERITY_WEIGHTS[s] for s in SEVERITIES],
+        1.0,
+    )
+
+    return py_round(
+        weight
+        * np.asarray(confidence, dtype=np.float64)
+        * np.log1p(np.asarray(pixel_area, dtype=np.float64)),
+        2,
+    )
@@ -0,0 +1,132 @@
+# src/faults/store.py
+
+import glob
+import os
+
+import numpy as np
+
+from src.faults.codes import SEVERITY_CODES
+from src.faults.table import FaultTable
+
+# One row per tile-level detection (~90 bytes vs ~1 kB as a dict)
+FAULT_DTYPE = np.dtype([
+    ("tile_id", "i4"),
+    ("seq", "i4"),            # position within its tile's detections
+    ("severity", "i1"),       # index into SEVERITIES
+    ("confidence", "f8"),
+    ("delta_t_max", "f8"),
+    ("zscore_max", "f8"),     # NaN when missing
+    ("pixel_area", "i4"),
+    ("lon", "f8"),
+    ("lat", "f8"),
+    ("x_min", "i4"),
+    ("y_min", "i4"),
+    ("x_max", "i4"),
+    ("y_max", "i4"),
+])
+
+
+def to_records(faults):
+    """
+    Tile-level faults (FaultTable or dicts) → FAULT_DTYPE record array.
+    """
+
+    rec = np.zeros(len(faults), dtype=FAULT_DTYPE)
+
+    if isinstance(faults, FaultTable):
+        for name in FAULT_DTYPE.names:
+            if name != "seq":
+                rec[name] = faults[name]
+        rec["seq"] = np.arange(len(faults))
+        return rec
+
+    for i, f in enumerate(faults):
+        b = f["bbox"]
+        z = f.get("zscore_max")
+        rec[i] = (
+            f["tile_id"],
+            i,
+            SEVERITY_CODES.get(f["severity"], 0),
+            f["confidence"],
+            f["delta_t_max"],
+            z if isinstance(z, (int, float)) else np.nan,
+            f["pixel_area"],
+            f["lon"],
+            f["lat"],
+            b["x_min"],
+            b["y_min"],
+            b["x_max"],
+            b["y_max"],
+        )
+
+    return rec
+
+
+class FaultStore:
+    """
+    Append-only columnar store of tile-level detections.
+
+    Rows are buffered in memory and spilled to `<root>/chunk_NNNNN.npy`
+    every `chunk_size` rows; readers stream chunks back memory-mapped,
+    so peak memory stays bounded by one chunk (plus whatever columns a
+    caller materializes, e.g. 16 bytes/row for coordinates).
+    """
+
+    def __init__(self, root, chunk_size=100_000):
+        self.root = str(root)
+        self.chunk_size = chunk_size
+        self._buffer = []
+        self._buffered = 0
+        self._chunks = []
+        self._count = 0
+
+        # A store describes exactly one run: drop chunks of an earlier
+        # one, nothing else (root is user-configurable)
+        os.makedirs(self.root, exist_ok=True)
+        for path in glob.glob(os.path.join(self.root, "chunk_*.npy")):
+            os.remove(path)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, faults):
+        if len(faults) == 0:
+            return
+
+        rec = faults if isinstance(faults, np.ndarray) else to_records(faults)
+
+        self._buffer.append(rec)
+        self._buffered += len(rec)
+        self._count += len(rec)
+
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        path = os.path.join(self.root, f"chunk_{len(self._chunks):05d}.npy")
+        np.save(path, np.concatenate(self._buffer))
+
+        self._chunks.append(path)
+        self._buffer = []
+        self._buffered = 0
+
+    def iter_chunks(self):
+        """
+        Record-array chunks in append order (spilled chunks memory-mapped).
+        """
+        for path in self._chunks:
+            yield np.load(path, mmap_mode="r")
+        if self._buffer:
+            yield np.concatenate(self._buffer)
+
+    def column(self, name):
+        """
+        One field over all rows, as a contiguous array.
+        """
+        parts = [np.asarray(chunk[name]) for chunk in self.iter_chunks()]
+        if not parts:
+            return np.zeros(0, dtype=FAULT_DTYPE[name])
+        return np.concatenate(parts)
@@ -0,0 +1,272 @@
+# src/faults/table.py
+
+import math
+
+import numpy as np
+
+from src.faults.codes import (
+    FAULT_TYPE_CODES, FAULT_TYPES, SEVERITY_CODES, SEVERITIES,
+)
+from src.faults.classifier import classify_fault_array
+from src.faults.confidence import compute_confidence_array
+from src.faults.priority import compute_priority_array
+
+# Column → dtype, in export (dict key) order. A table holds any subset:
+# tile-level detections have tile_id, merged faults fault_id / merge_count
+# / energy / priority. bbox is four int32 columns; merged faults also
+# carry their sorted tile ids (ragged, see FaultTable.tiles).
+COLUMNS = {
+    "fault_id": "i4",
+    "tile_id": "i4",
+    "fault_type": "i1",         # index into FAULT_TYPES
+    "severity": "i1",           # index into SEVERITIES
+    "confidence": "f8",
+    "delta_t_max": "f8",
+    "zscore_max": "f8",         # NaN when missing
+    "pixel_area": "i4",
+    "merge_count": "i4",
+    "loss_pct": "f8",
+    "annual_kwh_loss": "f8",
+    "lon": "f8",
+    "lat": "f8",
+    "x_min": "i4",
+    "y_min": "i4",
+    "x_max": "i4",
+    "y_max": "i4",
+    "priority": "f8",
+}
+
+BBOX_COLUMNS = ("x_min", "y_min", "x_max", "y_max")
+
+# Dict keys of one fault, in order (bbox / tiles are nested values)
+FIELDS = tuple(
+    name for name in COLUMNS if name not in BBOX_COLUMNS + ("priority",)
+) + ("bbox", "tiles", "priority")
+
+class FaultTable:
+    """
+    A set of faults as NumPy columns (struct-of-arrays) instead of one
+    dict (plus a nested bbox dict) per fault: ~70 bytes per row, and
+    scoring / classification / filtering run as whole-column operations.
+
+    Dicts only appear at the edges (export, annotation, checkpoints):
+    iterating a table yields the same dicts the scalar pipeline built.
+
+        table["delta_t_max"]          → column (ndarray)
+        table["priority"] = values    → add / replace a column
+        table.take(index)             → rows by index or bool mask
+    """
+
+    def __init__(self, columns=None, tiles=None):
+        self.columns = {}
+        for name, values in (columns or {}).items():
+            self[name] = values
+
+        # Ragged tile ids per row: (offsets (n + 1), ids) or None
+        self.tiles = tiles
+
+    def __len__(self):
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        if name not in self.columns and not len(self):
+            return np.zeros(0, dtype=COLUMNS[name])
+        return self.columns[name]
+
+    def __setitem__(self, name, values):
+        values = np.asarray(values, dtype=COLUMNS[name])
+        if self.columns and len(values) != len(self):
+            raise ValueError(
+                f"Column '{name}' has {len(values)} rows, "
+                f"table has {len(self)}"
+            )
+        self.columns[name] = values
+
+    def __iter__(self):
+        return self.to_dicts()
+
+    # --------------------------------------------------
+    # Row selection
+    # --------------------------------------------------
+    def take(self, index):
+        """
+        Rows selected by an index array or bool mask, as a new table.
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+
+        tiles = None
+        if self.tiles is not None:
+            offsets, ids = self.tiles
+            sizes = offsets[index + 1] - offsets[index]
+            shift = offsets[index] - (np.cumsum(sizes) - sizes)
+            starts = np.repeat(shift, sizes)
+            tiles = (
+                np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+                ids[starts + np.arange(sizes.sum())],
+            )
+
+        return FaultTable(
+            {name: values[index] for name, values in self.columns.items()},
+            tiles,
+        )
+
+    def filter(self, severities):
+        """
+        Rows whose severity is one of `severities` (names).
+        """
+        codes = [SEVERITY_CODES[s] for s in severities]
+        return self.take(np.isin(self["severity"], codes))
+
+    def sort_by(self, name, descending=False):
+        """
+        Rows ordered by one column; ties keep their current order (as
+        Python's stable sort, also when descending).
+        """
+        values = self[name]
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self.take(order)
+
+    def severity_counts(self):
+        """
+        {severity name: rows}, most common first (like Counter).
+        """
+        counts = np.bincount(self["severity"], minlength=len(SEVERITIES))
+        order = np.argsort(-counts, kind="stable")
+        return {SEVERITIES[i]: int(counts[i]) for i in order if counts[i]}
+
+    # --------------------------------------------------
+    # Vectorized scoring / classification
+    # --------------------------------------------------
+    def confidence(self):
+        return compute_confidence_array(
+            self["delta_t_max"], self["pixel_area"], self["zscore_max"]
+        )
+
+    def priority(self):
+        return compute_priority_array(
+            self["severity"], self["confidence"], self["pixel_area"]
+        )
+
+    def classify(self):
+        """
+        Final fault type codes (classifier rules).
+        """
+        return classify_fault_array(
+            self["pixel_area"], self["delta_t_max"], self["severity"]
+        )
+
+    # --------------------------------------------------
+    # Conversions (export edge)
+    # --------------------------------------------------
+    @classmethod
+    def concat(cls, tables):
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls()
+
+        columns = {
+            name: np.concatenate([t[name] for t in tables])
+            for name in tables[0].columns
+        }
+
+        tiles = None
+        if tables[0].tiles is not None:
+            sizes = np.concatenate([np.diff(t.tiles[0]) for t in tables])
+            tiles = (
+                np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+                np.concatenate([t.tiles[1] for t in tables]),
+            )
+
+        return cls(columns, tiles)
+
+    @classmethod
+    def from_dicts(cls, faults):
+        """
+        Fault dicts (tile-level or merged layout) → table.
+        """
+        faults = list(faults)
+        if not faults:
+            return cls()
+
+        first = faults[0]
+        columns = {}
+        for name in COLUMNS:
+            if name in BBOX_COLUMNS:
+                if "bbox" in first:
+                    columns[name] = [f["bbox"][name] for f in faults]
+            elif name in first:
+                columns[name] = [f[name] for f in faults]
+
+        if "severity" in columns:
+            columns["severity"] = [
+                SEVERITY_CODES[s] for s in columns["severity"]
+            ]
+        if "fault_type" in columns:
+            columns["fault_type"] = [
+                FAULT_TYPE_CODES[t] for t in columns["fault_type"]
+            ]
+        if "fault_id" in columns:
+            columns["fault_id"] = [
+                int(str(i).rsplit("-", 1)[-1]) for i in columns["fault_id"]
+            ]
+        if "zscore_max" in columns:
+            columns["zscore_max"] = [
+                z if isinstance(z, (int, float)) else np.nan
+                for z in columns["zscore_max"]
+            ]
+
+        tiles = None
+        if "tiles" in first:
+            sizes = [len(f["tiles"]) for f in faults]
+            tiles = (
+                np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+                np.array(
+                    [t for f in faults for t in f["tiles"]], dtype=np.int32
+                ),
+            )
+
+        return cls(columns, tiles)
+
+    def to_dicts(self):
+        """
+        One dict per row, in the layout of the scalar pipeline (nested
+        bbox, severity / type names, "F-0001" ids, tiles as a list).
+        """
+        has_bbox = all(b in self.columns for b in BBOX_COLUMNS)
+        fields = [
+            name for name in FIELDS
+            if name in self.columns
+            or (name == "bbox" and has_bbox)
+            or (name == "tiles" and self.tiles is not None)
+        ]
+
+        columns = {name: v.tolist() for name, v in self.columns.items()}
+        if self.tiles is not None:
+            offsets, ids = self.tiles[0].tolist(), self.tiles[1].tolist()
+
+        for i in range(len(self)):
+            row = {}
+            for name in fields:
+                if name == "bbox":
+                    value = {b: columns[b][i] for b in BBOX_COLUMNS}
+                elif name == "tiles":
+                    value = ids[offsets[i]:offsets[i + 1]]
+                else:
+                    value = columns[name][i]
+                    if name == "fault_id":
+                        value = f"F-{value:04d}"
+                    elif name == "severity":
+                        value = SEVERITIES[value]
+                    elif name == "fault_type":
+                        value = FAULT_TYPES[value]
+                    elif name == "zscore_max" and math.isnan(value):
+                        value = None
+                row[name] = value
+            yield row
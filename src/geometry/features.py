@@ -0,0 +1,67 @@
+# src/geometry/features.py
+
+from functools import cached_property
+
+import cv2
+
+from src.geometry.orientation import orientation_from_edges
+from src.geometry.rows import (
+    ROW_POLYGON_EPSILON,
+    edge_map,
+    panel_contours,
+    rasterize_boxes,
+    row_band,
+)
+
+
+class TileGeometry:
+    """
+    One feature pass over an RGB tile: the edge map is computed once and
+    every geometry product is derived from it on first access.
+
+        edges        → Canny edge map (gray + blur + Canny, once)
+        orientation  → dominant row angle in degrees (or None)
+        row_mask     → row regions (uint8)
+        rois         → panel rectangles (x, y, w, h), tile pixels
+        row_polygons → simplified panel-row outlines, (K, 2) x / y arrays
+        panel_mask   → the rectangles filled (bool)
+
+    scale : native RGB pixels per pixel of `rgb_tile` (see detect_row_mask).
+    """
+
+    def __init__(self, rgb_tile, scale=1.0):
+        self.rgb_tile = rgb_tile
+        self.scale = scale
+        self.shape = rgb_tile.shape[:2]
+
+    @cached_property
+    def edges(self):
+        return edge_map(self.rgb_tile, self.scale)
+
+    @cached_property
+    def orientation(self):
+        return orientation_from_edges(self.edges)
+
+    @cached_property
+    def row_mask(self):
+        return row_band(self.edges, self.scale)
+
+    @cached_property
+    def contours(self):
+        return panel_contours(self.row_mask, self.scale)
+
+    @cached_property
+    def rois(self):
+        return [cv2.boundingRect(c) for c in self.contours]
+
+    @cached_property
+    def row_polygons(self):
+        eps = max(ROW_POLYGON_EPSILON / self.scale, 1.0)
+        return [
+            cv2.approxPolyDP(c, eps, True).reshape(-1, 2)
+            for c in self.contours
+        ]
+
+    @cached_property
+    def panel_mask(self):
+        return rasterize_boxes(self.rois, self.shape)
@@ -0,0 +1,319 @@
+# src/geometry/layer.py
+
+import json
+import math
+import os
+
+import numpy as np
+from rasterio.transform import Affine
+
+from src.config import settings
+from src.geometry.rows import ROW_POLYGON_EPSILON, geometry_params
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Bump when the file layout changes
+LAYER_VERSION = 1
+
+
+# --------------------------------------------------
+# Pixel ↔ map helpers
+# --------------------------------------------------
+def _apply(transform, x, y):
+    a, b, c, d, e, f = tuple(transform)[:6]
+    return a * x + b * y + c, d * x + e * y + f
+
+
+def _box_bounds(transform, x0, y0, x1, y1):
+    """
+    (N, 4) minx, miny, maxx, maxy of pixel-edge boxes under `transform`
+    (any affine; all four corners are mapped).
+    """
+    xs, ys = zip(*(
+        _apply(transform, x, y)
+        for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))
+    ))
+    xs, ys = np.stack(xs), np.stack(ys)
+    return np.stack(
+        [xs.min(axis=0), ys.min(axis=0), xs.max(axis=0), ys.max(axis=0)],
+        axis=1,
+    )
+
+
+# --------------------------------------------------
+# Grid spatial index (CSR: sorted cell ids → item lists)
+# --------------------------------------------------
+def _grid_cells(bounds, origin, cell):
+    g0 = np.floor((bounds[:, :2] - origin) / cell).astype(np.int64)
+    g1 = np.floor((bounds[:, 2:] - origin) / cell).astype(np.int64)
+    return g0, g1
+
+
+def _build_index(bounds, cell):
+    origin = bounds[:, :2].min(axis=0)
+    g0, g1 = _grid_cells(bounds, origin, cell)
+    nx = int(g1[:, 0].max()) + 1
+
+    w = g1[:, 0] - g0[:, 0] + 1
+    counts = w * (g1[:, 1] - g0[:, 1] + 1)
+    starts = np.cumsum(counts) - counts
+
+    items = np.repeat(np.arange(len(bounds), dtype=np.int32), counts)
+    local = np.arange(counts.sum()) - np.repeat(starts, counts)
+    w = np.repeat(w, counts)
+    gx = np.repeat(g0[:, 0], counts) + local % w
+    gy = np.repeat(g0[:, 1], counts) + local // w
+
+    cell_ids = gy * nx + gx
+    order = np.argsort(cell_ids, kind="stable")
+    cell_ids, items = cell_ids[order], items[order]
+
+    cells, first = np.unique(cell_ids, return_index=True)
+    offsets = np.append(first, len(cell_ids)).astype(np.int64)
+
+    return {
+        "index_origin": origin,
+        "index_cell": np.float64(cell),
+        "index_nx": np.int64(nx),
+        "index_cells": cells,
+        "index_offsets": offsets,
+        "index_items": items,
+    }
+
+
+def _auto_cell(bounds):
+    """
+    Index cell of about one panel row's length: a lookup touches a
+    handful of cells and each cell holds a handful of rows.
+    """
+    size = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+    return float(np.median(size)) or 1.0
+
+
+# ============================================================
+# Writer (step 3)
+# ============================================================
+class GeometryLayerWriter:
+    """
+    Collects TileGeometry results tile by tile and writes the layer:
+    one row per panel rectangle, with its row polygon, in map
+    coordinates of the RGB ortho.
+
+    Rows seen by two overlapping tiles are stored twice; lookups only
+    ever take the union, so this costs a little space, not accuracy.
+    """
+
+    def __init__(self, crs, source=None):
+        self.crs = crs
+        self.source = source
+        self._bounds = []
+        self._tiles = []
+        self._rings = []
+        self._angles = {}
+
+    def add(self, tile_id, geometry, transform):
+        self._angles[tile_id] = geometry.orientation
+
+        boxes = np.asarray(geometry.rois, dtype=np.float64).reshape(-1, 4)
+        if not len(boxes):
+            return
+
+        # cv2.rectangle fills x .. x + w inclusive → pixel edges + 1
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        self._bounds.append(_box_bounds(
+            transform, x0, y0, x0 + boxes[:, 2] + 1, y0 + boxes[:, 3] + 1
+        ))
+        self._tiles.append(np.full(len(boxes), tile_id, dtype=np.int32))
+
+        # Row outlines through pixel centres
+        for poly in geometry.row_polygons:
+            x, y = _apply(transform, poly[:, 0] + 0.5, poly[:, 1] + 0.5)
+            self._rings.append(np.stack([x, y], axis=1))
+
+    def write(self, path, cell=None):
+        bounds = (
+            np.concatenate(self._bounds) if self._bounds
+            else np.zeros((0, 4))
+        )
+        tiles = (
+            np.concatenate(self._tiles) if self._tiles
+            else np.zeros(0, np.int32)
+        )
+        ring_sizes = np.array([len(r) for r in self._rings], dtype=np.int64)
+        coords = (
+            np.concatenate(self._rings) if self._rings
+            else np.zeros((0, 2))
+        )
+
+        angle_tiles = np.array(sorted(self._angles), dtype=np.int32)
+        angles = np.array(
+            [
+                np.nan if self._angles[t] is None else self._angles[t]
+                for t in angle_tiles
+            ],
+            dtype=np.float64,
+        )
+
+        arrays = {
+            "bounds": bounds,
+            "tile_id": tiles,
+            "ring_offsets": np.concatenate([[0], np.cumsum(ring_sizes)]),
+            "ring_coords": coords,
+            "angle_tile_id": angle_tiles,
+            "angle": angles,
+        }
+
+        cell = cell or settings.GEOMETRY_INDEX_CELL
+        if len(bounds):
+            arrays.update(_build_index(bounds, cell or _auto_cell(bounds)))
+
+        meta = {
+            "version": LAYER_VERSION,
+            "crs": self.crs.to_wkt() if self.crs is not None else None,
+            "source": str(self.source) if self.source else None,
+            "geometry": geometry_params(),
+            "row_polygon_epsilon": ROW_POLYGON_EPSILON,
+        }
+
+        path = str(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path[:-len('.npz')]}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+
+        logger.info(
+            f"[GEOMETRY] Layer written | panels={len(bounds)} | "
+            f"tiles={len(angle_tiles)} | {path}"
+        )
+        return GeometryLayer(arrays, meta)
+
+
+# ============================================================
+# Reader (step 4 and later analytics)
+# ============================================================
+class GeometryLayer:
+    """
+    Panel rectangles / row polygons in map coordinates with a grid index.
+
+        query(bounds)            → indices of panels intersecting bounds
+        panel_mask(transform, shape) → bool mask on any pixel grid
+        row_polygon(i)           → (K, 2) map coordinates
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.bounds = arrays["bounds"]
+        self.tile_id = arrays["tile_id"]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in data.files if k != "meta"}
+            meta = json.loads(str(data["meta"]))
+
+        if meta.get("version") != LAYER_VERSION:
+            raise ValueError(
+                f"{path}: geometry layer version {meta.get('version')}, "
+                f"expected {LAYER_VERSION} (re-run step3)"
+            )
+        return cls(arrays, meta)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @property
+    def crs(self):
+        from rasterio.crs import CRS
+
+        wkt = self.meta.get("crs")
+        return CRS.from_wkt(wkt) if wkt else None
+
+    def orientation(self):
+        """
+        {tile_id: row angle in degrees or None} as computed in step 3.
+        """
+        return {
+            int(t): None if math.isnan(a) else float(a)
+            for t, a in zip(self.arrays["angle_tile_id"], self.arrays["angle"])
+        }
+
+    def query(self, bounds):
+        """
+        Sorted indices of panels whose rectangle intersects
+        (minx, miny, maxx, maxy).
+        """
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+
+        a = self.arrays
+        q = np.asarray(bounds, dtype=np.float64).reshape(1, 4)
+        (gx0, gy0), (gx1, gy1) = (
+            g[0] for g in _grid_cells(q, a["index_origin"], a["index_cell"])
+        )
+
+        nx = int(a["index_nx"])
+        gx = np.arange(max(gx0, 0), min(gx1, nx - 1) + 1)
+        gy = np.arange(max(gy0, 0), gy1 + 1)
+        if not len(gx) or not len(gy):
+            return np.zeros(0, dtype=np.int64)
+
+        cells = a["index_cells"]
+        wanted = (gy[:, None] * nx + gx[None, :]).ravel()
+        pos = np.searchsorted(cells, wanted)
+        found = pos < len(cells)
+        pos, wanted = pos[found], wanted[found]
+        pos = pos[cells[pos] == wanted]
+
+        offsets = a["index_offsets"]
+        cand = (
+            np.unique(np.concatenate([
+                a["index_items"][offsets[p]:offsets[p + 1]] for p in pos
+            ]))
+            if len(pos) else np.zeros(0, dtype=np.int64)
+        )
+
+        b = self.bounds[cand]
+        hit = (
+            (b[:, 0] < q[0, 2]) & (b[:, 2] > q[0, 0])
+            & (b[:, 1] < q[0, 3]) & (b[:, 3] > q[0, 1])
+        )
+        return cand[hit].astype(np.int64)
+
+    def row_polygon(self, i):
+        o = self.arrays["ring_offsets"]
+        return self.arrays["ring_coords"][o[i]:o[i + 1]]
+
+    def panel_mask(self, transform, shape):
+        """
+        Panel mask (bool) on the pixel grid of `transform` / `shape`;
+        a pixel is panel when its centre lies in any panel rectangle.
+        """
+        h, w = shape
+        mask = np.zeros((h, w), dtype=bool)
+
+        window = _box_bounds(
+            transform,
+            np.array([0.0]), np.array([0.0]),
+            np.array([float(w)]), np.array([float(h)]),
+        )[0]
+        idx = self.query(window)
+        if not len(idx):
+            return mask
+
+        # Map → pixel (corners of every rectangle, any affine)
+        b = self.bounds[idx]
+        px = _box_bounds(
+            ~Affine(*tuple(transform)[:6]), b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+        )
+
+        c0 = np.clip(np.ceil(px[:, 0] - 0.5), 0, w).astype(np.int64)
+        r0 = np.clip(np.ceil(px[:, 1] - 0.5), 0, h).astype(np.int64)
+        c1 = np.clip(np.ceil(px[:, 2] - 0.5), 0, w).astype(np.int64)
+        r1 = np.clip(np.ceil(px[:, 3] - 0.5), 0, h).astype(np.int64)
+
+        for x0, y0, x1, y1 in zip(c0, r0, c1, r1):
+            mask[y0:y1, x0:x1] = True
+
+        return mask
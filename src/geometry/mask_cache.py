@@ -0,0 +1,73 @@
+# src/geometry/mask_cache.py
+
+import os
+
+import numpy as np
+
+from src.config import settings
+from src.geometry.rows import geometry_params
+from src.utils.hashing import file_digest, params_digest
+
+
+def mask_cache_dir(rgb_path, params, root=None):
+    """
+    Cache directory for one (RGB content, geometry parameters) pair:
+
+        <root>/<rgb content hash>/<params hash>/
+
+    A changed ortho or any changed morphology / resolution parameter
+    lands in a fresh directory, so stale masks are never reused.
+    root defaults to settings.PANEL_MASK_CACHE_DIR.
+    """
+
+    root = str(root or settings.PANEL_MASK_CACHE_DIR)
+    rgb_digest = file_digest(rgb_path, memo_path=settings.DIGEST_MEMO)
+    params = dict(params, geometry=geometry_params())
+
+    path = os.path.join(root, rgb_digest, params_digest(params))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def tile_key(rgb_window, ir_shape):
+    """
+    File stem for one tile: RGB footprint window + IR tile shape.
+    """
+    w = rgb_window
+    return (
+        f"{w.col_off:.3f}_{w.row_off:.3f}_{w.width:.3f}_{w.height:.3f}"
+        f"_{ir_shape[0]}x{ir_shape[1]}"
+    )
+
+
+def load_panel_mask(cache_dir, key):
+    """
+    Cached IR-resolution panel mask (bool), or None on a miss.
+    """
+
+    path = os.path.join(cache_dir, f"{key}.npz")
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        shape = tuple(data["shape"])
+        bits = np.unpackbits(data["packed"], count=shape[0] * shape[1])
+
+    return bits.reshape(shape).astype(bool)
+
+
+def save_panel_mask(cache_dir, key, mask):
+    """
+    Bit-packed + deflate-compressed mask; written atomically so parallel
+    workers never see a partial file.
+    """
+
+    path = os.path.join(cache_dir, f"{key}.npz")
+    tmp = os.path.join(cache_dir, f".{key}.{os.getpid()}.tmp.npz")
+
+    np.savez_compressed(
+        tmp,
+        packed=np.packbits(mask.astype(bool), axis=None),
+        shape=np.array(mask.shape, dtype=np.int64),
+    )
+    os.replace(tmp, path)
@@ -3,6 +3,7 @@
 import cv2
 import numpy as np
 
+
 def estimate_row_orientation(rgb_tile):
     """
     Estimates dominant panel row angle in degrees.
@@ -14,6 +15,14 @@ def estimate_row_orientation(rgb_tile):
 
     edges = cv2.Canny(gray, 50, 150, apertureSize=3)
 
+    return orientation_from_edges(edges)
+
+
+def orientation_from_edges(edges):
+    """
+    Dominant row angle (degrees) from a Canny edge map, or None.
+    """
+
     lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=150)
 
     if lines is None:
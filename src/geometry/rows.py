@@ -3,53 +3,121 @@
 import cv2
 import numpy as np
 
-def detect_row_mask(rgb_tile):
+# --------------------------------------------------
+# Row / panel morphology (tuned at native RGB resolution)
+# --------------------------------------------------
+ROW_BLUR_KSIZE = 5
+CANNY_LOW, CANNY_HIGH = 50, 150
+ROW_DILATE_KERNEL = (31, 3)
+ROW_OPEN_KERNEL = (5, 5)
+PANEL_CLOSE_KERNEL = (25, 7)
+PANEL_CLOSE_ITERATIONS = 3
+PANEL_OPEN_KERNEL = (7, 7)
+PANEL_MIN_WIDTH = 200
+PANEL_MIN_HEIGHT = 20
+ROW_POLYGON_EPSILON = 2.0     # px, contour simplification (geometry layer)
+
+
+def geometry_params():
     """
-    Detects panel row regions using edge density.
-    This avoids ground / gravel false positives.
+    All parameters that shape the panel mask (e.g. for cache keys).
+    """
+    return {
+        "row_blur_ksize": ROW_BLUR_KSIZE,
+        "canny": [CANNY_LOW, CANNY_HIGH],
+        "row_dilate_kernel": list(ROW_DILATE_KERNEL),
+        "row_open_kernel": list(ROW_OPEN_KERNEL),
+        "panel_close_kernel": list(PANEL_CLOSE_KERNEL),
+        "panel_close_iterations": PANEL_CLOSE_ITERATIONS,
+        "panel_open_kernel": list(PANEL_OPEN_KERNEL),
+        "panel_min_size": [PANEL_MIN_WIDTH, PANEL_MIN_HEIGHT],
+    }
+
+
+def _scaled(size, scale, odd=False):
+    """
+    Pixel size tuned at native RGB resolution → size at `scale`
+    native pixels per working pixel.
+    """
+    size = max(1, int(round(size / scale)))
+    if odd and size % 2 == 0:
+        size += 1
+    return size
+
+
+def _rect(kernel, scale):
+    w, h = kernel
+    return cv2.getStructuringElement(
+        cv2.MORPH_RECT, (_scaled(w, scale), _scaled(h, scale))
+    )
+
+
+def edge_map(rgb_tile, scale=1.0):
+    """
+    Grayscale → light blur → Canny (panels have strong grid edges).
+    Shared by the row mask and the orientation estimate.
     """
 
-    # 1. Convert to grayscale
     gray = cv2.cvtColor(rgb_tile, cv2.COLOR_BGR2GRAY)
 
-    # 2. Light blur to suppress noise
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    k = _scaled(ROW_BLUR_KSIZE, scale, odd=True)
+    gray = cv2.GaussianBlur(gray, (k, k), 0)
+
+    return cv2.Canny(gray, CANNY_LOW, CANNY_HIGH)
+
 
-    # 3. Edge detection (panels have strong grid edges)
-    edges = cv2.Canny(gray, 50, 150)
+def row_band(edges, scale=1.0):
+    """
+    Edge map → row regions (dilated along rows, tiny noise removed).
+    """
 
-    # 4. Dilate edges horizontally (rows are long)
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (31, 3))
+    # Dilate edges horizontally (rows are long)
+    kernel = _rect(ROW_DILATE_KERNEL, scale)
     edge_band = cv2.dilate(edges, kernel, iterations=1)
 
-    # 5. Remove tiny noise
+    # Remove tiny noise
     edge_band = cv2.morphologyEx(
         edge_band,
         cv2.MORPH_OPEN,
-        cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        _rect(ROW_OPEN_KERNEL, scale)
     )
 
     return edge_band
 
-# src/geometry/rows.py
 
+def detect_row_mask(rgb_tile, scale=1.0):
+    """
+    Detects panel row regions using edge density.
+    This avoids ground / gravel false positives.
 
-def fill_panel_mask(row_mask):
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 7))
+    scale : native RGB pixels per pixel of `rgb_tile` (> 1 for decimated
+            reads); kernel sizes are tuned at native resolution.
+    """
+
+    return row_band(edge_map(rgb_tile, scale), scale)
+
+
+def panel_contours(row_mask, scale=1.0):
+    """
+    Outer contours of the panel rows in a row mask: strong closing along
+    rows, thin junk removed, then only long & thin shapes kept.
+    """
+
+    kernel = _rect(PANEL_CLOSE_KERNEL, scale)
 
     # Strong horizontal closing
     closed = cv2.morphologyEx(
         row_mask,
         cv2.MORPH_CLOSE,
         kernel,
-        iterations=3
+        iterations=PANEL_CLOSE_ITERATIONS
     )
 
     # Remove thin junk
     closed = cv2.morphologyEx(
         closed,
         cv2.MORPH_OPEN,
-        cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
+        _rect(PANEL_OPEN_KERNEL, scale)
     )
 
     contours, _ = cv2.findContours(
@@ -58,15 +126,40 @@ def fill_panel_mask(row_mask):
         cv2.CHAIN_APPROX_SIMPLE
     )
 
-    mask = np.zeros_like(closed, dtype=np.uint8)
+    min_w = PANEL_MIN_WIDTH / scale
+    min_h = PANEL_MIN_HEIGHT / scale
 
+    kept = []
     for c in contours:
         x, y, w, h = cv2.boundingRect(c)
 
         # 👇 panel rows are long & thin
-        if w < 200 or h < 20:
+        if w < min_w or h < min_h:
             continue
 
-        cv2.rectangle(mask, (x, y), (x + w, y + h), 1, -1)
+        kept.append(c)
+
+    return kept
 
+
+def panel_boxes(row_mask, scale=1.0):
+    """
+    Panel rectangles (x, y, w, h) from a row mask.
+    """
+    return [cv2.boundingRect(c) for c in panel_contours(row_mask, scale)]
+
+
+def rasterize_boxes(boxes, shape):
+    """
+    Boolean mask of `shape` with every (x, y, w, h) box filled
+    (inclusive of the far edge, as cv2.rectangle draws it).
+    """
+
+    mask = np.zeros(shape, dtype=np.uint8)
+    for x, y, w, h in boxes:
+        cv2.rectangle(mask, (x, y), (x + w, y + h), 1, -1)
     return mask.astype(bool)
+
+
+def fill_panel_mask(row_mask, scale=1.0):
+    return rasterize_boxes(panel_boxes(row_mask, scale), row_mask.shape[:2])
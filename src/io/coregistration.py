@@ -0,0 +1,121 @@
+# src/io/coregistration.py
+
+import numpy as np
+from rasterio.enums import Resampling
+from rasterio.errors import WindowError
+from rasterio.windows import Window, bounds, from_bounds
+
+from src.config import settings
+from src.io.tile_generator import iter_windows
+
+
+def pixel_scale(src_ds, dst_ds):
+    """
+    Source pixels per destination pixel (mean of x / y), e.g. 4.0 for a
+    2.5 cm RGB ortho against a 10 cm IR ortho.
+    """
+    sx = abs(dst_ds.transform.a / src_ds.transform.a)
+    sy = abs(dst_ds.transform.e / src_ds.transform.e)
+    return float((sx + sy) / 2)
+
+
+def iter_coregistered_windows(ir_ds, rgb_ds):
+    """
+    IR tile grid → matching RGB windows, via the two geotransforms.
+
+    Yields (ir_window, rgb_window) in IR raster order. The RGB window
+    covers exactly the ground footprint of the IR window; it may have
+    fractional offsets and may extend past the RGB raster.
+    """
+
+    if ir_ds.crs and rgb_ds.crs and ir_ds.crs != rgb_ds.crs:
+        raise ValueError(
+            f"IR / RGB CRS mismatch: {ir_ds.crs} vs {rgb_ds.crs} "
+            f"(reproject one raster first)"
+        )
+
+    for ir_win in iter_windows(ir_ds.width, ir_ds.height):
+        rgb_win = from_bounds(
+            *bounds(ir_win, ir_ds.transform),
+            transform=rgb_ds.transform
+        )
+        yield ir_win, rgb_win
+
+
+def aligned_window(rgb_ds, rgb_win, out_shape):
+    """
+    Integer window when `rgb_win` lies on the RGB pixel grid, has exactly
+    `out_shape` (H, W) and is inside the raster (identical grids), so a
+    plain block-cached windowed read suffices. Otherwise None.
+    """
+
+    offsets = np.array([rgb_win.col_off, rgb_win.row_off])
+    lengths = np.array([rgb_win.height, rgb_win.width])
+
+    if not (
+        np.allclose(offsets, np.round(offsets), atol=1e-6)
+        and np.allclose(lengths, out_shape, atol=1e-6)
+    ):
+        return None
+
+    col, row = (int(v) for v in np.round(offsets))
+    h, w = out_shape
+
+    if col < 0 or row < 0 or col + w > rgb_ds.width or row + h > rgb_ds.height:
+        return None
+
+    return Window(col, row, w, h)
+
+
+def read_coregistered(
+    rgb_ds,
+    rgb_win,
+    out_shape,
+    band_indices,
+    resampling=None,
+):
+    """
+    Read `rgb_win` resampled straight to `out_shape` (H, W) — the IR
+    tile shape — as an (H, W, bands) array.
+
+    The decimation happens inside GDAL (using overviews when present),
+    so the full-resolution RGB pixels are never materialized here.
+    Parts of the window outside the RGB raster are filled with 0.
+    resampling defaults to settings.RGB_RESAMPLING.
+    """
+
+    resampling = resampling or settings.RGB_RESAMPLING
+    out_h, out_w = out_shape
+    out = np.zeros(
+        (out_h, out_w, len(band_indices)),
+        dtype=rgb_ds.dtypes[band_indices[0] - 1]
+    )
+
+    try:
+        clipped = rgb_win.intersection(
+            Window(0, 0, rgb_ds.width, rgb_ds.height)
+        )
+    except WindowError:
+        return out
+
+    # Footprint of the clipped window in output pixels
+    sx = out_w / rgb_win.width
+    sy = out_h / rgb_win.height
+    x0 = int(round((clipped.col_off - rgb_win.col_off) * sx))
+    y0 = int(round((clipped.row_off - rgb_win.row_off) * sy))
+    x1 = min(out_w, x0 + int(round(clipped.width * sx)))
+    y1 = min(out_h, y0 + int(round(clipped.height * sy)))
+
+    if x1 <= x0 or y1 <= y0:
+        return out
+
+    data = rgb_ds.read(
+        band_indices,
+        window=clipped,
+        out_shape=(len(band_indices), y1 - y0, x1 - x0),
+        resampling=Resampling[resampling],
+        masked=True,
+    ).filled(0)
+
+    out[y0:y1, x0:x1] = np.moveaxis(data, 0, -1)
+    return out
@@ -0,0 +1,141 @@
+# src/io/coverage.py
+
+import math
+
+import numpy as np
+from rasterio.enums import MaskFlags, Resampling
+from rasterio.errors import RasterBlockError
+
+from src.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class Coverage:
+    """
+    Coarse valid-data map of a raster: one cell per `factor` native
+    pixels ((rows, cols), fractional for overview reads), True where
+    the cell may contain a valid pixel.
+
+    Lookups add `margin` cells on every side, for sources that only
+    approximate the valid area (an overview can miss a small valid
+    patch next to a cell it keeps).
+    """
+
+    def __init__(self, grid, factor, source, margin=0):
+        self.grid = grid
+        self.factor = factor
+        self.source = source
+        self.margin = margin
+
+    @property
+    def fraction(self):
+        return float(self.grid.mean()) if self.grid.size else 0.0
+
+    def covers(self, win):
+        fy, fx = self.factor
+        m = self.margin
+        r0 = max(math.floor(win.row_off / fy) - m, 0)
+        c0 = max(math.floor(win.col_off / fx) - m, 0)
+        r1 = math.ceil((win.row_off + win.height) / fy) + m
+        c1 = math.ceil((win.col_off + win.width) / fx) + m
+        return bool(self.grid[r0:r1, c0:c1].any())
+
+
+# ---------------------------------------------------------------------
+# Sources (metadata or overview reads only, never full-resolution data)
+# ---------------------------------------------------------------------
+
+def _block_coverage(dataset, indexes):
+    """
+    Sparse GeoTIFF: blocks never written (SPARSE_OK) have no byte count
+    and read back as nodata. One cell per block, exact.
+    """
+
+    if dataset.driver != "GTiff":
+        return None
+
+    bh, bw = dataset.block_shapes[indexes[0] - 1]
+    shape = (
+        math.ceil(dataset.height / bh),
+        math.ceil(dataset.width / bw),
+    )
+    grid = np.zeros(shape, dtype=bool)
+
+    for bidx in indexes:
+        for i in range(shape[0]):
+            for j in range(shape[1]):
+                if grid[i, j]:
+                    continue
+                try:
+                    grid[i, j] = dataset.block_size(bidx, i, j) > 0
+                except RasterBlockError:
+                    pass
+
+    if grid.all():
+        return None
+
+    return Coverage(grid, (bh, bw), "blocks")
+
+
+def _mask_coverage(dataset, indexes, factor):
+    """
+    Internal / external mask band, read through its overviews (built
+    with the data overviews). Without overviews the read would decode
+    the full-resolution mask, so the source is not used.
+    """
+
+    per_dataset = all(
+        dataset.mask_flag_enums[i - 1] == [MaskFlags.per_dataset]
+        for i in indexes
+    )
+    if not per_dataset or not dataset.overviews(indexes[0]):
+        return None
+
+    shape = (
+        max(1, math.ceil(dataset.height / factor)),
+        max(1, math.ceil(dataset.width / factor)),
+    )
+    mask = dataset.read_masks(
+        indexes[0], out_shape=shape, resampling=Resampling.nearest
+    )
+    factor = (dataset.height / shape[0], dataset.width / shape[1])
+
+    return Coverage(mask > 0, factor, "mask", margin=1)
+
+
+def coverage_map(dataset, indexes=1, factor=None):
+    """
+    Valid-data pre-pass for `generate_tiles` / the step-4 planner.
+
+    Sources, first usable wins:
+        "blocks" → sparse GeoTIFF blocks (byte counts, exact)
+        "mask"   → mask band overview (COVERAGE_FACTOR cells, ±1 cell)
+
+    Returns None (no skipping) when the raster has neither: the map
+    must cost far less than reading the tiles it would skip, so pixel
+    values are never decoded for it.
+    """
+
+    factor = factor or settings.COVERAGE_FACTOR
+    indexes = [indexes] if isinstance(indexes, int) else list(indexes)
+
+    cov = _block_coverage(dataset, indexes)
+    if cov is None:
+        cov = _mask_coverage(dataset, indexes, factor)
+
+    if cov is None:
+        logger.info(
+            "Coverage map | no sparse blocks or mask overview, "
+            "tiles are not skipped"
+        )
+        return None
+
+    logger.info(
+        f"Coverage map | source={cov.source} | "
+        f"cells={cov.grid.shape[1]}x{cov.grid.shape[0]} | "
+        f"valid={100 * cov.fraction:.1f}%"
+    )
+
+    return cov
@@ -0,0 +1,55 @@
+# src/io/overviews.py
+
+import rasterio
+from rasterio.enums import Resampling
+
+from src.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def build_overviews(path, factors=None, resampling="average"):
+    """
+    Build decimated overviews for `path` if it has none.
+
+    Written as an external `<file>.ovr` sidecar (TIFF_USE_OVR), so the
+    source ortho itself is never rewritten.
+    factors default to settings.OVERVIEW_FACTORS.
+    """
+
+    factors = factors or settings.OVERVIEW_FACTORS
+
+    with rasterio.open(path) as ds:
+        existing = ds.overviews(1)
+
+    if existing:
+        logger.info(f"Overviews present: {path.name} | factors={existing}")
+        return existing
+
+    logger.info(f"Building overviews: {path.name} | factors={factors}")
+
+    with rasterio.Env(TIFF_USE_OVR=True):
+        with rasterio.open(path, "r+") as ds:
+            ds.build_overviews(list(factors), Resampling[resampling])
+
+    return list(factors)
+
+
+def select_overview(dataset, target_scale):
+    """
+    Coarsest overview that is still at least as fine as `target_scale`
+    (native pixels per target pixel, e.g. RGB pixels per IR pixel).
+
+    Returns (overview_level, factor); (None, 1) means full resolution.
+    `overview_level` is the index accepted by rasterio.open(...,
+    overview_level=...).
+    """
+
+    level, factor = None, 1
+
+    for i, f in enumerate(dataset.overviews(1)):
+        if f <= target_scale + 1e-6 and f > factor:
+            level, factor = i, f
+
+    return level, factor
@@ -5,13 +5,25 @@ from src.utils.logger import get_logger
 
 logger = get_logger()
 
-def open_tiff(path):
+def open_tiff(path, overview_level=None):
     if not path.exists():
         raise FileNotFoundError(f"TIFF not found: {path}")
 
-    logger.info(f"Opening TIFF: {path}")
-    ds = rasterio.open(path)
+    if overview_level is None:
+        logger.info(f"Opening TIFF: {path}")
+        ds = rasterio.open(path)
+    else:
+        logger.info(f"Opening TIFF: {path} | overview_level={overview_level}")
+        ds = rasterio.open(path, overview_level=overview_level)
     logger.info(
         f"Opened TIFF | Size: {ds.width}x{ds.height} | Bands: {ds.count}"
     )
     return ds
+
+
+def raster_crs(path):
+    """
+    CRS of a raster (rasterio CRS, None when it is not georeferenced).
+    """
+    with rasterio.open(path) as ds:
+        return ds.crs
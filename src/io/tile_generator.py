@@ -1,16 +1,297 @@
 # src/io/tile_generator.py
 
+from collections import OrderedDict
+
 from rasterio.windows import Window
 from rasterio.windows import transform as window_transform
 import numpy as np
 
-from src.config import TILE_SIZE, OVERLAP
+from src.config import settings
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
 
-def generate_tiles(dataset, band_index=None, band_indices=None):
+class BlockCache:
+    """
+    Small LRU of decoded GeoTIFF blocks, (bh, bw, bands) arrays.
+
+    Neighbouring tiles share the blocks under their OVERLAP strips;
+    with the cache those blocks are decompressed once instead of twice.
+    The default size covers the left/right neighbour in a tile row;
+    sharing with the tile row above needs roughly
+    (TILE_SIZE / block_height + 1) × (blocks across the raster) entries.
+    """
+
+    def __init__(self, max_blocks=None):
+        self.max_blocks = max_blocks or settings.BLOCK_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+
+    def get(self, key):
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+        return block
+
+    def put(self, key, block):
+        self.misses += 1
+        self._blocks[key] = block
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    def clear(self):
+        self._blocks.clear()
+
+
+def block_grid(dataset):
+    """
+    (block_height, block_width) when the raster is internally tiled with
+    one block layout for all bands, else None (striped / scanline TIFFs).
+    """
+
+    shapes = set(dataset.block_shapes)
+    if len(shapes) != 1:
+        return None
+
+    bh, bw = shapes.pop()
+    tile = settings.TILE_SIZE
+    if bh <= 1 or bw >= dataset.width or bh > tile or bw > tile:
+        return None
+
+    return bh, bw
+
+
+def _block_aligned_step(step, block):
+    """
+    Largest multiple of `block` not above `step` (keeps overlap ≥ OVERLAP).
+    Gives up (returns `step`) when that would cost more than 25% extra tiles.
+    """
+    aligned = (step // block) * block
+    return aligned if aligned >= 0.75 * step else step
+
+
+def iter_windows(width, height, step=None):
+    """
+    Tile windows in raster order (row-major), without reading pixels.
+
+    Uses the same TILE_SIZE / OVERLAP grid as `generate_tiles`, so the
+    n-th window here is the window of the n-th tile yielded there.
+    `step` may be an int or a (step_y, step_x) pair.
+    """
+
+    tile = settings.TILE_SIZE
+    step = step or tile - settings.OVERLAP
+    step_y, step_x = step if isinstance(step, tuple) else (step, step)
+
+    for y in range(0, height, step_y):
+        for x in range(0, width, step_x):
+            yield Window(
+                col_off=x,
+                row_off=y,
+                width=min(tile, width - x),
+                height=min(tile, height - y),
+            )
+
+
+def window_core(win, width, height, step=None):
+    """
+    Ownership rule for overlapping tiles: the part of `win` this tile
+    owns, as tile-local (x0, y0, x1, y1) with exclusive max.
+
+    Each overlap band is split at its midpoint, so every raster pixel
+    belongs to exactly one tile's core. Outer raster edges belong to the
+    edge tiles.
+    """
+
+    tile = settings.TILE_SIZE
+    step = step or tile - settings.OVERLAP
+    step_y, step_x = step if isinstance(step, tuple) else (step, step)
+
+    def _axis(off, length, step, size):
+        half = (tile - step) // 2
+        lo = 0 if off == 0 else half
+        hi = step + half if off + step < size else length
+        return lo, max(lo, min(hi, length))
+
+    x0, x1 = _axis(int(win.col_off), int(win.width), step_x, width)
+    y0, y1 = _axis(int(win.row_off), int(win.height), step_y, height)
+
+    return x0, y0, x1, y1
+
+
+def window_seams(win, width, height, step=None):
+    """
+    Where `win` meets its neighbours, per axis ((x axis), (y axis)), as
+    tile-local (low_inner, high_inner, prev_edge, next_edge):
+
+        low_inner / high_inner : that tile edge is a seam (an overlapping
+                                 neighbour continues the raster), not the
+                                 raster border
+        prev_edge              : far edge of the previous tile, None when
+                                 it is the raster border
+        next_edge              : near edge of the next tile, None when
+                                 there is no next tile
+
+    Same grid as `window_core`; detect_faults uses it to hand a hotspot
+    cut by a seam to the neighbour that sees it whole.
+    """
+
+    tile = settings.TILE_SIZE
+    step = step or tile - settings.OVERLAP
+    step_y, step_x = step if isinstance(step, tuple) else (step, step)
+
+    def _axis(off, length, step, size):
+        prev_edge = None
+        if off > 0:
+            prev_end = min(off - step + tile, size)
+            if prev_end < size:
+                prev_edge = prev_end - off
+        next_edge = step if off + step < size else None
+        return off > 0, off + length < size, prev_edge, next_edge
+
+    return (
+        _axis(int(win.col_off), int(win.width), step_x, width),
+        _axis(int(win.row_off), int(win.height), step_y, height),
+    )
+
+
+def _read_blocked(dataset, win, indexes, out, cache, grid):
+    """
+    Assemble `win` from whole decoded blocks (all bands per read call).
+    """
+
+    bh, bw = grid
+    x0, y0 = int(win.col_off), int(win.row_off)
+    x1, y1 = x0 + int(win.width), y0 + int(win.height)
+    key_prefix = (dataset.name, tuple(indexes))
+
+    for r in range(y0 // bh, (y1 - 1) // bh + 1):
+        for c in range(x0 // bw, (x1 - 1) // bw + 1):
+
+            key = key_prefix + (r, c)
+            block = cache.get(key)
+
+            if block is None:
+                block_win = Window(
+                    col_off=c * bw,
+                    row_off=r * bh,
+                    width=min(bw, dataset.width - c * bw),
+                    height=min(bh, dataset.height - r * bh),
+                )
+                block = dataset.read(
+                    indexes,
+                    window=block_win,
+                    masked=True
+                ).filled(0)
+                block = np.ascontiguousarray(np.moveaxis(block, 0, -1))
+                cache.put(key, block)
+
+            # Intersection of block and tile, in dataset pixel coordinates
+            bx0, by0 = c * bw, r * bh
+            ix0, iy0 = max(x0, bx0), max(y0, by0)
+            ix1 = min(x1, bx0 + block.shape[1])
+            iy1 = min(y1, by0 + block.shape[0])
+
+            out[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = \
+                block[iy0 - by0:iy1 - by0, ix0 - bx0:ix1 - bx0]
+
+    return out
+
+
+def read_tile(
+    dataset,
+    win,
+    band_index=None,
+    band_indices=None,
+    read_mode=None,
+    out=None,
+    cache=None,
+):
+    """
+    Read ONE window as an (H, W, bands) array, masked pixels filled with 0.
+
+    read_mode : "per_band" → one masked read per band, then np.stack
+                "blocked"  → all bands in one read into an (H, W, C)
+                             buffer; tiled TIFFs are assembled from whole
+                             blocks through `cache` (a BlockCache)
+    out       : optional preallocated (H, W, C) buffer of dataset dtype
+
+    read_mode defaults to settings.TILE_READ_MODE.
+    """
+
+    read_mode = read_mode or settings.TILE_READ_MODE
+
+    if read_mode == "per_band":
+        return _read_per_band(dataset, win, band_index, band_indices)
+
+    if band_index is not None:
+        indexes = [band_index]
+    elif band_indices is not None:
+        indexes = list(band_indices)
+    else:
+        indexes = list(dataset.indexes)
+
+    shape = (int(win.height), int(win.width), len(indexes))
+    if out is None:
+        out = np.empty(shape, dtype=dataset.dtypes[indexes[0] - 1])
+
+    grid = block_grid(dataset)
+
+    if grid is not None and cache is not None:
+        return _read_blocked(dataset, win, indexes, out, cache, grid)
+
+    tile = dataset.read(indexes, window=win, masked=True).filled(0)
+    out[...] = np.moveaxis(tile, 0, -1)
+    return out
+
+
+def _read_per_band(dataset, win, band_index=None, band_indices=None):
+
+    # ---- Single band (IR) ----
+    if band_index is not None:
+        tile = dataset.read(
+            band_index,
+            window=win,
+            masked=True
+        ).filled(0)
+
+        # (H, W) → (H, W, 1)
+        return tile[:, :, None]
+
+    # ---- Multi-band (RGB) ----
+    if band_indices is not None:
+        bands = []
+        for b in band_indices:
+            band = dataset.read(
+                b,
+                window=win,
+                masked=True
+            ).filled(0)
+            bands.append(band)
+
+        # (bands, H, W) → (H, W, bands)
+        return np.stack(bands, axis=-1)
+
+    # ---- All bands fallback ----
+    tile = dataset.read(
+        window=win,
+        masked=True
+    ).filled(0)
+
+    return np.moveaxis(tile, 0, -1)
+
+
+def generate_tiles(
+    dataset,
+    band_index=None,
+    band_indices=None,
+    read_mode=None,
+    snap_to_blocks=None,
+    coverage=None,
+):
     """
     Memory-safe tile generator with geospatial transform support.
 
@@ -20,77 +301,94 @@ def generate_tiles(dataset, band_index=None, band_indices=None):
         Read a single band (IR use-case)
     band_indices : list[int]
         Read multiple specific bands (RGB use-case)
+    read_mode : str
+        "blocked" or "per_band", see `read_tile`
+        (default: settings.TILE_READ_MODE)
+    snap_to_blocks : bool
+        Align tile steps to the TIFF block grid. Changes the tile grid,
+        so keep it off when tiles of two rasters are paired by index.
+        (default: settings.SNAP_TILES_TO_BLOCKS)
+    coverage : io.coverage.Coverage or None
+        Skip windows without valid pixels before any read.
 
     Yields
     ------
     dict with keys:
+        tile_id    : index of the window in the full tile grid
+                     (skipped windows keep their ids)
         tile       : np.ndarray
         window     : rasterio.windows.Window
         transform  : affine.Affine (tile-level geotransform)
         x, y       : pixel offsets
         bands      : number of bands
+        core       : tile-local (x0, y0, x1, y1) this tile owns
+                     (see `window_core`)
+        seams      : tile edges shared with neighbours (see `window_seams`)
     """
 
-    width, height = dataset.width, dataset.height
-    step = TILE_SIZE - OVERLAP
+    read_mode = read_mode or settings.TILE_READ_MODE
+    if snap_to_blocks is None:
+        snap_to_blocks = settings.SNAP_TILES_TO_BLOCKS
+
+    step = settings.TILE_SIZE - settings.OVERLAP
+    grid = block_grid(dataset)
+
+    if snap_to_blocks and grid is not None:
+        step = (
+            _block_aligned_step(step, grid[0]),
+            _block_aligned_step(step, grid[1]),
+        )
+
+    cache = BlockCache() if read_mode == "blocked" else None
 
     logger.info(
-        f"Generating tiles | step={step} | "
+        f"Generating tiles | step={step} | read_mode={read_mode} | "
+        f"blocks={grid} | "
         f"band_index={band_index} | band_indices={band_indices}"
     )
 
-    for y in range(0, height, step):
-        for x in range(0, width, step):
+    skipped = 0
 
-            win = Window(
-                col_off=x,
-                row_off=y,
-                width=min(TILE_SIZE, width - x),
-                height=min(TILE_SIZE, height - y),
-            )
+    for tile_id, win in enumerate(
+        iter_windows(dataset.width, dataset.height, step=step)
+    ):
 
-            # ---- Single band (IR) ----
-            if band_index is not None:
-                tile = dataset.read(
-                    band_index,
-                    window=win,
-                    masked=True
-                ).filled(0)
+        if coverage is not None and not coverage.covers(win):
+            skipped += 1
+            continue
 
-                # (H, W) → (H, W, 1)
-                tile = tile[:, :, None]
-
-            # ---- Multi-band (RGB) ----
-            elif band_indices is not None:
-                bands = []
-                for b in band_indices:
-                    band = dataset.read(
-                        b,
-                        window=win,
-                        masked=True
-                    ).filled(0)
-                    bands.append(band)
-
-                # (bands, H, W) → (H, W, bands)
-                tile = np.stack(bands, axis=-1)
-
-            # ---- All bands fallback ----
-            else:
-                tile = dataset.read(
-                    window=win,
-                    masked=True
-                ).filled(0)
+        tile = read_tile(
+            dataset,
+            win,
+            band_index=band_index,
+            band_indices=band_indices,
+            read_mode=read_mode,
+            cache=cache,
+        )
+
+        # 🔑 IMPORTANT: compute tile-level transform
+        tile_transform = window_transform(win, dataset.transform)
 
-                tile = np.moveaxis(tile, 0, -1)
+        yield {
+            "tile_id": tile_id,
+            "tile": tile,
+            "window": win,
+            "transform": tile_transform,
+            "x": int(win.col_off),
+            "y": int(win.row_off),
+            "bands": tile.shape[-1],
+            "core": window_core(
+                win, dataset.width, dataset.height, step=step
+            ),
+            "seams": window_seams(
+                win, dataset.width, dataset.height, step=step
+            ),
+        }
 
-            # 🔑 IMPORTANT: compute tile-level transform
-            tile_transform = window_transform(win, dataset.transform)
+    if coverage is not None:
+        logger.info(f"Skipped no-data tiles: {skipped}")
 
-            yield {
-                "tile": tile,
-                "window": win,
-                "transform": tile_transform,
-                "x": x,
-                "y": y,
-                "bands": tile.shape[-1],
-            }
+    if cache is not None:
+        logger.info(
+            f"Block cache | hits={cache.hits} | misses={cache.misses}"
+        )
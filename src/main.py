@@ -1,36 +1,29 @@
 # src/main.py
 
 from tqdm import tqdm
-import numpy as np
+import argparse
 import sys
-import os
+
+import yaml
 
 from src.io.tiff_reader import open_tiff
 from src.io.tile_generator import generate_tiles
+from src.io.coverage import coverage_map
 
 from src.thermal.normalization import normalize_ir_tile
-from src.geometry.orientation import estimate_row_orientation
-from src.geometry.rows import detect_row_mask, fill_panel_mask
-from src.geometry.panels import extract_panel_rois
+from src.geometry.features import TileGeometry
+from src.geometry.layer import GeometryLayerWriter
 
-from src.faults.detector import detect_faults
-from src.faults.merger import merge_faults_spatially
-from src.faults.exporter import export_csv, export_geojson
-from src.faults.classifier import classify_fault
+from src.faults.baseline import BASELINE_METHODS
+from src.faults.exporter import GEOJSON_MODES
 
-from src.visualization.annotator import annotate_tile
-from src.geometry.mask_utils import resize_mask_to_ir
-from src.faults.priority import compute_priority
+from src.pipeline.scheduler import SCHEDULERS
+from src.pipeline.plan import RGB_MASK_MODES
+from src.pipeline.batch import run_batch, run_sites
 
-from src.config import (
-    IR_PATH,
-    IR_BAND_INDEX,
-    RGB_PATH,
-    FAULTS_CSV,
-    FAULTS_GEOJSON,
-)
+from src.config import settings
 
-from src.utils.logger import get_logger
+from src.utils.logger import configure_logging, get_logger
 
 logger = get_logger()
 
@@ -48,12 +41,14 @@ MAX_ANNOTATED_TILES = 200   # avoid thousands of PNGs
 def run_step2():
     logger.info("STEP-2 STARTED: IR radiometric normalization")
 
-    ds = open_tiff(IR_PATH)
+    ds = open_tiff(settings.IR_PATH)
     total_tiles, non_zero_tiles = 0, 0
 
-    for idx, item in enumerate(
-        tqdm(generate_tiles(ds, band_index=IR_BAND_INDEX))
-    ):
+    band = settings.IR_BAND_INDEX
+    coverage = coverage_map(ds, band) if settings.SKIP_EMPTY_TILES else None
+
+    for item in tqdm(generate_tiles(ds, band_index=band, coverage=coverage)):
+        idx = item["tile_id"]
         ir_tile = item["tile"]
         if ir_tile is None or ir_tile.size == 0:
             continue
@@ -85,205 +80,266 @@ def run_step2():
 def run_step3():
     logger.info("STEP-3 STARTED: Panel geometry detection")
 
-    ds = open_tiff(RGB_PATH)
+    ds = open_tiff(settings.RGB_PATH)
+
+    coverage = (
+        coverage_map(ds, settings.RGB_BAND_INDICES)
+        if settings.SKIP_EMPTY_TILES else None
+    )
+
+    # Panel rectangles + row polygons, map coordinates (step 4: --rgb-mask layer)
+    layer = GeometryLayerWriter(ds.crs, source=settings.RGB_PATH)
 
-    for idx, item in enumerate(
-        tqdm(generate_tiles(ds, band_indices=[1, 2, 3]))
+    for item in tqdm(
+        generate_tiles(ds, band_indices=[1, 2, 3], coverage=coverage)
     ):
+        idx = item["tile_id"]
         rgb_tile = item["tile"]
         if rgb_tile is None or rgb_tile.shape[-1] != 3:
             continue
 
-        angle = estimate_row_orientation(rgb_tile)
-        row_mask = detect_row_mask(rgb_tile)
-        extract_panel_rois(row_mask)
+        # One edge pass feeds orientation, row mask and panel ROIs
+        geometry = TileGeometry(rgb_tile)
+        layer.add(idx, geometry, item["transform"])
 
         if idx < MAX_DEBUG_TILES:
-            logger.info(f"[STEP-3] Tile {idx} | angle={angle}")
+            logger.info(
+                f"[STEP-3] Tile {idx} | angle={geometry.orientation} "
+                f"| panels={len(geometry.rois)}"
+            )
 
     ds.close()
+    layer.write(settings.GEOMETRY_LAYER)
     logger.info("[STEP-3] COMPLETED")
 
 
 # ============================================================
 # STEP 4 + 5.5 + 6 — Detect → Merge → Classify → Annotate
 # ============================================================
-def run_step4():
+def run_step4(
+    scheduler="serial",
+    workers=None,
+    rgb_mask_mode=None,
+    build_rgb_overviews=None,
+    use_mask_cache=None,
+    geojson_mode=None,
+    gzip_exports=None,
+    annotate_only_faults=None,
+    resume=False,
+    profile_tile=None,
+):
+    """
+    The configured site (settings.IR_PATH / RGB_PATH and output paths)
+    as a one-site batch. Options left at None take their value from
+    settings.
+    """
     logger.info("STEP-4 STARTED: Thermal fault detection")
 
-    os.makedirs("outputs/annotated/ir", exist_ok=True)
-
-    ir_ds = open_tiff(IR_PATH)
-    rgb_ds = open_tiff(RGB_PATH)
-
-    all_faults = []
-    tile_id = 0
-
-    ir_tiles = generate_tiles(ir_ds, band_index=IR_BAND_INDEX)
-    rgb_tiles = generate_tiles(rgb_ds, band_indices=[1, 2, 3])
-
-    for ir_item, rgb_item in tqdm(
-        zip(ir_tiles, rgb_tiles),
-        desc="STEP-4 | IR + RGB tiles"
-    ):
-        ir_tile = ir_item["tile"]
-        transform = ir_item["transform"]
-        rgb_tile = rgb_item["tile"]
-
-        if (
-            ir_tile is None or ir_tile.size == 0 or
-            rgb_tile is None or rgb_tile.ndim != 3
-        ):
-            tile_id += 1
-            continue
-
-        # --------------------------------------------------
-        # STEP 2 — Normalize IR → ΔT
-        # --------------------------------------------------
-        delta_t, stats = normalize_ir_tile(ir_tile)
-
-        if (
-            delta_t is None
-            or stats is None
-            or not np.isfinite(delta_t).any()
-        ):
-            tile_id += 1
-            continue
-
-        # --------------------------------------------------
-        # STEP 3 → 4 BRIDGE: PANEL MASK (CRITICAL)
-        # --------------------------------------------------
-        row_mask = detect_row_mask(rgb_tile)
-        panel_mask_rgb = fill_panel_mask(row_mask)
-
-        panel_mask_ir = resize_mask_to_ir(
-            panel_mask_rgb,
-            delta_t.shape
-        )
-
-        # 🔍 DEBUG (first few tiles only)
-        if tile_id < 5:
-            logger.info(
-                f"[DEBUG] Tile {tile_id} | "
-                f"panel_pixels={panel_mask_ir.sum()} | "
-                f"coverage={panel_mask_ir.mean():.3f}"
-            )
-
-        if panel_mask_ir.sum() < 100:
-            # fallback: do not mask this tile
-            panel_mask_ir = None
-
-
-        # --------------------------------------------------
-        # STEP 4 — Fault detection (panel constrained)
-        # --------------------------------------------------
-        faults = detect_faults(
-            delta_t=delta_t,
-            transform=transform,
-            tile_id=tile_id,
-            panel_mask=panel_mask_ir
-        )
-
-        all_faults.extend(faults)
-
-        # --------------------------------------------------
-        # STEP 6.2 — Annotated overlays (tile-level)
-        # --------------------------------------------------
-        if tile_id < MAX_ANNOTATED_TILES:
-            annotate_tile(
-                image=ir_tile,
-                faults=faults,
-                tile_id=tile_id,
-                output_path=f"outputs/annotated/ir/tile_{tile_id:04d}.png"
-            )
-
-        tile_id += 1
-
-    ir_ds.close()
-    rgb_ds.close()
+    site = {
+        "name": settings.IR_PATH.stem,
+        "ir": settings.IR_PATH,
+        "rgb": settings.RGB_PATH,
+        "annotate_dir": settings.ANNOTATED_DIR,
+        "store_dir": settings.FAULT_STORE_DIR,
+        "faults_csv": settings.FAULTS_CSV,
+        "faults_geojson": settings.FAULTS_GEOJSON,
+        "geometry_layer": settings.GEOMETRY_LAYER,
+    }
+
+    merged_faults = run_sites(
+        [site],
+        scheduler=scheduler,
+        workers=workers,
+        rgb_mask_mode=rgb_mask_mode,
+        build_rgb_overviews=build_rgb_overviews,
+        use_mask_cache=use_mask_cache,
+        geojson_mode=geojson_mode,
+        gzip_exports=gzip_exports,
+        annotate_limit=MAX_ANNOTATED_TILES,
+        annotate_only_faults=annotate_only_faults,
+        resume=resume,
+        profile_tile=profile_tile,
+        profile_path=settings.PROFILE_DIR / "step4_profile.json",
+    )[site["name"]]
 
     logger.info(
-        f"[STEP-4] Tile-level detections: {len(all_faults)}"
+        f"PIPELINE COMPLETED | Physical faults={len(merged_faults)}"
     )
 
-    # --------------------------------------------------
-    # STEP 5.5 — Spatial merging
-    # --------------------------------------------------
-    merged_faults = merge_faults_spatially(all_faults)
-
-
-    # --------------------------------------------------
-    # STEP 6.0 — Priority scoring (NEW)
-    # --------------------------------------------------
-    for f in merged_faults:
-        f["priority"] = compute_priority(f)
-
-
-    # --------------------------------------------------
-    # STEP 6.0 — Severity-based reporting filter
-    # --------------------------------------------------
-    REPORTED_SEVERITIES = {"MEDIUM", "HIGH", "CRITICAL"}
 
-    filtered_faults = [
-        f for f in merged_faults
-        if f["severity"] in REPORTED_SEVERITIES
-    ]
+# ============================================================
+# Entry point
+# ============================================================
+if __name__ == "__main__":
 
-    logger.info(
-        f"[REPORT FILTER] "
-        f"Before={len(merged_faults)} | "
-        f"Reported={len(filtered_faults)}"
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description="Solar Police inspection pipeline",
     )
-
-
-    # --------------------------------------------------
-    # STEP 6.1 — Final classification
-    # --------------------------------------------------
-    for f in merged_faults:
-        f["fault_type"] = classify_fault(f)
-
-    from collections import Counter
-    logger.info(
-        f"[FINAL SEVERITY] {Counter(f['severity'] for f in merged_faults)}"
+    parser.add_argument("step", choices=["step2", "step3", "step4", "batch"])
+    parser.add_argument(
+        "--scheduler",
+        choices=SCHEDULERS,
+        default="serial",
+        help="STEP-4 tile execution engine (default: serial)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="STEP-4 worker count (default: CPU count - 1)",
+    )
+    parser.add_argument(
+        "--rgb-mask",
+        choices=RGB_MASK_MODES,
+        default=None,
+        help="STEP-4 RGB resolution for the panel mask",
+    )
+    parser.add_argument(
+        "--build-overviews",
+        action="store_true",
+        default=None,
+        help="build RGB overviews (.ovr) first when --rgb-mask overview",
+    )
+    parser.add_argument(
+        "--no-mask-cache",
+        dest="mask_cache",
+        action="store_false",
+        default=None,
+        help="recompute STEP-4 panel masks instead of reusing the cache",
+    )
+    parser.add_argument(
+        "--geojson-mode",
+        choices=GEOJSON_MODES,
+        default=None,
+        help="GeoJSON layout (default: pretty, indent=2; compact: no "
+             "whitespace; seq / ndjson: one feature per line)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        default=None,
+        help="gzip the CSV / GeoJSON exports",
+    )
+    parser.add_argument(
+        "--annotate-only-faults",
+        action="store_true",
+        default=None,
+        help="only write annotated tiles that contain detections",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip tiles completed by an earlier STEP-4 run on the same "
+             "inputs / detector parameters, then merge and export",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="batch: YAML / CSV list of sites (name, ir, rgb[, output_dir])",
+    )
+    parser.add_argument(
+        "--profile-tile",
+        type=int,
+        default=None,
+        metavar="TILE_ID",
+        help="run this STEP-4 tile under cProfile "
+             "(outputs/profile/tile_<id>.prof)",
     )
-
-    merged_faults.sort(
-    key=lambda x: x["priority"],
-    reverse=True
-        )
 
     # --------------------------------------------------
-    # STEP 6 — Export
+    # Settings (defaults < YAML < SOLAR_POLICE_* env < these flags)
     # --------------------------------------------------
-    export_csv(merged_faults, FAULTS_CSV)
-    export_geojson(merged_faults, FAULTS_GEOJSON)
-
-    logger.info(
-        f"PIPELINE COMPLETED | "
-        f"Tiles={tile_id} | Physical faults={len(merged_faults)}"
+    config = parser.add_argument_group("settings")
+    config.add_argument("--config", help="YAML settings file")
+    config.add_argument("--ir", dest="ir_path", help="IR orthomosaic")
+    config.add_argument("--rgb", dest="rgb_path", help="RGB orthomosaic")
+    config.add_argument("--data-dir", help="where ir.tif / rgb.tif are found")
+    config.add_argument("--output-dir", help="root of all outputs")
+    config.add_argument("--tile-size", type=int)
+    config.add_argument("--overlap", type=int)
+    config.add_argument(
+        "--dt-threshold", dest="local_dt_threshold", type=float,
+        help="local ΔT detection threshold",
+    )
+    config.add_argument(
+        "--normalization", dest="normalization_reference",
+        choices=("tile", "mosaic"),
+        help="ΔT reference: per-tile statistics or the mosaic background "
+             "model (mosaic changes detections: 21 → 11 faults on the "
+             "sample site)",
+    )
+    config.add_argument(
+        "--baseline", dest="baseline_method", choices=BASELINE_METHODS,
+        help="local ΔT baseline estimator (default: gaussian)",
+    )
+    config.add_argument("--min-area", dest="min_cluster_area", type=int)
+    config.add_argument("--max-area", dest="max_cluster_area", type=int)
+    config.add_argument(
+        "--merge-distance", dest="merge_distance_meters", type=float
+    )
+    config.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="any src/config.py setting, e.g. --set BORDER_PAD=12",
     )
-# ============================================================
-# Entry point
-# ============================================================
-if __name__ == "__main__":
 
     if len(sys.argv) < 2:
-        print(
-            "\nUsage:\n"
-            "  python -m src.main step2\n"
-            "  python -m src.main step3\n"
-            "  python -m src.main step4\n"
-        )
+        parser.print_help()
         sys.exit(1)
 
-    step = sys.argv[1].lower()
+    args = parser.parse_args()
+
+    overrides = {
+        name: getattr(args, name)
+        for name in (
+            "ir_path", "rgb_path", "data_dir", "output_dir",
+            "tile_size", "overlap", "local_dt_threshold",
+            "normalization_reference", "baseline_method",
+            "min_cluster_area", "max_cluster_area", "merge_distance_meters",
+        )
+    }
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--set expects NAME=VALUE, got '{item}'")
+        overrides[name] = yaml.safe_load(value)
+
+    settings.configure(config_file=args.config, **overrides)
+    configure_logging()
 
-    if step == "step2":
+    if args.step == "step2":
         run_step2()
-    elif step == "step3":
+    elif args.step == "step3":
         run_step3()
-    elif step == "step4":
-        run_step4()
-    else:
-        print(f"Unknown step: {step}")
-        sys.exit(1)
+    elif args.step == "step4":
+        run_step4(
+            scheduler=args.scheduler,
+            workers=args.workers,
+            rgb_mask_mode=args.rgb_mask,
+            build_rgb_overviews=args.build_overviews,
+            use_mask_cache=args.mask_cache,
+            geojson_mode=args.geojson_mode,
+            gzip_exports=args.gzip,
+            annotate_only_faults=args.annotate_only_faults,
+            resume=args.resume,
+            profile_tile=args.profile_tile,
+        )
+    elif args.step == "batch":
+        if not args.manifest:
+            parser.error("batch requires --manifest")
+        run_batch(
+            args.manifest,
+            scheduler=args.scheduler,
+            workers=args.workers,
+            rgb_mask_mode=args.rgb_mask,
+            build_rgb_overviews=args.build_overviews,
+            use_mask_cache=args.mask_cache,
+            geojson_mode=args.geojson_mode,
+            gzip_exports=args.gzip,
+            annotate_limit=MAX_ANNOTATED_TILES,
+            annotate_only_faults=args.annotate_only_faults,
+            resume=args.resume,
+        )
@@ -0,0 +1,386 @@
+# src/pipeline/batch.py
+
+import csv
+import os
+import re
+import time
+from pathlib import Path
+
+from tqdm import tqdm
+
+from src.faults.store import FaultStore
+from src.pipeline.scheduler import run_tasks
+from src.pipeline.worker import annotation_params, process_tile, close_datasets
+from src.pipeline.plan import plan_step4_tasks, step4_params
+from src.pipeline.checkpoint import TileCheckpoint, run_key
+from src.io.tiff_reader import raster_crs
+from src.pipeline.report import finalize_step4
+from src.visualization.writer import AnnotationWriter
+
+from src.config import settings
+from src.utils.profiling import (
+    empty_profile,
+    log_profile_summary,
+    merge_profile,
+    snapshot,
+    stage,
+    write_profile,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+def load_manifest(path):
+    """
+    Site list for a batch run, as dicts with name / ir / rgb / output_dir
+    and the output paths under it (see site_outputs).
+
+    YAML (`sites:` list, or a bare list) or CSV with a header row:
+
+        sites:
+          - name: site_a
+            ir: /data/site_a/ir.tif
+            rgb: /data/site_a/rgb.tif
+            output_dir: /reports/site_a     # optional
+
+    Relative paths are taken relative to the manifest. Without
+    output_dir a site writes to OUTPUT_DIR/sites/<name>.
+    """
+
+    path = Path(path)
+
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as f:
+            rows = [
+                {k.strip().lower(): (v or "").strip() for k, v in r.items()}
+                for r in csv.DictReader(f)
+            ]
+    else:
+        import yaml
+
+        with open(path) as f:
+            doc = yaml.safe_load(f) or []
+        rows = doc.get("sites", []) if isinstance(doc, dict) else doc
+
+    sites, names = [], set()
+    for i, row in enumerate(rows):
+        missing = [k for k in ("ir", "rgb") if not row.get(k)]
+        if missing:
+            raise ValueError(f"{path}: site {i} is missing {missing}")
+
+        name = str(row.get("name") or Path(row["ir"]).parent.name or i)
+        name = re.sub(r"[^\w.-]+", "_", name)
+        if name in names:
+            raise ValueError(f"{path}: duplicate site name '{name}'")
+        names.add(name)
+
+        def _resolve(p):
+            p = Path(p).expanduser()
+            return p if p.is_absolute() else (path.parent / p).resolve()
+
+        out = row.get("output_dir")
+        out = (
+            _resolve(out) if out
+            else Path(settings.OUTPUT_DIR) / "sites" / name
+        )
+        sites.append({
+            "name": name,
+            "ir": _resolve(row["ir"]),
+            "rgb": _resolve(row["rgb"]),
+            "output_dir": out,
+            **site_outputs(out),
+        })
+
+    return sites
+
+
+def site_outputs(output_dir):
+    """
+    Output paths of one site under its output_dir (the keys run_sites
+    reads besides name / ir / rgb).
+    """
+
+    out = Path(output_dir)
+    return {
+        "annotate_dir": out / "annotated" / "ir",
+        "store_dir": out / "faults" / "store",
+        "faults_csv": out / "faults" / "faults.csv",
+        "faults_geojson": out / "faults" / "faults.geojson",
+        "geometry_layer": out / "geometry" / "panels.npz",   # step-3 output
+    }
+
+
+class _SiteRun:
+    """
+    Per-site state while its tiles are in flight: task index, fault
+    store, checkpoint and the number of tiles still outstanding.
+    """
+
+    def __init__(self, site, tasks, key):
+        self.site = site
+        self.tasks = {t["tile_id"]: t for t in tasks}
+        self.pending = list(tasks)
+        self.remaining = len(tasks)
+        self.checkpoint = TileCheckpoint(key)
+        self.store = None
+        self.faults = None
+
+    def start(self, resume):
+        self.store = FaultStore(
+            self.site["store_dir"], chunk_size=settings.FAULT_STORE_CHUNK
+        )
+        if resume:
+            done = self.checkpoint.load()
+            for tile_id in sorted(done):
+                self.store.append(done[tile_id]["faults"])
+            self.pending = [
+                t for t in self.pending if t["tile_id"] not in done
+            ]
+            self.remaining = len(self.pending)
+
+            logger.info(
+                f"[RESUME] {self.site['name']} | {self.checkpoint.dir} | "
+                f"completed={len(done)} | remaining={self.remaining}"
+            )
+        self.checkpoint.open(resume=resume)
+
+
+def plan_batch(
+    sites,
+    rgb_mask_mode=None,
+    build_rgb_overviews=None,
+    use_mask_cache=None,
+    annotate_limit=0,
+    annotate_only_faults=False,
+    annotate_inline=True,
+):
+    """
+    Plan every site and order them largest first (by tile count).
+
+    All tiles then go through ONE worker pool in that order: the big
+    sites start immediately and the small ones fill the cores while the
+    last big tiles finish, instead of idling at the end of each site.
+    """
+
+    runs = []
+    for site in sites:
+        os.makedirs(site["annotate_dir"], exist_ok=True)
+
+        tasks = plan_step4_tasks(
+            site["ir"],
+            site["rgb"],
+            rgb_mask_mode=rgb_mask_mode,
+            build_rgb_overviews=build_rgb_overviews,
+            use_mask_cache=use_mask_cache,
+            annotate_dir=site["annotate_dir"],
+            annotate_limit=annotate_limit,
+            annotate_ext=settings.ANNOTATION_FORMAT,
+            annotate_only_faults=annotate_only_faults,
+            annotate_inline=annotate_inline,
+            geometry_layer=site["geometry_layer"],
+        )
+        for t in tasks:
+            t["site"] = site["name"]
+
+        key = run_key(
+            site["ir"], site["rgb"],
+            step4_params(rgb_mask_mode, site["geometry_layer"], tasks=tasks),
+        )
+        runs.append(_SiteRun(site, tasks, key))
+
+    runs.sort(key=lambda r: len(r.tasks), reverse=True)
+    return runs
+
+
+def run_sites(
+    sites,
+    scheduler="serial",
+    workers=None,
+    rgb_mask_mode=None,
+    build_rgb_overviews=None,
+    use_mask_cache=None,
+    geojson_mode=None,
+    gzip_exports=None,
+    annotate_limit=0,
+    annotate_only_faults=None,
+    resume=False,
+    profile_tile=None,
+    profile_path=None,
+    desc="STEP-4 | IR + RGB tiles",
+):
+    """
+    STEP 4 → 6 for `sites` (dicts as from load_manifest): plan, one
+    scheduler / worker pool for all tiles, per-site fault store and
+    checkpoint, merge + export of each site as soon as its last tile
+    returns, one run profile (profile_path). Both `step4` (one site from
+    settings) and `batch` run through here.
+
+    profile_tile runs that tile id under cProfile (py-spy: attach to the
+    logged pid). Options left at None take their value from settings.
+    Returns {site name: merged faults (FaultTable)}.
+    """
+
+    t_start = time.perf_counter()
+    snapshot()   # drop anything recorded before this run
+
+    rgb_mask_mode = rgb_mask_mode or settings.RGB_MASK_MODE
+    geojson_mode = geojson_mode or settings.EXPORT_GEOJSON_MODE
+    if gzip_exports is None:
+        gzip_exports = settings.EXPORT_GZIP
+    if annotate_only_faults is None:
+        annotate_only_faults = settings.ANNOTATE_ONLY_FAULTS
+
+    with stage("plan"):
+        runs = plan_batch(
+            sites,
+            rgb_mask_mode=rgb_mask_mode,
+            build_rgb_overviews=build_rgb_overviews,
+            use_mask_cache=use_mask_cache,
+            annotate_limit=annotate_limit,
+            annotate_only_faults=annotate_only_faults,
+            annotate_inline=scheduler != "serial",
+        )
+
+    # Opt-in cProfile of a single tile (tile ids follow the full grid,
+    # so a skipped no-data tile is simply not profiled)
+    for run in runs:
+        if profile_tile in run.tasks:
+            run.tasks[profile_tile]["cprofile_path"] = str(
+                settings.PROFILE_DIR / f"tile_{profile_tile}.prof"
+            )
+
+    by_name = {r.site["name"]: r for r in runs}
+    merged = {}
+
+    def _finish(run):
+        run.checkpoint.close()
+        run.store.flush()
+        logger.info(f"[SITE] {run.site['name']} | tiles={len(run.tasks)}")
+        merged[run.site["name"]] = finalize_step4(
+            run.store,
+            run.site["faults_csv"],
+            run.site["faults_geojson"],
+            geojson_mode=geojson_mode,
+            gzip_exports=gzip_exports,
+            crs=raster_crs(run.site["ir"]),
+        )
+        run.store = None   # release buffers before the next site
+
+    pending = []
+    for run in runs:
+        run.start(resume)
+        if run.remaining == 0:
+            _finish(run)
+        pending.extend(run.pending)
+
+    logger.info(
+        f"[SITES] sites={len(runs)} | tiles={len(pending)} | "
+        f"largest site={len(runs[0].tasks) if runs else 0} tiles"
+    )
+
+    # Serial runs hand annotation encoding to background threads
+    annotations = AnnotationWriter(
+        max_workers=settings.ANNOTATION_WORKERS,
+        max_pending=settings.ANNOTATION_QUEUE,
+        params=annotation_params(),
+    )
+    profile = empty_profile()
+
+    for result in tqdm(
+        run_tasks(process_tile, pending, scheduler=scheduler, workers=workers),
+        total=len(pending),
+        desc=desc,
+    ):
+        merge_profile(profile, result.pop("profile"))
+
+        run = by_name[result["site"]]
+        task = run.tasks[result["tile_id"]]
+        run.store.append(result["faults"])
+        run.checkpoint.write(task, result)
+
+        if "annotation" in result:
+            annotations.submit(
+                result["annotation"],
+                result["faults"],
+                result["tile_id"],
+                task["annotate_path"],
+            )
+
+        run.remaining -= 1
+        if run.remaining == 0:
+            _finish(run)
+
+    close_datasets()
+    annotations.close()
+
+    # --------------------------------------------------
+    # Run profile (stage timers summed over workers)
+    # --------------------------------------------------
+    merge_profile(profile, snapshot())
+    wall = time.perf_counter() - t_start
+
+    write_profile(
+        profile,
+        profile_path or settings.PROFILE_DIR / "step4_profile.json",
+        wall,
+        meta={
+            "scheduler": scheduler,
+            "workers": workers,
+            "sites": {name: len(f) for name, f in merged.items()},
+            "tiles": sum(len(r.tasks) for r in runs),
+            "tiles_run": len(pending),
+            "faults": sum(len(f) for f in merged.values()),
+        },
+    )
+    log_profile_summary(profile, wall)
+
+    return merged
+
+
+def run_batch(
+    manifest,
+    scheduler="processes",
+    workers=None,
+    rgb_mask_mode=None,
+    build_rgb_overviews=None,
+    use_mask_cache=None,
+    geojson_mode=None,
+    gzip_exports=None,
+    annotate_limit=0,
+    annotate_only_faults=None,
+    resume=False,
+):
+    """
+    STEP 4 → 6 for every site of `manifest` in one invocation.
+
+    Tiles of all sites share one scheduler / worker pool; a site is
+    merged and exported as soon as its last tile returns, into its own
+    output_dir (faults/, annotated/ir/). Options left at None take their
+    value from settings. Returns {site name: number of faults}.
+    """
+
+    sites = load_manifest(manifest)
+    logger.info(f"BATCH STARTED | sites={len(sites)} | manifest={manifest}")
+
+    merged = run_sites(
+        sites,
+        scheduler=scheduler,
+        workers=workers,
+        rgb_mask_mode=rgb_mask_mode,
+        build_rgb_overviews=build_rgb_overviews,
+        use_mask_cache=use_mask_cache,
+        geojson_mode=geojson_mode,
+        gzip_exports=gzip_exports,
+        annotate_limit=annotate_limit,
+        annotate_only_faults=annotate_only_faults,
+        resume=resume,
+        profile_path=settings.PROFILE_DIR / "batch_profile.json",
+        desc="BATCH | IR + RGB tiles",
+    )
+    summary = {name: len(faults) for name, faults in merged.items()}
+
+    logger.info(
+        f"BATCH COMPLETED | sites={len(summary)} | "
+        f"faults={sum(summary.values())}"
+    )
+    return summary
@@ -0,0 +1,92 @@
+# src/pipeline/checkpoint.py
+
+import json
+import os
+
+from src.config import settings
+from src.utils.hashing import file_digest, params_digest
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def run_key(ir_path, rgb_path, params):
+    """
+    Identity of a step-4 tile pass: IR + RGB content and every parameter
+    that changes tile-level results. Merge / classify / export settings
+    are deliberately not part of it, so those can be re-run on top of a
+    completed checkpoint.
+    """
+    return params_digest({
+        "ir": file_digest(ir_path, memo_path=settings.DIGEST_MEMO),
+        "rgb": file_digest(rgb_path, memo_path=settings.DIGEST_MEMO),
+        "params": params,
+    })
+
+
+class TileCheckpoint:
+    """
+    Append-only per-tile checkpoint: one JSON line per processed tile
+    (window, normalization stats, tile-level faults) under
+    <root>/<run key>/tiles.jsonl.
+
+    Lines are flushed as tiles complete, so a killed run loses at most
+    the tiles in flight; a truncated last line is ignored on load.
+    """
+
+    def __init__(self, key, root=None):
+        self.dir = os.path.join(str(root or settings.CHECKPOINT_DIR), key)
+        self.path = os.path.join(self.dir, "tiles.jsonl")
+        self._file = None
+
+    def load(self):
+        """
+        {tile_id: record} of completed tiles (empty when none).
+        """
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    break   # partial line from an interrupted write
+                done[rec["tile_id"]] = rec
+
+        return done
+
+    def open(self, resume):
+        """
+        Start writing; keeps earlier records when resuming, else starts
+        a fresh checkpoint for this run key.
+        """
+        os.makedirs(self.dir, exist_ok=True)
+
+        if resume:
+            # Drop a trailing partial line before appending
+            done = self.load()
+            with open(self.path, "w") as f:
+                for rec in done.values():
+                    f.write(json.dumps(rec) + "\n")
+
+        self._file = open(self.path, "a" if resume else "w")
+
+    def write(self, task, result):
+        w = task["ir_window"]
+        rec = {
+            "tile_id": result["tile_id"],
+            "window": [
+                int(w.col_off), int(w.row_off), int(w.width), int(w.height)
+            ],
+            "stats": result.get("stats"),
+            "faults": list(result["faults"]),
+        }
+        self._file.write(json.dumps(rec) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,252 @@
+# src/pipeline/plan.py
+
+import os
+
+from src.io.tiff_reader import open_tiff
+from src.io.coregistration import iter_coregistered_windows, pixel_scale
+from src.io.tile_generator import window_core, window_seams
+from src.io.coverage import coverage_map
+from src.io.overviews import build_overviews, select_overview
+from src.geometry.mask_cache import mask_cache_dir
+from src.geometry.rows import geometry_params
+from src.geometry.layer import GeometryLayer
+from src.faults.detector import detector_params
+from src.thermal.background import background_model
+
+from src.config import settings
+from src.utils.hashing import file_digest
+from src.utils.profiling import count
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+RGB_MASK_MODES = ("ir", "overview", "native", "layer")
+
+
+def step4_params(rgb_mask_mode=None, geometry_layer=None, tasks=None):
+    """
+    Every setting that changes tile-level step-4 results (checkpoint key).
+    In "layer" mode the content of the geometry layer is part of it; in
+    "overview" mode the RGB overview the plan (`tasks`) actually reads,
+    which changes when overviews are built between runs.
+    """
+    rgb_mask_mode = rgb_mask_mode or settings.RGB_MASK_MODE
+    params = {
+        "tile": [
+            settings.TILE_SIZE, settings.OVERLAP, settings.TILE_OWNERSHIP
+        ],
+        "bands": [settings.IR_BAND_INDEX, list(settings.RGB_BAND_INDICES)],
+        "normalization_median": settings.NORMALIZATION_MEDIAN,
+        "normalization_reference": settings.NORMALIZATION_REFERENCE,
+        "rgb_mask_mode": rgb_mask_mode,
+        "rgb_resampling": settings.RGB_RESAMPLING,
+        "geometry": geometry_params(),
+        "detector": detector_params(),
+    }
+    if uses_background_model():
+        params["background"] = [
+            settings.BACKGROUND_BLOCK,
+            settings.BACKGROUND_DECIMATION,
+            settings.BACKGROUND_CONTEXT or settings.TILE_SIZE,
+        ]
+    if rgb_mask_mode == "layer":
+        params["geometry_layer"] = file_digest(
+            geometry_layer or settings.GEOMETRY_LAYER,
+            memo_path=settings.DIGEST_MEMO,
+        )
+    if rgb_mask_mode == "overview" and tasks:
+        params["rgb_overview"] = [
+            tasks[0]["rgb_overview_level"], tasks[0]["rgb_scale"]
+        ]
+    return params
+
+
+def uses_background_model():
+    return (
+        settings.NORMALIZATION_REFERENCE == "mosaic"
+        or settings.BASELINE_METHOD == "blocks"
+    )
+
+
+def _check_layer(path, ir_ds):
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No geometry layer at {path}; run step3 first "
+            f"(or choose another --rgb-mask mode)"
+        )
+
+    layer = GeometryLayer.load(path)
+    if layer.crs is not None and ir_ds.crs is not None \
+            and layer.crs != ir_ds.crs:
+        raise ValueError(
+            f"{path}: geometry layer CRS {layer.crs} does not match "
+            f"the IR ortho ({ir_ds.crs})"
+        )
+
+    logger.info(f"[PLAN] Geometry layer: {path} | panels={len(layer)}")
+
+
+def plan_step4_tasks(
+    ir_path,
+    rgb_path,
+    rgb_mask_mode=None,
+    build_rgb_overviews=None,
+    use_mask_cache=None,
+    annotate_dir=None,
+    annotate_limit=0,
+    annotate_ext="png",
+    annotate_only_faults=False,
+    annotate_inline=True,
+    skip_empty=None,
+    geometry_layer=None,
+):
+    """
+    STEP-4 tile plan: one task per IR tile (see worker.process_tile).
+
+    rgb_mask_mode decides the RGB working resolution of the panel mask:
+        "ir"       → RGB read straight onto the IR tile grid
+        "overview" → coarsest overview finer than the IR GSD
+                     (built first when build_rgb_overviews is set)
+        "native"   → full-resolution RGB windows
+        "layer"    → no RGB read: rasterized from the step-3 geometry
+                     layer (geometry_layer, default settings.GEOMETRY_LAYER)
+
+    use_mask_cache reuses panel masks from earlier runs on the same RGB
+    content and geometry parameters (see geometry.mask_cache).
+
+    The first `annotate_limit` tiles are annotated (None = all), only
+    those with detections when annotate_only_faults is set. With
+    annotate_inline the worker writes the image itself; otherwise it
+    hands the IR tile back for the caller's AnnotationWriter.
+
+    skip_empty drops tiles whose IR window holds no valid pixel, when the
+    IR has sparse blocks or a mask overview (see io.coverage); tile ids
+    stay those of the full grid.
+
+    Options left at None take their value from settings.
+    """
+
+    rgb_mask_mode = rgb_mask_mode or settings.RGB_MASK_MODE
+    if build_rgb_overviews is None:
+        build_rgb_overviews = settings.BUILD_RGB_OVERVIEWS
+    if use_mask_cache is None:
+        use_mask_cache = settings.USE_PANEL_MASK_CACHE
+    if skip_empty is None:
+        skip_empty = settings.SKIP_EMPTY_TILES
+    geometry_layer = geometry_layer or settings.GEOMETRY_LAYER
+
+    if rgb_mask_mode not in RGB_MASK_MODES:
+        raise ValueError(
+            f"Unknown rgb_mask_mode '{rgb_mask_mode}', "
+            f"expected one of {RGB_MASK_MODES}"
+        )
+
+    ir_ds = open_tiff(ir_path)
+    rgb_ds = open_tiff(rgb_path)
+
+    # Native RGB pixels per IR pixel
+    native_scale = pixel_scale(rgb_ds, ir_ds)
+    overview_level, factor = None, 1
+
+    if rgb_mask_mode == "overview":
+        if build_rgb_overviews:
+            rgb_ds.close()
+            build_overviews(rgb_path)
+            rgb_ds = open_tiff(rgb_path)
+
+        overview_level, factor = select_overview(rgb_ds, native_scale)
+
+        if overview_level is not None:
+            rgb_ds.close()
+            rgb_ds = open_tiff(rgb_path, overview_level=overview_level)
+
+    if rgb_mask_mode == "layer":
+        _check_layer(geometry_layer, ir_ds)
+        use_mask_cache = False   # nothing left to cache
+
+    logger.info(
+        f"[PLAN] RGB mask mode={rgb_mask_mode} | "
+        f"RGB px per IR px={native_scale:.2f} | overview factor={factor}"
+    )
+
+    mask_cache = None
+    if use_mask_cache:
+        mask_cache = mask_cache_dir(rgb_path, {
+            "rgb_mask_mode": rgb_mask_mode,
+            "overview_factor": factor,
+            "native_scale": round(native_scale, 6),
+            "resampling": settings.RGB_RESAMPLING,
+            "rgb_bands": list(settings.RGB_BAND_INDICES),
+        })
+        logger.info(f"[PLAN] Panel mask cache: {mask_cache}")
+
+    coverage = (
+        coverage_map(ir_ds, settings.IR_BAND_INDEX) if skip_empty else None
+    )
+
+    # Mosaic background model (normalization / "blocks" baseline),
+    # built once per IR ortho and cached
+    background = None
+    if uses_background_model():
+        _, background = background_model(ir_path)
+
+    tasks = []
+    skipped = 0
+    for tile_id, (ir_win, rgb_win) in enumerate(
+        iter_coregistered_windows(ir_ds, rgb_ds)
+    ):
+        if coverage is not None and not coverage.covers(ir_win):
+            skipped += 1
+            continue
+
+        if rgb_mask_mode == "ir":
+            rgb_shape = (int(ir_win.height), int(ir_win.width))
+            rgb_scale = native_scale
+        else:
+            rgb_shape = (round(rgb_win.height), round(rgb_win.width))
+            rgb_scale = factor
+
+        tasks.append({
+            "tile_id": tile_id,
+            "ir_path": ir_path,
+            "rgb_path": rgb_path,
+            "rgb_overview_level": overview_level,
+            "ir_window": ir_win,
+            "core": (
+                window_core(ir_win, ir_ds.width, ir_ds.height)
+                if settings.TILE_OWNERSHIP else None
+            ),
+            "seams": (
+                window_seams(ir_win, ir_ds.width, ir_ds.height)
+                if settings.TILE_OWNERSHIP else None
+            ),
+            "rgb_window": rgb_win,
+            "rgb_shape": rgb_shape,
+            "rgb_scale": rgb_scale,
+            "ir_band_index": settings.IR_BAND_INDEX,
+            "rgb_bands": list(settings.RGB_BAND_INDICES),
+            "mask_cache": mask_cache,
+            "background": background,
+            "geometry_layer": (
+                str(geometry_layer) if rgb_mask_mode == "layer" else None
+            ),
+            "annotate_path": (
+                f"{annotate_dir}/tile_{tile_id:04d}.{annotate_ext}"
+                if annotate_dir and (
+                    annotate_limit is None or tile_id < annotate_limit
+                ) else None
+            ),
+            "annotate_only_faults": annotate_only_faults,
+            "annotate_inline": annotate_inline,
+        })
+
+    ir_ds.close()
+    rgb_ds.close()
+
+    if coverage is not None:
+        count("tiles_skipped_nodata", skipped)
+        logger.info(
+            f"[PLAN] Tiles={len(tasks)} | skipped no-data={skipped}"
+        )
+
+    return tasks
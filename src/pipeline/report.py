@@ -0,0 +1,89 @@
+# src/pipeline/report.py
+
+import os
+from collections import Counter
+
+from src.faults.merger import merge_fault_store
+from src.faults.exporter import export_csv, export_geojson
+
+from src.config import settings
+from src.utils.profiling import stage
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+REPORTED_SEVERITIES = {"MEDIUM", "HIGH", "CRITICAL"}
+
+
+def finalize_step4(
+    store,
+    csv_path,
+    geojson_path,
+    geojson_mode="pretty",
+    gzip_exports=False,
+    crs=None,
+):
+    """
+    STEP 5.5 + 6 for one site: merge the tile-level FaultStore, score,
+    classify, sort by priority and export. Returns the merged faults
+    (FaultTable). `crs` is the IR CRS, so the merge radius is in metres.
+    """
+
+    logger.info(
+        f"[STEP-4] Tile-level detections: {len(store)}"
+    )
+
+    # --------------------------------------------------
+    # STEP 5.5 — Spatial merging (streams the store)
+    # --------------------------------------------------
+    logger.info(
+        f"[MERGE] radius={settings.MERGE_DISTANCE_METERS} m | "
+        f"crs={crs.to_string() if crs else 'none (pixels)'}"
+    )
+    with stage("merge"):
+        merged_faults = merge_fault_store(store, crs)
+
+    # --------------------------------------------------
+    # STEP 6.0 — Priority scoring (NEW)
+    # --------------------------------------------------
+    with stage("score"):
+        merged_faults["priority"] = merged_faults.priority()
+
+    # --------------------------------------------------
+    # STEP 6.0 — Severity-based reporting filter
+    # --------------------------------------------------
+    filtered_faults = merged_faults.filter(REPORTED_SEVERITIES)
+
+    logger.info(
+        f"[REPORT FILTER] "
+        f"Before={len(merged_faults)} | "
+        f"Reported={len(filtered_faults)}"
+    )
+
+    # --------------------------------------------------
+    # STEP 6.1 — Final classification
+    # --------------------------------------------------
+    merged_faults["fault_type"] = merged_faults.classify()
+
+    logger.info(
+        f"[FINAL SEVERITY] {Counter(merged_faults.severity_counts())}"
+    )
+
+    merged_faults = merged_faults.sort_by("priority", descending=True)
+
+    # --------------------------------------------------
+    # STEP 6 — Export
+    # --------------------------------------------------
+    with stage("export"):
+        os.makedirs(os.path.dirname(str(csv_path)), exist_ok=True)
+        os.makedirs(os.path.dirname(str(geojson_path)), exist_ok=True)
+        # Dicts only from here on, one row at a time
+        export_csv(merged_faults.to_dicts(), csv_path, compress=gzip_exports)
+        export_geojson(
+            merged_faults.to_dicts(),
+            geojson_path,
+            mode=geojson_mode,
+            compress=gzip_exports
+        )
+
+    return merged_faults
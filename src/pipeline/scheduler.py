@@ -0,0 +1,109 @@
+# src/pipeline/scheduler.py
+
+import os
+
+from src.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+SCHEDULERS = ("serial", "processes", "dask")
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def run_tasks(fn, tasks, scheduler="serial", workers=None):
+    """
+    Fan `fn` out over `tasks` and yield the results.
+
+    scheduler : "serial"    → in-process loop (tasks in order)
+                "processes" → concurrent.futures process pool
+                "dask"      → dask.distributed LocalCluster
+
+    Results of the parallel schedulers arrive in completion order;
+    callers that need a deterministic reduction must re-order them
+    (every tile result carries its tile_id). Worker processes run with
+    the caller's resolved settings.
+    """
+
+    if scheduler not in SCHEDULERS:
+        raise ValueError(
+            f"Unknown scheduler '{scheduler}', expected one of {SCHEDULERS}"
+        )
+
+    workers = workers or default_workers()
+
+    if scheduler == "serial" or workers == 1:
+        logger.info("Tile scheduler | serial")
+        for task in tasks:
+            yield fn(task)
+        return
+
+    if scheduler == "processes":
+        yield from _run_process_pool(fn, tasks, workers)
+    else:
+        yield from _run_dask(fn, tasks, workers)
+
+
+def _run_process_pool(fn, tasks, workers):
+    from concurrent.futures import ProcessPoolExecutor
+    from src.pipeline.worker import init_worker
+
+    logger.info(f"Tile scheduler | processes | workers={workers}")
+
+    # Large chunks amortize IPC; small enough to keep all workers busy
+    chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(settings.export(),),
+    ) as pool:
+        yield from pool.map(fn, tasks, chunksize=chunksize)
+
+
+def _run_dask(fn, tasks, workers):
+    try:
+        from distributed import (
+            Client, LocalCluster, WorkerPlugin, as_completed,
+        )
+    except ImportError as exc:
+        raise ImportError(
+            "scheduler='dask' requires `dask` and `distributed` "
+            "(see requirements.txt)"
+        ) from exc
+
+    from src.pipeline.worker import init_worker
+
+    class SettingsPlugin(WorkerPlugin):
+        """
+        init_worker on every worker, including restarted or late-joining
+        ones (client.run only reaches the workers alive at the time).
+        """
+
+        name = "solar-police-settings"
+
+        def __init__(self, values):
+            self.values = values
+
+        def setup(self, worker):
+            init_worker(self.values)
+
+    logger.info(f"Tile scheduler | dask | workers={workers}")
+
+    with LocalCluster(
+        n_workers=workers,
+        threads_per_worker=1,
+        processes=True,
+    ) as cluster, Client(cluster) as client:
+        # register_worker_plugin: distributed < 2023.9.2
+        register = getattr(client, "register_plugin", None)
+        register = register or client.register_worker_plugin
+        register(SettingsPlugin(settings.export()))
+
+        futures = client.map(fn, tasks, pure=False)
+        for future, result in as_completed(futures, with_results=True):
+            yield result
+            future.release()
@@ -0,0 +1,329 @@
+# src/pipeline/worker.py
+
+import numpy as np
+from rasterio.windows import transform as window_transform
+
+from src.io.tiff_reader import open_tiff
+from src.io.tile_generator import BlockCache, read_tile
+from src.io.coregistration import aligned_window, read_coregistered
+
+from src.thermal.normalization import (
+    normalize_ir_tile_fused,
+    normalize_ir_tile_model,
+)
+from src.thermal.background import BackgroundModel
+from src.geometry.features import TileGeometry
+from src.geometry.layer import GeometryLayer
+from src.geometry.mask_utils import resize_mask_to_ir
+from src.geometry.mask_cache import tile_key, load_panel_mask, save_panel_mask
+
+from src.faults.detector import detect_faults
+from src.visualization.annotator import annotate_tile, encode_params
+
+from src.config import settings
+from src.utils.profiling import count, run_cprofile, snapshot, stage
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# One rasterio handle + block cache per (process, path) — never pickled
+_DATASETS = {}
+_BLOCK_CACHES = {}
+
+# Reusable float32 ΔT buffers, one per tile shape
+_DT_BUFFERS = {}
+
+# Step-3 geometry layers / background models, loaded once per process
+_LAYERS = {}
+_BACKGROUNDS = {}
+
+
+def _get_dataset(path, overview_level=None):
+    key = (path, overview_level)
+    ds = _DATASETS.get(key)
+    if ds is None or ds.closed:
+        # Batch runs visit many sites: keep only the newest handles
+        while len(_DATASETS) >= settings.MAX_OPEN_DATASETS:
+            old = next(iter(_DATASETS))
+            _DATASETS.pop(old).close()
+            _BLOCK_CACHES.pop(old, None)
+
+        ds = open_tiff(path, overview_level=overview_level)
+        _DATASETS[key] = ds
+        _BLOCK_CACHES[key] = BlockCache()
+    return ds
+
+
+def close_datasets():
+    for ds in _DATASETS.values():
+        ds.close()
+    _DATASETS.clear()
+    _BLOCK_CACHES.clear()
+
+
+def annotation_params():
+    return encode_params(
+        settings.ANNOTATION_FORMAT,
+        settings.PNG_COMPRESSION,
+        settings.ANNOTATION_QUALITY,
+    )
+
+
+def init_worker(values=None):
+    """
+    Pool initializer: adopt the parent's resolved settings (`values`,
+    from settings.export(); no config files are re-read) and keep OpenCV
+    single-threaded inside worker processes so N workers do not
+    oversubscribe the cores.
+    """
+    import cv2
+    cv2.setNumThreads(1)
+
+    if values is not None:
+        settings.load(values)
+
+    # Forked workers inherit the parent's timers; start from zero
+    snapshot()
+
+
+def _read_rgb(task):
+    """
+    Co-registered RGB footprint at the planned working resolution.
+    """
+
+    rgb_key = (task["rgb_path"], task["rgb_overview_level"])
+    rgb_ds = _get_dataset(*rgb_key)
+
+    rgb_win = aligned_window(rgb_ds, task["rgb_window"], task["rgb_shape"])
+    if rgb_win is not None:
+        return read_tile(
+            rgb_ds,
+            rgb_win,
+            band_indices=task["rgb_bands"],
+            cache=_BLOCK_CACHES[rgb_key],
+        )
+
+    return read_coregistered(
+        rgb_ds,
+        task["rgb_window"],
+        task["rgb_shape"],
+        task["rgb_bands"],
+    )
+
+
+def _get_layer(path):
+    if path not in _LAYERS:
+        _LAYERS[path] = GeometryLayer.load(path)
+    return _LAYERS[path]
+
+
+def _get_background(path):
+    if path not in _BACKGROUNDS:
+        _BACKGROUNDS[path] = BackgroundModel.load(path)
+    return _BACKGROUNDS[path]
+
+
+def _panel_mask(task, ir_shape, transform):
+    """
+    IR-resolution panel mask; rasterized from the step-3 geometry layer
+    or served from the on-disk cache when valid, in which case the RGB
+    read and morphology are skipped entirely.
+    """
+
+    if task.get("geometry_layer"):
+        with stage("panel_mask.layer"):
+            return _get_layer(task["geometry_layer"]).panel_mask(
+                transform, ir_shape
+            )
+
+    cache_dir = task["mask_cache"]
+    if cache_dir is not None:
+        key = tile_key(task["rgb_window"], ir_shape)
+        mask = load_panel_mask(cache_dir, key)
+        if mask is not None:
+            count("mask_cache_hits")
+            return mask
+        count("mask_cache_misses")
+
+    with stage("panel_mask.read_rgb"):
+        rgb_tile = _read_rgb(task)
+    count("bytes_read_rgb", rgb_tile.nbytes)
+
+    with stage("panel_mask.geometry"):
+        geometry = TileGeometry(rgb_tile, scale=task["rgb_scale"])
+        mask = resize_mask_to_ir(geometry.panel_mask, ir_shape)
+
+    if cache_dir is not None:
+        save_panel_mask(cache_dir, key, mask)
+
+    return mask
+
+
+def process_tile(task):
+    """
+    Worker entry point: `_process_tile` plus this process' stage timers
+    and counters as result["profile"]. A task carrying "cprofile_path"
+    runs under cProfile.
+    """
+
+    if task.get("cprofile_path"):
+        result = run_cprofile(_process_tile, task, task["cprofile_path"])
+    else:
+        result = _process_tile(task)
+
+    result["profile"] = snapshot()
+    return result
+
+
+def _process_tile(task):
+    """
+    STEP 2 → 3 → 4 for ONE IR/RGB tile pair.
+
+    task : dict with keys
+        tile_id        : int
+        ir_path        : Path
+        rgb_path       : Path
+        ir_window      : rasterio.windows.Window
+        core           : tile-local ownership region or None
+        rgb_overview_level : RGB overview to read from (None = full res)
+        rgb_window     : rasterio.windows.Window (same ground footprint,
+                         may be fractional / outside the RGB raster)
+        rgb_shape      : (H, W) the RGB footprint is read at
+        rgb_scale      : native RGB pixels per pixel of that read
+        ir_band_index  : int
+        rgb_bands      : list[int]
+        mask_cache     : panel-mask cache directory or None
+        geometry_layer : step-3 layer path ("layer" mask mode) or None
+        background     : mosaic background model path (mosaic normalization
+                         / "blocks" baseline) or None
+        annotate_path  : str or None
+        annotate_only_faults : skip the overlay when nothing was detected
+        annotate_inline      : write the overlay here (worker processes)
+                               or return the IR tile as "annotation"
+        site           : optional batch site name, echoed in the result
+
+    Returns:
+        dict with tile_id (and site) and the tile-level fault records
+    """
+
+    tile_id = task["tile_id"]
+    result = {"tile_id": tile_id, "faults": []}
+    if "site" in task:
+        result["site"] = task["site"]
+
+    ir_key = (task["ir_path"], None)
+    ir_ds = _get_dataset(*ir_key)
+
+    with stage("read_ir"):
+        ir_tile = read_tile(
+            ir_ds,
+            task["ir_window"],
+            band_index=task["ir_band_index"],
+            cache=_BLOCK_CACHES[ir_key],
+        )
+    transform = window_transform(task["ir_window"], ir_ds.transform)
+    count("tiles_processed")
+
+    if ir_tile is None or ir_tile.size == 0:
+        count("tiles_empty")
+        return result
+
+    count("bytes_read_ir", ir_tile.nbytes)
+
+    # --------------------------------------------------
+    # STEP 2 — Normalize IR → ΔT
+    # --------------------------------------------------
+    shape = ir_tile.shape[:2]
+    if shape not in _DT_BUFFERS:
+        _DT_BUFFERS[shape] = np.empty(shape, dtype="float32")
+
+    model = None
+    if task.get("background"):
+        model = _get_background(task["background"])
+    reference = None   # background median on this tile, when sampled
+
+    with stage("normalize"):
+        if settings.NORMALIZATION_REFERENCE == "mosaic":
+            reference = model.sample_level(task["ir_window"], shape)
+            delta_t, stats = normalize_ir_tile_model(
+                ir_tile,
+                reference,
+                model.sample_sigma(task["ir_window"], shape),
+                out=_DT_BUFFERS[shape],
+            )
+        else:
+            delta_t, stats = normalize_ir_tile_fused(
+                ir_tile,
+                out=_DT_BUFFERS[shape],
+                median=settings.NORMALIZATION_MEDIAN,
+            )
+
+    if delta_t is None or stats is None:
+        count("tiles_empty")
+        return result
+
+    result["stats"] = stats
+
+    # --------------------------------------------------
+    # STEP 3 → 4 BRIDGE: PANEL MASK (CRITICAL)
+    # --------------------------------------------------
+    with stage("panel_mask"):
+        panel_mask_ir = _panel_mask(task, delta_t.shape, transform)
+
+    # 🔍 DEBUG (first few tiles only)
+    if tile_id < 5:
+        logger.info(
+            f"[DEBUG] Tile {tile_id} | "
+            f"panel_pixels={panel_mask_ir.sum()} | "
+            f"coverage={panel_mask_ir.mean():.3f}"
+        )
+
+    if panel_mask_ir.sum() < 100:
+        # fallback: do not mask this tile
+        panel_mask_ir = None
+
+    # --------------------------------------------------
+    # STEP 4 — Fault detection (panel constrained)
+    # --------------------------------------------------
+    baseline = None
+    if settings.BASELINE_METHOD == "blocks":
+        # Mosaic background in this tile's ΔT frame
+        with stage("detect.sample_background"):
+            baseline = model.sample(task["ir_window"], delta_t.shape)
+            baseline -= (
+                np.float32(stats["bg_median"]) if reference is None
+                else reference
+            )
+
+    with stage("detect"):
+        faults = detect_faults(
+            delta_t=delta_t,
+            transform=transform,
+            tile_id=tile_id,
+            panel_mask=panel_mask_ir,
+            core=task["core"],
+            seams=task["seams"],
+            baseline=baseline,
+        )
+
+    # --------------------------------------------------
+    # STEP 6.2 — Annotated overlays (tile-level)
+    # --------------------------------------------------
+    if task["annotate_path"] is not None and (
+        faults or not task["annotate_only_faults"]
+    ):
+        if task["annotate_inline"]:
+            with stage("annotate"):
+                annotate_tile(
+                    image=ir_tile,
+                    faults=faults,
+                    tile_id=tile_id,
+                    output_path=task["annotate_path"],
+                    params=annotation_params(),
+                )
+        else:
+            # Encoded by the caller's background AnnotationWriter
+            result["annotation"] = ir_tile
+
+    result["faults"] = faults
+    return result
@@ -0,0 +1,250 @@
+# src/thermal/background.py
+
+import os
+import warnings
+
+import cv2
+import numpy as np
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+from scipy import ndimage
+
+from src.io.tiff_reader import open_tiff
+from src.config import settings
+from src.utils.hashing import file_digest, params_digest
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+class BackgroundModel:
+    """
+    Coarse thermal background of a whole IR mosaic: per
+    `block` × `block` block, the median of the valid pixels plus their
+    count, mean and mean square. Values are sampled back at full
+    resolution by bilinear interpolation between block centres, so
+    neighbouring tiles see one continuous reference.
+
+    IR normalization needs the statistics at the scale of a tile, so the
+    model also keeps them over a `context` × `context` neighbourhood of
+    every block:
+
+        level  median of the block medians
+        sigma  standard deviation of the pooled pixels (from the block
+               moments); panels vs. ground contrast included, as in the
+               per-tile std
+    """
+
+    def __init__(self, median, count, mean, mean_sq, block, context=None):
+        self.median = median.astype(np.float32)
+        self.count = count.astype(np.float64)
+        self.mean = mean.astype(np.float64)
+        self.mean_sq = mean_sq.astype(np.float64)
+        self.block = block
+        self.context = context or settings.TILE_SIZE
+
+        k = max(1, round(self.context / block))
+
+        def pooled(grid):
+            return ndimage.uniform_filter(grid, k, mode="nearest")
+
+        n = np.maximum(pooled(self.count), 1e-12)
+        mean = pooled(self.count * self.mean) / n
+        var = pooled(self.count * self.mean_sq) / n - mean * mean
+
+        self.level = ndimage.median_filter(
+            self.median, size=k, mode="nearest"
+        )
+        self.sigma = np.sqrt(np.maximum(var, 0)).astype(np.float32)
+
+    def _sample(self, grid, window, shape):
+        h, w = shape or (int(window.height), int(window.width))
+        rows, cols = grid.shape
+
+        wy, r0, r1 = _weights(int(window.row_off), h, self.block, rows)
+        wx, c0, c1 = _weights(int(window.col_off), w, self.block, cols)
+
+        # Bilinear interpolation is separable: two small weight matrices
+        return (wy @ grid[r0:r1, c0:c1] @ wx.T).astype(np.float32)
+
+    def sample(self, window, shape=None):
+        """
+        Block background median (float32) on the pixels of `window`.
+        """
+        return self._sample(self.median, window, shape)
+
+    def sample_level(self, window, shape=None):
+        """
+        Neighbourhood background level (float32) on `window`.
+        """
+        return self._sample(self.level, window, shape)
+
+    def sample_sigma(self, window, shape=None):
+        """
+        Neighbourhood σ (float32) on `window`: pooled block standard
+        deviation (moment-based, not outlier-robust).
+        """
+        return self._sample(self.sigma, window, shape)
+
+    def save(self, path):
+        tmp = f"{str(path)[:-len('.npz')]}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp, median=self.median, count=self.count,
+            mean=self.mean, mean_sq=self.mean_sq,
+            block=np.int64(self.block), context=np.int64(self.context),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["median"], data["count"], data["mean"], data["mean_sq"],
+                int(data["block"]), int(data["context"]),
+            )
+
+
+def _weights(offset, length, block, n):
+    """
+    (length, k) linear-interpolation weights of pixel centres
+    offset … offset + length between block centres r0 … r1 - 1
+    (edges replicated), plus r0 / r1.
+    """
+    pos = (offset + np.arange(length) + 0.5) / block - 0.5
+    pos = np.clip(pos, 0, n - 1)
+
+    i0 = np.floor(pos).astype(np.int64)
+    i1 = np.minimum(i0 + 1, n - 1)
+    frac = (pos - i0).astype(np.float32)
+
+    r0, r1 = int(i0.min()), int(i1.max()) + 1
+    weights = np.zeros((length, r1 - r0), dtype=np.float32)
+    rows = np.arange(length)
+    np.add.at(weights, (rows, i0 - r0), 1 - frac)
+    np.add.at(weights, (rows, i1 - r0), frac)
+
+    return weights, r0, r1
+
+
+def block_statistics(dataset, band=1, block=None, decimation=None):
+    """
+    Per-block median, valid count, mean and mean-square grids in one
+    sequential pass over the mosaic, one row of blocks at a time.
+
+    Each strip is read decimated (every `decimation`-th pixel, nearest;
+    GDAL serves it from overviews when present), so a block holds
+    (block / decimation)² samples. Pixels ≤ 0 / NaN are invalid (as in
+    IR normalization). The median of blocks with no valid sample is
+    filled from their neighbours (see _fill_holes); their count is 0, so
+    they drop out of the moments.
+    """
+
+    block = block or settings.BACKGROUND_BLOCK
+    decimation = decimation or settings.BACKGROUND_DECIMATION
+    step = max(block // decimation, 1)
+
+    rows = -(-dataset.height // block)
+    cols = -(-dataset.width // block)
+    median = np.full((rows, cols), np.nan, dtype=np.float32)
+    count = np.zeros((rows, cols), dtype=np.float64)
+    mean = np.zeros((rows, cols), dtype=np.float64)
+    mean_sq = np.zeros((rows, cols), dtype=np.float64)
+
+    strip = np.full((step, cols * step), np.nan, dtype=np.float32)
+
+    for r in range(rows):
+        y0 = r * block
+        h = min(block, dataset.height - y0)
+        out_h = max(1, round(h / block * step))
+        out_w = max(1, round(dataset.width / block * step))
+
+        values = dataset.read(
+            band,
+            window=Window(0, y0, dataset.width, h),
+            out_shape=(out_h, out_w),
+            resampling=Resampling.nearest,
+        ).astype(np.float32)
+        values[~(values > 0)] = np.nan
+
+        strip[:] = np.nan
+        strip[:out_h, :out_w] = values
+        blocks = strip.reshape(step, cols, step)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            median[r] = np.nanmedian(blocks, axis=(0, 2))
+
+        ok = ~np.isnan(blocks)
+        n = ok.sum(axis=(0, 2))
+        x = np.where(ok, blocks, 0).astype(np.float64)
+        count[r] = n
+        mean[r] = x.sum(axis=(0, 2)) / np.maximum(n, 1)
+        mean_sq[r] = np.square(x).sum(axis=(0, 2)) / np.maximum(n, 1)
+
+    return _fill_holes(median), count, mean, mean_sq
+
+
+def _fill_holes(grid):
+    """
+    Replace NaN blocks by repeatedly averaging valid 3 × 3 neighbours,
+    so the surface stays smooth across no-data gaps and edges.
+    """
+
+    missing = np.isnan(grid)
+    if missing.all():
+        return np.zeros_like(grid)
+
+    kernel = np.ones((3, 3), np.float32)
+    while missing.any():
+        values = np.where(missing, 0, grid).astype(np.float32)
+        weight = (~missing).astype(np.float32)
+        total = cv2.filter2D(values, -1, kernel, borderType=cv2.BORDER_CONSTANT)
+        n = cv2.filter2D(weight, -1, kernel, borderType=cv2.BORDER_CONSTANT)
+
+        grow = missing & (n > 0)
+        grid[grow] = total[grow] / n[grow]
+        missing &= ~grow
+
+    return grid
+
+
+def background_model(ir_path, band=None, block=None, decimation=None,
+                     context=None, cache_dir=None):
+    """
+    BackgroundModel of `ir_path`, built once and cached as
+
+        <cache_dir>/<IR content hash>_<params hash>.npz
+
+    under the output tree (settings.BACKGROUND_CACHE_DIR), so reruns and
+    later steps reuse it. Returns (model, path).
+    """
+
+    band = band or settings.IR_BAND_INDEX
+    block = block or settings.BACKGROUND_BLOCK
+    decimation = decimation or settings.BACKGROUND_DECIMATION
+    context = context or settings.BACKGROUND_CONTEXT or settings.TILE_SIZE
+    cache_dir = str(cache_dir or settings.BACKGROUND_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    digest = file_digest(ir_path, memo_path=settings.DIGEST_MEMO)
+    params = {
+        "band": band, "block": block,
+        "decimation": decimation, "context": context,
+    }
+    path = os.path.join(cache_dir, f"{digest}_{params_digest(params)}.npz")
+
+    if os.path.exists(path):
+        return BackgroundModel.load(path), path
+
+    ds = open_tiff(ir_path)
+    model = BackgroundModel(
+        *block_statistics(ds, band, block, decimation), block, context
+    )
+    ds.close()
+
+    model.save(path)
+    logger.info(
+        f"Background model | blocks={model.median.shape[1]}x"
+        f"{model.median.shape[0]} | block={block}px | "
+        f"decimation={decimation} | context={context}px | {path}"
+    )
+    return model, path
@@ -45,3 +45,152 @@ def normalize_ir_tile(ir_tile, clip_sigma=3.0):
     }
 
     return delta_t, stats
+
+
+def _histogram_median(values, bins):
+    """
+    Median from a value histogram. Integer counts (raw radiometric IR)
+    are binned exactly with np.bincount; floats use `bins` uniform bins
+    with linear interpolation, error ≤ (max - min) / bins.
+    """
+    if np.issubdtype(values.dtype, np.integer):
+        counts = np.bincount(values.ravel())
+        cum = np.cumsum(counts)
+        n = cum[-1]
+        lo = int(np.searchsorted(cum, (n + 1) // 2))
+        hi = int(np.searchsorted(cum, n // 2 + 1))
+        return 0.5 * (lo + hi)
+
+    vmin, vmax = float(values.min()), float(values.max())
+    if vmax <= vmin:
+        return vmin
+
+    counts, edges = np.histogram(values, bins=bins, range=(vmin, vmax))
+    cum = np.cumsum(counts)
+    half = 0.5 * cum[-1]
+
+    i = int(np.searchsorted(cum, half))
+    below = cum[i - 1] if i > 0 else 0
+    frac = (half - below) / max(counts[i], 1)
+
+    return edges[i] + frac * (edges[i + 1] - edges[i])
+
+
+def normalize_ir_tile_fused(
+    ir_tile,
+    clip_sigma=3.0,
+    out=None,
+    median="exact",
+    hist_bins=4096,
+):
+    """
+    Fused variant of `normalize_ir_tile`: same ΔT definition, far fewer
+    full-tile passes and allocations.
+
+    - valid pixels are gathered once (one compact copy)
+    - median  : "exact"     → in-place np.partition of that copy
+                              (equal to np.median)
+                "histogram" → exact bincount for integer IR, otherwise a
+                              binned estimate, error ≤ (max - min) / hist_bins
+    - std     : float64 accumulation (np.std on float32 accumulates in
+                float32; the two agree to ~1e-5 relative)
+    - clip + subtract run in place in `out`, a reusable float32 (H, W)
+      buffer (allocated when None)
+
+    Returns (delta_t, stats); both None when the tile has no valid pixel
+    (the original yields an all-NaN ΔT there). No-data pixels are not
+    masked in delta_t: they clip to the low end, far below any hotspot
+    threshold.
+    """
+
+    if ir_tile.ndim == 3:
+        ir_tile = ir_tile[:, :, 0]
+
+    valid = ir_tile > 0
+    background = ir_tile[valid]
+
+    if background.size == 0:
+        return None, None
+
+    if median == "histogram":
+        bg_median = _histogram_median(background, hist_bins)
+    else:
+        # `background` is already a private copy → partition in place
+        n = background.size
+        k = n // 2
+        background.partition(k)
+        bg_median = float(background[k])
+        if n % 2 == 0:
+            bg_median = 0.5 * (bg_median + float(background[:k].max()))
+
+    bg_std = float(background.std(dtype=np.float64))
+
+    if bg_std < 1e-6:
+        bg_std = 1.0
+
+    if out is None or out.shape != ir_tile.shape:
+        out = np.empty(ir_tile.shape, dtype="float32")
+
+    # Clip extreme outliers + ΔT relative to background, in place
+    lower = bg_median - clip_sigma * bg_std
+    upper = bg_median + clip_sigma * bg_std
+
+    if ir_tile.dtype == np.float32:
+        np.clip(ir_tile, lower, upper, out=out)
+    else:
+        out[...] = ir_tile
+        np.clip(out, lower, upper, out=out)
+
+    out -= np.float32(bg_median)
+
+    stats = {
+        "bg_median": float(bg_median),
+        "bg_std": float(bg_std),
+        "dt_min": float(out.min()),
+        "dt_max": float(out.max()),
+    }
+
+    return out, stats
+
+
+def normalize_ir_tile_model(ir_tile, median, sigma, clip_sigma=3.0, out=None):
+    """
+    ΔT against a mosaic background model (thermal.background) instead of
+    per-tile statistics: `median` / `sigma` are the model's level and
+    spread sampled on this tile (float32, H × W). Same clip-then-subtract
+    definition as `normalize_ir_tile_fused`, per pixel; no sort, no tile
+    seams.
+
+    Returns (delta_t, stats) like `normalize_ir_tile_fused`;
+    stats report the model's mean median / σ over the valid pixels.
+    """
+
+    if ir_tile.ndim == 3:
+        ir_tile = ir_tile[:, :, 0]
+
+    valid = ir_tile > 0
+    if not valid.any():
+        return None, None
+
+    sigma = np.where(sigma < 1e-6, np.float32(1.0), sigma)
+
+    if out is None or out.shape != ir_tile.shape:
+        out = np.empty(ir_tile.shape, dtype="float32")
+
+    out[...] = ir_tile
+    np.clip(
+        out,
+        median - np.float32(clip_sigma) * sigma,
+        median + np.float32(clip_sigma) * sigma,
+        out=out,
+    )
+    out -= median
+
+    stats = {
+        "bg_median": float(median[valid].mean()),
+        "bg_std": float(sigma[valid].mean()),
+        "dt_min": float(out.min()),
+        "dt_max": float(out.max()),
+    }
+
+    return out, stats
@@ -0,0 +1,51 @@
+# src/utils/hashing.py
+
+import hashlib
+import json
+import os
+
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def params_digest(params):
+    """
+    Stable short digest of a JSON-serializable parameter dict.
+    """
+    blob = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+def file_digest(path, memo_path=None):
+    """
+    Content hash (blake2b) of a file, read in chunks.
+
+    Hashing a multi-GB ortho takes a while, so the digest can be memoized
+    in a small JSON file keyed by (path, size, mtime); the file is only
+    re-hashed when it changes.
+    """
+
+    st = os.stat(path)
+    memo_key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+    memo = {}
+    if memo_path is not None and os.path.exists(memo_path):
+        with open(memo_path) as f:
+            memo = json.load(f)
+        if memo_key in memo:
+            return memo[memo_key]
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    if memo_path is not None:
+        memo[memo_key] = digest
+        os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+        tmp = f"{memo_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(memo, f, indent=2)
+        os.replace(tmp, memo_path)
+
+    return digest
@@ -1,16 +1,35 @@
 # src/utils/logger.py
 
+from pathlib import Path
+
 from loguru import logger
-from src.config import LOG_DIR, LOG_LEVEL
 
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+_FILE_SINK = None
+
+
+def configure_logging(log_dir=None, level=None):
+    """
+    Add the outputs/logs/pipeline.log file sink. Called once by entry
+    points (not on import, so workers and library use stay side-effect
+    free); calling again moves the sink.
+    """
+    global _FILE_SINK
+    from src.config import settings
+
+    log_dir = Path(log_dir or settings.LOG_DIR)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    if _FILE_SINK is not None:
+        logger.remove(_FILE_SINK)
+
+    _FILE_SINK = logger.add(
+        log_dir / "pipeline.log",
+        level=level or settings.LOG_LEVEL,
+        format="{time} | {level} | {message}",
+        rotation="10 MB",
+    )
+    return logger
 
-logger.add(
-    LOG_DIR / "pipeline.log",
-    level=LOG_LEVEL,
-    format="{time} | {level} | {message}",
-    rotation="10 MB",
-)
 
 def get_logger():
     return logger
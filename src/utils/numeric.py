@@ -0,0 +1,21 @@
+# src/utils/numeric.py
+
+import numpy as np
+
+
+def py_round(values, ndigits):
+    """
+    Vectorized round() with Python's result on every element.
+
+    np.round scales by 10**ndigits first, which can push a value just
+    below a half up to exactly .5 (311.85 → 311.8 instead of 311.9);
+    the few values that land that close are re-rounded in Python.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, ndigits)
+
+    scaled = values * 10.0 ** ndigits
+    near = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near.any():
+        out[near] = [round(v, ndigits) for v in values[near].tolist()]
+    return out
@@ -0,0 +1,137 @@
+# src/utils/profiling.py
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Per-process accumulators; workers ship snapshots back with each result
+_LOCK = threading.Lock()
+_TIMERS = {}     # stage → [total_seconds, calls]
+_COUNTERS = {}   # name  → value
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a pipeline stage:  `with stage("detect"): ...`
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        with _LOCK:
+            t = _TIMERS.setdefault(name, [0.0, 0])
+            t[0] += dt
+            t[1] += 1
+
+
+def count(name, n=1):
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+def snapshot(reset=True):
+    """
+    Picklable copy of this process' timers / counters.
+    """
+    with _LOCK:
+        snap = {
+            "timers": {k: list(v) for k, v in _TIMERS.items()},
+            "counters": dict(_COUNTERS),
+        }
+        if reset:
+            _TIMERS.clear()
+            _COUNTERS.clear()
+    return snap
+
+
+def merge_profile(total, part):
+    """
+    Accumulate snapshot `part` into `total` (both snapshot dicts).
+    """
+    for k, (sec, calls) in part["timers"].items():
+        t = total["timers"].setdefault(k, [0.0, 0])
+        t[0] += sec
+        t[1] += calls
+    for k, v in part["counters"].items():
+        total["counters"][k] = total["counters"].get(k, 0) + v
+    return total
+
+
+def empty_profile():
+    return {"timers": {}, "counters": {}}
+
+
+def write_profile(profile, path, wall_seconds, meta=None):
+    """
+    Machine-readable run profile (JSON).
+    Stage times are summed over all workers (CPU-seconds, not wall).
+    """
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+
+    doc = {
+        "wall_seconds": round(wall_seconds, 3),
+        "meta": meta or {},
+        "stages": {
+            k: {
+                "seconds": round(sec, 4),
+                "calls": calls,
+                "mean_ms": round(1000 * sec / max(calls, 1), 3),
+            }
+            for k, (sec, calls) in sorted(profile["timers"].items())
+        },
+        "counters": dict(sorted(profile["counters"].items())),
+    }
+
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+    return doc
+
+
+def log_profile_summary(profile, wall_seconds):
+    """
+    Per-stage table in the log, slowest first.
+    """
+    rows = sorted(
+        profile["timers"].items(), key=lambda kv: kv[1][0], reverse=True
+    )
+    busy = sum(sec for name, (sec, _) in rows if "." not in name) or 1.0
+
+    lines = [
+        f"{'stage':<24}{'calls':>9}{'total s':>11}{'mean ms':>11}{'share':>8}"
+    ]
+    for name, (sec, calls) in rows:
+        lines.append(
+            f"{name:<24}{calls:>9}{sec:>11.2f}"
+            f"{1000 * sec / max(calls, 1):>11.2f}{100 * sec / busy:>7.1f}%"
+        )
+    for name, value in sorted(profile["counters"].items()):
+        lines.append(f"{name:<24}{value:>9}")
+
+    logger.info(
+        f"[PROFILE] wall={wall_seconds:.1f}s\n" + "\n".join(lines)
+    )
+
+
+def run_cprofile(fn, arg, out_path):
+    """
+    Run `fn(arg)` under cProfile and dump stats to `out_path`
+    (open with `python -m pstats` or snakeviz). Also logs the PID so a
+    sampling profiler (`py-spy record --pid ...`) can be attached.
+    """
+    os.makedirs(os.path.dirname(str(out_path)), exist_ok=True)
+    logger.info(f"[PROFILE] cProfile → {out_path} | pid={os.getpid()}")
+
+    prof = cProfile.Profile()
+    result = prof.runcall(fn, arg)
+    prof.dump_stats(str(out_path))
+    return result
@@ -9,15 +9,30 @@ SEVERITY_COLORS = {
     "LOW":      (0, 255, 0),     # Green
 }
 
+IMAGE_FORMATS = ("png", "jpg", "webp")
 
-def annotate_tile(
-    image,
-    faults,
-    tile_id,
-    output_path
-):
+
+def encode_params(image_format="png", png_compression=1, quality=90):
+    """
+    cv2.imwrite parameters for the annotation format.
+
+    png_compression : 0 (fastest, largest) … 9 (slowest, smallest)
+    quality         : JPEG / WebP quality 0 … 100
+    """
+    if image_format == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    if image_format == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if image_format == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    raise ValueError(
+        f"Unknown image format '{image_format}', expected one of {IMAGE_FORMATS}"
+    )
+
+
+def render_tile(image, faults, tile_id):
     """
-    Bounding-box accurate overlays for ONE tile.
+    Bounding-box accurate overlays for ONE tile (BGR uint8, not written).
     """
 
     vis = image.copy()
@@ -57,4 +72,19 @@ def annotate_tile(
             cv2.LINE_AA
         )
 
-    cv2.imwrite(output_path, vis)
+    return vis
+
+
+def annotate_tile(
+    image,
+    faults,
+    tile_id,
+    output_path,
+    params=None
+):
+    """
+    Bounding-box accurate overlays for ONE tile, written synchronously.
+    """
+
+    vis = render_tile(image, faults, tile_id)
+    cv2.imwrite(output_path, vis, params or [])
@@ -0,0 +1,64 @@
+# src/visualization/writer.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.visualization.annotator import annotate_tile
+from src.utils.profiling import stage
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AnnotationWriter:
+    """
+    Background annotation writer: render + encode + write on a thread
+    pool so the detection loop never waits on PNG compression.
+
+    At most `max_pending` tiles are queued; `submit` blocks only when the
+    queue is full (bounded memory). OpenCV releases the GIL while
+    encoding, so the threads run truly in parallel.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, params=None):
+        self.params = params
+        self.written = 0
+        self.failed = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="annotate",
+        )
+
+    def submit(self, image, faults, tile_id, output_path):
+        self._slots.acquire()
+        future = self._pool.submit(
+            self._write, image, faults, tile_id, output_path
+        )
+        future.add_done_callback(self._done)
+
+    def _write(self, image, faults, tile_id, output_path):
+        with stage("annotate"):
+            annotate_tile(image, faults, tile_id, output_path, self.params)
+
+    def _done(self, future):
+        with self._lock:
+            if future.exception() is None:
+                self.written += 1
+            else:
+                self.failed += 1
+                logger.warning(f"Annotation failed: {future.exception()}")
+        self._slots.release()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        logger.info(
+            f"Annotations written={self.written} | failed={self.failed}"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()